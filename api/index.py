@@ -1,11 +1,21 @@
+import time
+_started = time.perf_counter()
+
 import sys
 import os
 
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-# Import the Flask app
-from app import app
+# Import the Flask app (openpyxl / pandas are loaded on first use, not here)
+from app import app, STARTUP_TIMINGS
+
+# Startup timing report for cold starts (also served at /startup-report)
+STARTUP_TIMINGS['entry_import_ms'] = round((time.perf_counter() - _started) * 1000, 1)
+print(f"🚀 Cold start: entry point imported in {STARTUP_TIMINGS['entry_import_ms']} ms "
+      f"(app.py {STARTUP_TIMINGS['app_import_ms']} ms, budget {app.config['IMPORT_BUDGET_MS']} ms)")
+if STARTUP_TIMINGS['entry_import_ms'] > app.config['IMPORT_BUDGET_MS']:
+    print("⚠️  Cold-start import exceeded its budget; check python -X importtime api/index.py")
 
 # Vercel expects the app to be available directly
 # Export the Flask app instance
@@ -13,4 +23,4 @@ application = app
 
 # For local testing
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -1,6 +1,11 @@
+import time
+# Measured from here so /startup-report covers the whole import of this module
+_IMPORT_STARTED = time.perf_counter()
+
 import tempfile
 import shutil
-from flask import Flask, render_template, request, jsonify
+import threading
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
 import sys
@@ -9,7 +14,14 @@ from werkzeug.utils import secure_filename
 # Add current directory to path to ensure we can import utils.py
 sys.path.insert(0, os.path.dirname(__file__))
 
-from logic import ExamProcessor
+from logic import ExamProcessor, PRN_FUZZY_MAX_DISTANCE
+from matching import PrnTrie
+from cache import ResultCache, TTLCache
+from fctc_store import FCTCStore, FCTCStoreError
+from jobs import JobQueue
+from roster import RosterError, RosterStore
+from reports import division_filename, iter_csv_content, iter_zip_content, safe_division_name
+from timing import log_stage
 import utils as utils_module
 
 # Import specific functions with error handling
@@ -18,6 +30,7 @@ try:
     sanitize_filename = utils_module.sanitize_filename
     format_response = utils_module.format_response
     validate_excel_file = utils_module.validate_excel_file
+    describe_excel_error = utils_module.describe_excel_error
     check_file_size = utils_module.check_file_size
     validate_year_input = utils_module.validate_year_input
     log_error = utils_module.log_error
@@ -47,6 +60,9 @@ except AttributeError as e:
     def validate_excel_file(file_path):
         return True, "File validation skipped"
     
+    def describe_excel_error(error):
+        return f"File validation issue: {error}"
+    
     def check_file_size(file_path, max_size_mb=16):
         return True, "Size check skipped"
     
@@ -66,7 +82,77 @@ CORS(app)  # Enable CORS for all routes
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
+ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv', 'tsv'}
+# Parse FCTC and Roll Call files in parallel worker processes (multi-core hosts)
+app.config['PARALLEL_PARSE'] = os.environ.get('FCTC_PARALLEL_PARSE', '').lower() in ('1', 'true', 'yes')
+# PRN and Roll No + Division matching as vectorised joins (pandas): 'on', 'off', or
+# unset for automatic (only very large roll calls, where the joins beat dict lookups)
+app.config['VECTORISED_JOINS'] = {'on': True, 'off': False}.get(os.environ.get('FCTC_VECTORISED_JOINS', '').lower())
+# Level 1.5: recover PRNs with one typo (match method "PRN_Fuzzy"); off unless FCTC_PRN_FUZZY=on
+app.config['PRN_FUZZY'] = os.environ.get('FCTC_PRN_FUZZY', '').lower() in ('1', 'on', 'true', 'yes')
+# Name and Roll No + Division matches give each FCTC response to one student; FCTC_ONE_TO_ONE=off
+# lets every student keep their own best match (more matches, more false ones; see README)
+app.config['ONE_TO_ONE'] = os.environ.get('FCTC_ONE_TO_ONE', '').lower() not in ('0', 'off', 'false', 'no')
+
+# Results kept for /results/<id>/... downloads when /process runs in summary mode.
+# RESULT_STORE lives in this process only, so the web page asks for summary responses
+# only with FCTC_SUMMARY_RESPONSES=on (a single long-running server); on serverless
+# hosts the follow-up download may reach another instance and 404.
+app.config['SUMMARY_RESPONSES'] = os.environ.get('FCTC_SUMMARY_RESPONSES', '').lower() in ('1', 'on', 'true', 'yes')
+app.config['RESULT_STORE_SIZE'] = 32
+app.config['RESULT_TTL_SECONDS'] = 60 * 60
+RESULT_STORE = TTLCache(max_entries=app.config['RESULT_STORE_SIZE'],
+                        ttl_seconds=app.config['RESULT_TTL_SECONDS'])
+
+# Cache of /process results keyed by upload digests + year + matcher settings.
+# Set FCTC_RESULT_CACHE_DISK=1 to also keep entries under outputs/cache.
+app.config['RESULT_CACHE_SIZE'] = 16
+app.config['RESULT_CACHE_DIR'] = (
+    os.path.join(os.path.dirname(__file__), '..', 'outputs', 'cache')
+    if os.environ.get('FCTC_RESULT_CACHE_DISK', '').lower() in ('1', 'true', 'yes') else None
+)
+RESULT_CACHE = ResultCache(max_entries=app.config['RESULT_CACHE_SIZE'],
+                           disk_dir=app.config['RESULT_CACHE_DIR'])
+
+# Parsed uploads (extracted FCTC / Roll Call records) keyed by file SHA-256, shared by
+# /process and /debug-prn so re-submitting a file costs a hash instead of a re-parse
+app.config['PARSED_CACHE_SIZE'] = 16
+app.config['PARSED_CACHE_MAX_BYTES'] = 128 * 1024 * 1024
+app.config['PARSED_CACHE_TTL_SECONDS'] = 30 * 60
+PARSED_CACHE = TTLCache(max_entries=app.config['PARSED_CACHE_SIZE'],
+                        ttl_seconds=app.config['PARSED_CACHE_TTL_SECONDS'],
+                        max_bytes=app.config['PARSED_CACHE_MAX_BYTES'],
+                        sizeof=lambda parsed: parsed.approx_nbytes())
+
+# Registered roll-call rosters (parsed once, loaded column by column on every /process call)
+app.config['ROSTER_DIR'] = os.environ.get(
+    'FCTC_ROSTER_DIR', os.path.join(os.path.dirname(__file__), '..', 'outputs', 'rosters'))
+ROSTER_STORE = RosterStore(app.config['ROSTER_DIR'])
+
+# Cumulative FCTC stores (/process with fctc_store=<id> ingests only new responses)
+app.config['FCTC_STORE_DIR'] = os.environ.get(
+    'FCTC_STORE_DIR', os.path.join(os.path.dirname(__file__), '..', 'outputs', 'fctc_store'))
+# dd/mm vs mm/dd for store uploads whose text Timestamps never show a day above 12
+# ('day_first' or 'month_first'; unset rejects such uploads instead of guessing)
+app.config['FCTC_DATE_ORDER'] = os.environ.get('FCTC_DATE_ORDER', '').lower() or None
+
+# Background queue for /process?async=1 (threads in this process, no broker)
+app.config['JOB_WORKERS'] = int(os.environ.get('FCTC_JOB_WORKERS', '2'))
+app.config['JOB_TTL_SECONDS'] = 60 * 60
+JOB_QUEUE = JobQueue(max_workers=app.config['JOB_WORKERS'], ttl_seconds=app.config['JOB_TTL_SECONDS'])
+
+# Cold-start budget for importing this module; openpyxl / pandas are loaded on first use
+app.config['IMPORT_BUDGET_MS'] = int(os.environ.get('FCTC_IMPORT_BUDGET_MS', '250'))
+# FCTC_WARM_UP=eager imports the Excel readers during startup, =background in a thread
+app.config['WARM_UP'] = os.environ.get('FCTC_WARM_UP', '').lower()
+# Libraries deferred until an upload needs them (reported by /startup-report)
+DEFERRED_MODULES = ('openpyxl', 'pandas', 'numpy')
+STARTUP_TIMINGS = {
+    'app_import_ms': None,        # Importing app.py (set at the end of this module)
+    'entry_import_ms': None,      # Importing api/index.py, set by the serverless entry point
+    'warm_up_ms': None,
+    'first_request_ms': None      # Import start → first request
+}
 
 # Use temporary directory for Vercel
 UPLOAD_FOLDER = tempfile.mkdtemp()
@@ -75,19 +161,25 @@ OUTPUT_FOLDER = tempfile.mkdtemp()
 @app.route('/')
 def home():
     """Render the frontend index.html"""
-    return render_template('index.html')
+    return render_template('index.html', response_mode='summary' if app.config['SUMMARY_RESPONSES'] else 'full')
 
 @app.route('/process', methods=['POST'])
 def process_files():
     """
     Process FCTC and Roll Call Excel files
-    Accepts: FCTC file, Roll Call file, Year
+    Accepts: FCTC file, Roll Call file (or roster_id of a registered roster), Year
     Returns: Success message and file paths
     """
     try:
+        # A registered roster replaces the Roll Call upload
+        roster_id = request.form.get('roster_id', '').strip()
+        # Optional cumulative FCTC store: only responses newer than its last upload are ingested
+        fctc_store_id = request.form.get('fctc_store', '').strip()
+        # async=1 queues the work and returns a job ID to poll at /jobs/<id>
+        run_as_job = request.form.get('async', '').strip().lower() in ('1', 'true', 'yes')
         
         # Check if files are present in request
-        if 'fctc_file' not in request.files or 'roll_call_file' not in request.files:
+        if 'fctc_file' not in request.files or ('roll_call_file' not in request.files and not roster_id):
             log_error("Missing files in request")
             return jsonify(format_response(
                 False, 
@@ -95,8 +187,10 @@ def process_files():
             )), 400
         
         fctc_file = request.files['fctc_file']
-        roll_call_file = request.files['roll_call_file']
+        roll_call_file = request.files.get('roll_call_file')
         year = request.form.get('year', '').strip()
+        # 'summary' returns counts + result_id; reports are then streamed from /results/<id>/...
+        response_mode = request.form.get('response_mode', 'full').strip().lower()
         
         # Validate files are selected
         if not fctc_file or fctc_file.filename == '':
@@ -105,12 +199,28 @@ def process_files():
                 "Please select the FCTC Excel file"
             )), 400
             
-        if not roll_call_file or roll_call_file.filename == '':
+        if not roster_id and (not roll_call_file or roll_call_file.filename == ''):
             return jsonify(format_response(
                 False, 
                 "Please select the Roll Call Excel file"
             )), 400
         
+        if roster_id:
+            if not ROSTER_STORE.exists(roster_id):
+                return jsonify(format_response(False, f"Unknown roster ID: {roster_id}")), 404
+            try:
+                ROSTER_STORE.metadata(roster_id)
+            except RosterError as e:
+                return jsonify(format_response(False, str(e))), 400
+        
+        fctc_store = None
+        if fctc_store_id:
+            try:
+                fctc_store = FCTCStore(app.config['FCTC_STORE_DIR'], fctc_store_id,
+                                       date_order=app.config['FCTC_DATE_ORDER'])
+            except FCTCStoreError as e:
+                return jsonify(format_response(False, str(e))), 400
+        
         # Validate year input
         year_valid, year_message = validate_year_input(year)
         if not year_valid:
@@ -120,13 +230,13 @@ def process_files():
         if not validate_file_extension(fctc_file.filename, ALLOWED_EXTENSIONS):
             return jsonify(format_response(
                 False, 
-                f"FCTC file must be an Excel file. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
+                f"FCTC file must be an Excel or CSV file. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
             )), 400
             
-        if not validate_file_extension(roll_call_file.filename, ALLOWED_EXTENSIONS):
+        if not roster_id and not validate_file_extension(roll_call_file.filename, ALLOWED_EXTENSIONS):
             return jsonify(format_response(
                 False, 
-                f"Roll Call file must be an Excel file. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
+                f"Roll Call file must be an Excel or CSV file. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
             )), 400
         
         # Save uploaded files with validation
@@ -134,19 +244,19 @@ def process_files():
         timestamp = str(int(time.time()))
         
         fctc_filename = secure_filename(sanitize_filename(fctc_file.filename))
-        roll_call_filename = secure_filename(sanitize_filename(roll_call_file.filename))
-        
-        # Add timestamp to avoid conflicts
-        fctc_filename = f"{timestamp}_fctc_{fctc_filename}"
-        roll_call_filename = f"{timestamp}_rollcall_{roll_call_filename}"
-        
+        fctc_filename = f"{timestamp}_fctc_{fctc_filename}"  # Add timestamp to avoid conflicts
         fctc_path = os.path.join(UPLOAD_FOLDER, fctc_filename)
-        roll_call_path = os.path.join(UPLOAD_FOLDER, roll_call_filename)
+        roll_call_path = None
+        if not roster_id:
+            roll_call_filename = secure_filename(sanitize_filename(roll_call_file.filename))
+            roll_call_filename = f"{timestamp}_rollcall_{roll_call_filename}"
+            roll_call_path = os.path.join(UPLOAD_FOLDER, roll_call_filename)
         
         # Save files
         try:
             fctc_file.save(fctc_path)
-            roll_call_file.save(roll_call_path)
+            if roll_call_path:
+                roll_call_file.save(roll_call_path)
         except Exception as e:
             log_error("Error saving uploaded files", e)
             return jsonify(format_response(
@@ -157,114 +267,479 @@ def process_files():
         # Validate saved files
         fctc_size_valid, fctc_size_msg = check_file_size(fctc_path)
         if not fctc_size_valid:
-            os.remove(fctc_path) if os.path.exists(fctc_path) else None
-            os.remove(roll_call_path) if os.path.exists(roll_call_path) else None
+            _remove_uploads(fctc_path, roll_call_path)
             return jsonify(format_response(False, f"FCTC file error: {fctc_size_msg}")), 400
         
-        roll_call_size_valid, roll_call_size_msg = check_file_size(roll_call_path)
-        if not roll_call_size_valid:
-            os.remove(fctc_path) if os.path.exists(fctc_path) else None
-            os.remove(roll_call_path) if os.path.exists(roll_call_path) else None
-            return jsonify(format_response(False, f"Roll Call file error: {roll_call_size_msg}")), 400
+        if roll_call_path:
+            roll_call_size_valid, roll_call_size_msg = check_file_size(roll_call_path)
+            if not roll_call_size_valid:
+                _remove_uploads(fctc_path, roll_call_path)
+                return jsonify(format_response(False, f"Roll Call file error: {roll_call_size_msg}")), 400
+        
+        # Job mode: answer with a job ID now, run the pipeline on the background queue
+        if run_as_job:
+            job = JOB_QUEUE.submit(_run_process_pipeline, fctc_path, roll_call_path, roster_id,
+                                   fctc_store, year, response_mode)
+            return jsonify(format_response(True, "Processing job queued", {
+                'job_id': job.job_id,
+                'status_url': f'/jobs/{job.job_id}',
+                'result_url': f'/jobs/{job.job_id}/result'
+            })), 202
         
-        # Validate Excel files can be read
-        fctc_valid, fctc_msg = validate_excel_file(fctc_path)
-        if not fctc_valid:
-            os.remove(fctc_path) if os.path.exists(fctc_path) else None
-            os.remove(roll_call_path) if os.path.exists(roll_call_path) else None
-            return jsonify(format_response(False, f"FCTC file error: {fctc_msg}")), 400
+        try:
+            response_data = _run_process_pipeline(fctc_path, roll_call_path, roster_id, fctc_store, year, response_mode)
+        except UploadValidationError as e:
+            return jsonify(format_response(False, str(e))), 400
         
-        roll_call_valid, roll_call_msg = validate_excel_file(roll_call_path)
-        if not roll_call_valid:
-            os.remove(fctc_path) if os.path.exists(fctc_path) else None
-            os.remove(roll_call_path) if os.path.exists(roll_call_path) else None
-            return jsonify(format_response(False, f"Roll Call file error: {roll_call_msg}")), 400
+        return jsonify(format_response(
+            True,
+            "Multi-level matching completed successfully",
+            response_data
+        )), 200
+        
+    except Exception as e:
+        # Clean up files on error
+        _remove_uploads(locals().get('fctc_path'), locals().get('roll_call_path'))
         
-        # Process files using ExamProcessor
-        processor = ExamProcessor()
+        log_error("Error processing files", e)
+        return jsonify(format_response(
+            False, 
+            f"Error processing files: {str(e)}"
+        )), 500
+
+class UploadValidationError(Exception):
+    """An uploaded workbook cannot be read (reported as a 400, or as a failed job)"""
+
+def _run_process_pipeline(fctc_path, roll_call_path, roster_id, fctc_store, year, response_mode, progress=None):
+    """
+    Match saved uploads and build the /process response payload; the uploads are
+    removed afterwards. Runs inside the request or on JOB_QUEUE (progress callback).
+    """
+    try:
+        processor = ExamProcessor(parallel_parse=app.config['PARALLEL_PARSE'], parsed_cache=PARSED_CACHE,
+                                  progress=progress, vectorised_joins=app.config['VECTORISED_JOINS'],
+                                  prn_fuzzy=app.config['PRN_FUZZY'], one_to_one=app.config['ONE_TO_ONE'])
         
         # Convert year to appropriate format
         year_mapping = {'I': 1, 'II': 2, 'III': 3, '1': 1, '2': 2, '3': 3}
         year_int = year_mapping.get(year, 1)
         
-        # Process files using new PRN-first pipeline
-        try:
-            result = processor.process_and_generate_reports(fctc_path, roll_call_path, year_int)
-        except Exception as e:
-            # For now, all errors are treated as real errors
-            raise e
-        
+        # Identical submissions (same uploads, year and matcher settings) reuse the cached result
+        # (a roster is keyed by the digest of the file it was registered from)
+        if roster_id:
+            try:
+                roll_call_digest = ROSTER_STORE.metadata(roster_id)['file_sha256']
+            except RosterError as e:
+                # Deleted or replaced since /process checked it (queued jobs run later)
+                raise UploadValidationError(f"Roll Call roster error: {e}")
+        else:
+            roll_call_digest = processor.digest_for(roll_call_path)
+        cache_key = ResultCache.make_key(processor.digest_for(fctc_path), roll_call_digest,
+                                         year_int, processor.matcher_settings())
+        # (results from a cumulative store depend on everything ingested so far: never cached)
+        result = RESULT_CACHE.get(cache_key) if fctc_store is None else None
+        result_cache_status = 'bypass' if fctc_store is not None else ('hit' if result is not None else 'miss')
+        
+        if result is None:
+            # Validate Excel files can be read: open each workbook once and keep the
+            # row stream, so ExamProcessor continues from here instead of re-parsing.
+            # Uploads already in the parsed cache were valid and are passed by path.
+            try:
+                fctc_workbook = _open_unless_parsed(processor, fctc_path, 'fctc')
+            except Exception as e:
+                log_error(f"Excel file validation failed for {fctc_path}", e)
+                raise UploadValidationError(f"FCTC file error: {describe_excel_error(e)}")
+            
+            try:
+                if roster_id:
+                    with ROSTER_STORE.open(roster_id) as roster:
+                        roll_call_workbook = roster.records()
+                else:
+                    roll_call_workbook = _open_unless_parsed(processor, roll_call_path, 'roll_call')
+            except Exception as e:
+                log_error(f"Excel file validation failed for {roll_call_path or roster_id}", e)
+                _close_workbook(fctc_workbook)
+                raise UploadValidationError(f"Roll Call file error: {describe_excel_error(e)}")
+            
+            # Process files using new PRN-first pipeline
+            try:
+                if fctc_store is not None:
+                    result = processor.process_incremental(fctc_store, fctc_workbook, roll_call_workbook,
+                                                           year_int, roll_call_digest)
+                else:
+                    result = processor.process_and_generate_reports(fctc_workbook, roll_call_workbook, year_int)
+            finally:
+                # Release workbook handles before the upload files are removed
+                _close_workbook(fctc_workbook)
+                _close_workbook(roll_call_workbook)
+            
+            if fctc_store is None:
+                RESULT_CACHE.set(cache_key, result)
+        
+        response_data = _build_response_data(result, year, response_mode,
+                                             dict(processor.timer.context, result_cache=result_cache_status),
+                                             cached=result_cache_status == 'hit')
+        response_data['result_cache'] = result_cache_status
+        if roster_id:
+            response_data['roster_id'] = roster_id
+        
+        return response_data
+    finally:
         # Clean up uploaded files (optional - comment out if you want to keep them)
-        try:
-            os.remove(fctc_path)
-            os.remove(roll_call_path)
-        except:
-            pass  # Ignore cleanup errors
-        
+        _remove_uploads(fctc_path, roll_call_path)
+
+def _build_response_data(result, year, response_mode, timing_context=None, cached=False):
+    """
+    /process response payload for one matching result
+    'summary' keeps the student rows in RESULT_STORE and returns download links;
+    otherwise the reports and their CSV content are returned inline. The time this
+    takes is added to match_stats['stage_timings'] as 'serialisation'. For a result
+    from RESULT_CACHE (cached=True) the stage timings and parse_* stats describe the
+    run that produced it, so they move under match_stats['cached_from_run'].
+    """
+    start = time.perf_counter()
+    division_reports = result.get('division_reports', {})
+    response_data = {
+        'matched_students': result.get('matched_students', 0),
+        'generated_files': result.get('reports', {}).get('files_created', []),
+        'year': year,
+        'summary': result.get('reports', {}).get('summary', ''),
+        'divisions': result.get('divisions', []),
+        'division_count': result.get('division_count', 0),
+        'match_stats': result.get('match_stats', {})  # Add matching statistics
+    }
+    
+    if response_mode == 'summary':
+        # Keep the student rows server-side and hand out download links
+        import uuid
+        result_id = uuid.uuid4().hex
+        RESULT_STORE.set(result_id, division_reports)
+        
+        response_data['result_id'] = result_id
+        response_data['division_summaries'] = {
+            division: {
+                'filename': division_filename(division),
+                'download_url': f'/results/{result_id}/division/{safe_division_name(division)}.csv',
+                'total_students': report_data['total_students'],
+                'present_count': report_data['present_count'],
+                'absent_count': report_data['absent_count']
+            }
+            for division, report_data in division_reports.items()
+        }
+        response_data['download_all_url'] = f'/results/{result_id}/divisions.zip'
+        response_data['report_url'] = f'/results/{result_id}/report'
+    else:
         # Prepare response with downloadable division-wise data
-        division_reports = result.get('division_reports', {})
         download_data = {}
         
         # Generate CSV for each division
         for division, report_data in division_reports.items():
             csv_content = _generate_csv_content(report_data['students'])
-            safe_division_name = division.replace('/', '_').replace('\\', '_').replace(' ', '_')
-            download_data[f'division_{safe_division_name}'] = {
+            download_data[f'division_{safe_division_name(division)}'] = {
                 'csv_content': csv_content,
-                'filename': f'attendance_report_division_{safe_division_name}.csv',
+                'filename': division_filename(division),
                 'total_students': report_data['total_students'],
                 'present_count': report_data['present_count'],
                 'absent_count': report_data['absent_count']
             }
         
-        response_data = {
-            'matched_students': result.get('matched_students', 0),
-            'generated_files': result.get('reports', {}).get('files_created', []),
-            'year': year,
-            'summary': result.get('reports', {}).get('summary', ''),
-            'divisions': result.get('divisions', []),
-            'division_count': result.get('division_count', 0),
-            'division_reports': division_reports,
-            'download_data': download_data,
-            'match_stats': result.get('match_stats', {})  # Add matching statistics
-        }
+        response_data['division_reports'] = division_reports
+        response_data['download_data'] = download_data
+    
+    # Copy match_stats: the result itself may be shared through RESULT_CACHE
+    seconds = time.perf_counter() - start
+    rows = sum(len(report_data['students']) for report_data in division_reports.values())
+    log_stage(timing_context or {}, 'serialisation', seconds, rows=rows, response_mode=response_mode or 'full')
+    match_stats = dict(response_data['match_stats'])
+    stage_timings = match_stats.get('stage_timings', {})
+    if cached:
+        match_stats['cached_from_run'] = {key: match_stats.pop(key) for key in list(match_stats)
+                                          if key == 'stage_timings' or key.startswith('parse_')}
+        stage_timings = {}
+    match_stats['stage_timings'] = dict(stage_timings, serialisation={'seconds': round(seconds, 4), 'rows': rows})
+    response_data['match_stats'] = match_stats
+    return response_data
+
+def _remove_uploads(*paths):
+    """Delete saved uploads, ignoring missing ones and cleanup errors"""
+    for path in paths:
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+def _open_unless_parsed(processor, file_path, kind):
+    """WorkbookRows for an upload, or just its path when the parsed cache already has it"""
+    if processor.has_parsed(file_path, kind):
+        return file_path
+    return processor.open_workbook(file_path)
+
+def _close_workbook(source):
+    if hasattr(source, 'close'):
+        source.close()
+
+def _generate_csv_content(attendance_data):
+    """Generate CSV content from attendance data"""
+    return ''.join(iter_csv_content(attendance_data))
+
+def _stored_division_reports(result_id):
+    """Division reports kept by a summary-mode /process call (None if unknown or expired)"""
+    return RESULT_STORE.get(result_id)
+
+@app.route('/results/<result_id>/division/<division_name>.csv', methods=['GET'])
+def stream_division_csv(result_id, division_name):
+    """Stream one division's attendance CSV for a summary-mode result"""
+    division_reports = _stored_division_reports(result_id)
+    if division_reports is None:
+        return jsonify(format_response(False, "Result not found or expired. Please process the files again.")), 404
+    
+    for division, report_data in division_reports.items():
+        if safe_division_name(division) == division_name:
+            return Response(
+                stream_with_context(iter_csv_content(report_data['students'])),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename={division_filename(division)}'}
+            )
+    
+    return jsonify(format_response(False, f"Division '{division_name}' not found in this result")), 404
+
+@app.route('/results/<result_id>/divisions.zip', methods=['GET'])
+def stream_divisions_zip(result_id):
+    """Stream a zip with every division's attendance CSV for a summary-mode result"""
+    division_reports = _stored_division_reports(result_id)
+    if division_reports is None:
+        return jsonify(format_response(False, "Result not found or expired. Please process the files again.")), 404
+    
+    files = ((division_filename(division), report_data['students'])
+             for division, report_data in division_reports.items())
+    return Response(
+        stream_with_context(iter_zip_content(files)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=attendance_reports_all_divisions.zip'}
+    )
+
+@app.route('/results/<result_id>/report', methods=['GET'])
+def get_division_reports(result_id):
+    """Full division-wise student lists for a summary-mode result (fetched on demand)"""
+    division_reports = _stored_division_reports(result_id)
+    if division_reports is None:
+        return jsonify(format_response(False, "Result not found or expired. Please process the files again.")), 404
+    
+    return jsonify(format_response(True, "Division reports", {'division_reports': division_reports})), 200
+
+@app.route('/process-batch', methods=['POST'])
+def process_batch():
+    """
+    Process one FCTC file against several Roll Call files in a single pass
+    Accepts: fctc_file, roll_call_files (repeated) and/or roster_ids (repeated),
+             year or years (one per roll call, files first then rosters)
+    Returns: one /process-style result per roll call
+    """
+    try:
+        fctc_file = request.files.get('fctc_file')
+        roll_call_files = [f for f in request.files.getlist('roll_call_files') if f and f.filename]
+        roster_ids = [r.strip() for r in request.form.getlist('roster_ids') if r.strip()]
+        response_mode = request.form.get('response_mode', 'full').strip().lower()
         
+        if not fctc_file or fctc_file.filename == '':
+            return jsonify(format_response(False, "Please select the FCTC Excel file")), 400
+        if not roll_call_files and not roster_ids:
+            return jsonify(format_response(False, "At least one Roll Call file or roster ID is required")), 400
+        
+        roll_call_count = len(roll_call_files) + len(roster_ids)
+        years = [y.strip() for y in request.form.getlist('years')]
+        if not years:
+            years = [request.form.get('year', '').strip()] * roll_call_count
+        if len(years) != roll_call_count:
+            return jsonify(format_response(False, f"Expected {roll_call_count} years, one per Roll Call, got {len(years)}")), 400
+        for year in years:
+            year_valid, year_message = validate_year_input(year)
+            if not year_valid:
+                return jsonify(format_response(False, year_message)), 400
+        
+        for upload in [fctc_file] + roll_call_files:
+            if not validate_file_extension(upload.filename, ALLOWED_EXTENSIONS):
+                return jsonify(format_response(
+                    False, 
+                    f"{upload.filename} must be an Excel or CSV file. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
+                )), 400
+        for roster_id in roster_ids:
+            if not ROSTER_STORE.exists(roster_id):
+                return jsonify(format_response(False, f"Unknown roster ID: {roster_id}")), 404
+            try:
+                ROSTER_STORE.metadata(roster_id)
+            except RosterError as e:
+                return jsonify(format_response(False, str(e))), 400
+        
+        # Save uploaded files
+        import time
+        timestamp = str(int(time.time()))
+        fctc_path = os.path.join(UPLOAD_FOLDER, f"{timestamp}_fctc_{secure_filename(sanitize_filename(fctc_file.filename))}")
+        saved_paths = [fctc_path]
+        fctc_file.save(fctc_path)
+        
+        roll_call_sources = {}
+        labels = []
+        for index, roll_call_file in enumerate(roll_call_files):
+            roll_call_path = os.path.join(
+                UPLOAD_FOLDER, f"{timestamp}_rollcall{index}_{secure_filename(sanitize_filename(roll_call_file.filename))}")
+            roll_call_file.save(roll_call_path)
+            saved_paths.append(roll_call_path)
+            label = roll_call_file.filename if roll_call_file.filename not in roll_call_sources else f"{roll_call_file.filename} ({index + 1})"
+            roll_call_sources[label] = roll_call_path
+            labels.append(label)
+        
+        try:
+            for path in saved_paths:
+                size_valid, size_msg = check_file_size(path)
+                if not size_valid:
+                    return jsonify(format_response(False, f"{os.path.basename(path)} error: {size_msg}")), 400
+            
+            for roster_id in roster_ids:
+                with ROSTER_STORE.open(roster_id) as roster:
+                    roll_call_sources[roster_id] = roster.records()
+                labels.append(roster_id)
+            
+            processor = ExamProcessor(parsed_cache=PARSED_CACHE, vectorised_joins=app.config['VECTORISED_JOINS'],
+                                      prn_fuzzy=app.config['PRN_FUZZY'], one_to_one=app.config['ONE_TO_ONE'])
+            try:
+                fctc_workbook = _open_unless_parsed(processor, fctc_path, 'fctc')
+            except Exception as e:
+                log_error(f"Excel file validation failed for {fctc_path}", e)
+                return jsonify(format_response(False, f"FCTC file error: {describe_excel_error(e)}")), 400
+            
+            try:
+                batch = processor.process_batch(fctc_workbook, roll_call_sources)
+            finally:
+                _close_workbook(fctc_workbook)
+        finally:
+            _remove_uploads(*saved_paths)
+        
+        rosters = []
+        for label, year in zip(labels, years):
+            result = batch['rosters'][label]
+            if not result.get('success'):
+                rosters.append({'label': label, 'year': year, 'success': False, 'error': result.get('error', '')})
+                continue
+            response_data = _build_response_data(result, year, response_mode,
+                                                 dict(processor.timer.context, roster=label))
+            response_data.update(label=label, success=True)
+            if label in roster_ids:
+                response_data['roster_id'] = label
+            rosters.append(response_data)
+        
+        failed = sum(1 for roster in rosters if not roster['success'])
         return jsonify(format_response(
             True,
-            "Multi-level matching completed successfully",
-            response_data
+            f"Batch matching completed for {len(rosters) - failed} of {len(rosters)} roll calls",
+            {'total_fctc': batch['total_fctc'], 'stage_timings': batch['stage_timings'],
+             'roster_count': len(rosters), 'rosters': rosters}
         )), 200
         
     except Exception as e:
-        # Clean up files on error
+        log_error("Error processing batch", e)
+        return jsonify(format_response(False, f"Error processing batch: {str(e)}")), 500
+
+@app.route('/rosters', methods=['POST'])
+def register_roster():
+    """
+    Register a Roll Call file as a roster
+    Accepts: roll_call_file, optional label
+    Returns: roster metadata; pass its roster_id to /process instead of a Roll Call file
+    """
+    try:
+        roll_call_file = request.files.get('roll_call_file')
+        if not roll_call_file or roll_call_file.filename == '':
+            return jsonify(format_response(False, "Please select the Roll Call Excel file")), 400
+        
+        if not validate_file_extension(roll_call_file.filename, ALLOWED_EXTENSIONS):
+            return jsonify(format_response(
+                False, 
+                f"Roll Call file must be an Excel or CSV file. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
+            )), 400
+        
+        import time
+        roll_call_filename = secure_filename(sanitize_filename(roll_call_file.filename))
+        roll_call_path = os.path.join(UPLOAD_FOLDER, f"{int(time.time())}_roster_{roll_call_filename}")
+        roll_call_file.save(roll_call_path)
+        
         try:
-            if 'fctc_path' in locals() and os.path.exists(fctc_path):
-                os.remove(fctc_path)
-            if 'roll_call_path' in locals() and os.path.exists(roll_call_path):
-                os.remove(roll_call_path)
-        except:
-            pass
+            size_valid, size_msg = check_file_size(roll_call_path)
+            if not size_valid:
+                return jsonify(format_response(False, f"Roll Call file error: {size_msg}")), 400
+            
+            processor = ExamProcessor(parsed_cache=PARSED_CACHE, vectorised_joins=app.config['VECTORISED_JOINS'],
+                                      prn_fuzzy=app.config['PRN_FUZZY'], one_to_one=app.config['ONE_TO_ONE'])
+            try:
+                parsed = processor.parse_upload(roll_call_path, 'roll_call')
+            except Exception as e:
+                return jsonify(format_response(False, f"Roll Call file error: {str(e)}")), 400
+            
+            roster_info = ROSTER_STORE.register(parsed.records, processor.digest_for(roll_call_path),
+                                                source_filename=roll_call_file.filename,
+                                                label=request.form.get('label', '').strip())
+        finally:
+            _remove_uploads(roll_call_path)
         
-        log_error("Error processing files", e)
-        return jsonify(format_response(
-            False, 
-            f"Error processing files: {str(e)}"
-        )), 500
+        return jsonify(format_response(True, "Roster registered", roster_info)), 201
+        
+    except Exception as e:
+        log_error("Error registering roster", e)
+        return jsonify(format_response(False, f"Error registering roster: {str(e)}")), 500
 
-def _generate_csv_content(attendance_data):
-    """Generate CSV content from attendance data"""
-    if not attendance_data:
-        return ""
-    
-    import io
-    import csv
-    
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=attendance_data[0].keys())
-    writer.writeheader()
-    writer.writerows(attendance_data)
-    
-    return output.getvalue()
+@app.route('/rosters', methods=['GET'])
+def list_rosters():
+    """Metadata of every registered roster"""
+    return jsonify(format_response(True, "Registered rosters", {'rosters': ROSTER_STORE.list()})), 200
+
+@app.route('/rosters/<roster_id>', methods=['GET'])
+def get_roster(roster_id):
+    try:
+        return jsonify(format_response(True, "Roster found", ROSTER_STORE.metadata(roster_id))), 200
+    except RosterError as e:
+        return jsonify(format_response(False, str(e))), 404
+
+@app.route('/rosters/<roster_id>', methods=['DELETE'])
+def delete_roster(roster_id):
+    try:
+        deleted = ROSTER_STORE.delete(roster_id)
+    except RosterError as e:
+        return jsonify(format_response(False, str(e))), 404
+    if not deleted:
+        return jsonify(format_response(False, f"Unknown roster ID: {roster_id}")), 404
+    return jsonify(format_response(True, "Roster deleted", {'roster_id': roster_id})), 200
+
+@app.route('/fctc-stores/<store_id>', methods=['GET'])
+def get_fctc_store(store_id):
+    """Watermark and counts of a cumulative FCTC store"""
+    try:
+        store = FCTCStore(app.config['FCTC_STORE_DIR'], store_id)
+    except FCTCStoreError as e:
+        return jsonify(format_response(False, str(e))), 400
+    return jsonify(format_response(True, "FCTC store status", store.status())), 200
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Stage and progress of a queued /process job"""
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify(format_response(False, "Job not found or expired")), 404
+    return jsonify(format_response(True, f"Job {job.status}", job.to_dict())), 200
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """The /process response payload of a finished job"""
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify(format_response(False, "Job not found or expired")), 404
+    if job.status == 'failed':
+        if isinstance(job.exception, UploadValidationError):
+            return jsonify(format_response(False, job.error)), 400
+        return jsonify(format_response(False, f"Error processing files: {job.error}")), 500
+    if job.status != 'done':
+        return jsonify(format_response(False, f"Job is still {job.status}", job.to_dict())), 202
+    return jsonify(format_response(True, "Multi-level matching completed successfully", job.result)), 200
 
 @app.route('/debug-prn', methods=['POST'])
 def debug_prn_matching():
@@ -302,42 +777,41 @@ def debug_prn_matching():
         fctc_file.save(fctc_path)
         roll_call_file.save(roll_call_path)
         
-        # Debug analysis
-        processor = ExamProcessor()
+        # Debug analysis (shares the parsed cache with /process)
+        processor = ExamProcessor(parsed_cache=PARSED_CACHE, vectorised_joins=app.config['VECTORISED_JOINS'],
+                                  prn_fuzzy=app.config['PRN_FUZZY'], one_to_one=app.config['ONE_TO_ONE'])
         debug_info = {}
         
         try:
-            # Read and analyze FCTC file using openpyxl
-            data_rows, headers = processor._read_excel_with_header_detection(fctc_path)
-            debug_info['fctc_columns'] = headers
-            debug_info['fctc_row_count'] = len(data_rows)
-            
-            # Try to extract FCTC data
-            fctc_data = processor._extract_fctc_data(data_rows, headers)
+            # Read and extract FCTC data
+            fctc_parsed = processor.parse_upload(fctc_path, 'fctc')
+            fctc_data = fctc_parsed.records
+            debug_info['fctc_columns'] = fctc_parsed.headers
+            debug_info['fctc_row_count'] = fctc_parsed.row_count
             debug_info['fctc_extracted_count'] = len(fctc_data)
-            debug_info['fctc_sample_prns'] = [record['PRN_CLEAN'] for record in fctc_data[:5]]
+            debug_info['fctc_sample_prns'] = list(fctc_data.column('PRN_CLEAN')[:5])
             
         except Exception as e:
             debug_info['fctc_error'] = str(e)
+            _add_sheet_debug_info(processor, fctc_path, 'fctc', debug_info)
         
         try:
-            # Read and analyze Roll Call file using openpyxl
-            data_rows, headers = processor._read_excel_with_header_detection(roll_call_path)
-            debug_info['roll_call_columns'] = headers
-            debug_info['roll_call_row_count'] = len(data_rows)
-            
-            # Try to extract Roll Call data
-            roll_call_data = processor._extract_roll_call_data(data_rows, headers)
+            # Read and extract Roll Call data
+            roll_call_parsed = processor.parse_upload(roll_call_path, 'roll_call')
+            roll_call_data = roll_call_parsed.records
+            debug_info['roll_call_columns'] = roll_call_parsed.headers
+            debug_info['roll_call_row_count'] = roll_call_parsed.row_count
             debug_info['roll_call_extracted_count'] = len(roll_call_data)
-            debug_info['roll_call_sample_prns'] = [record['PRN_CLEAN'] for record in roll_call_data[:5]]
+            debug_info['roll_call_sample_prns'] = list(roll_call_data.column('PRN_CLEAN')[:5])
             
         except Exception as e:
             debug_info['roll_call_error'] = str(e)
+            _add_sheet_debug_info(processor, roll_call_path, 'roll_call', debug_info)
         
         # Compare PRNs if both extractions succeeded
         if 'fctc_sample_prns' in debug_info and 'roll_call_sample_prns' in debug_info:
-            fctc_prns = {record['PRN_CLEAN'] for record in fctc_data}
-            roll_call_prns = {record['PRN_CLEAN'] for record in roll_call_data}
+            fctc_prns = set(fctc_data.column('PRN_CLEAN'))
+            roll_call_prns = set(roll_call_data.column('PRN_CLEAN'))
             matches = fctc_prns.intersection(roll_call_prns)
             
             debug_info['fctc_unique_prns'] = len(fctc_prns)
@@ -345,6 +819,16 @@ def debug_prn_matching():
             debug_info['matching_prns'] = len(matches)
             debug_info['sample_matches'] = list(matches)[:5] if matches else []
             
+            # Unmatched roll-call PRNs one typo from an FCTC PRN (Level 1.5 recovers them with FCTC_PRN_FUZZY=on)
+            prn_trie = PrnTrie(fctc_prns)
+            near_misses = {}
+            for prn in sorted(roll_call_prns - matches):
+                close = [fctc_prn for distance, fctc_prn in prn_trie.search(prn, PRN_FUZZY_MAX_DISTANCE) if distance]
+                if close:
+                    near_misses[prn] = close
+            debug_info['near_miss_prns'] = len(near_misses)
+            debug_info['sample_near_misses'] = dict(list(near_misses.items())[:5])
+            
             # Character-level analysis of first PRNs
             if fctc_prns and roll_call_prns:
                 fctc_first = list(fctc_prns)[0]
@@ -371,6 +855,53 @@ def debug_prn_matching():
         log_error("Error in PRN debug analysis", e)
         return jsonify(format_response(False, f"Debug error: {str(e)}")), 500
 
+def _add_sheet_debug_info(processor, file_path, prefix, debug_info):
+    """Columns and row count of a sheet whose extraction failed (nothing cached for it)"""
+    try:
+        data_rows, headers = processor._read_excel_with_header_detection(file_path)
+        debug_info[f'{prefix}_columns'] = headers
+        debug_info[f'{prefix}_row_count'] = len(data_rows)
+    except Exception:
+        pass
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+def warm_up():
+    """Import the Excel readers ahead of the first upload (cheap once they are loaded)"""
+    start = time.perf_counter()
+    import openpyxl  # noqa: F401 - .xlsx reader
+    from openpyxl.reader import excel  # noqa: F401 - load_workbook's parser
+    if STARTUP_TIMINGS['warm_up_ms'] is None:
+        STARTUP_TIMINGS['warm_up_ms'] = _elapsed_ms(start)
+    return STARTUP_TIMINGS['warm_up_ms']
+
+def startup_report():
+    """Cold-start timings, whether they fit the import budget, and which deferred libraries are loaded"""
+    import_ms = STARTUP_TIMINGS['entry_import_ms'] or STARTUP_TIMINGS['app_import_ms']
+    return dict(
+        STARTUP_TIMINGS,
+        import_budget_ms=app.config['IMPORT_BUDGET_MS'],
+        within_budget=import_ms is not None and import_ms <= app.config['IMPORT_BUDGET_MS'],
+        deferred_modules_loaded={name: name in sys.modules for name in DEFERRED_MODULES}
+    )
+
+@app.before_request
+def _record_first_request():
+    if STARTUP_TIMINGS['first_request_ms'] is None:
+        STARTUP_TIMINGS['first_request_ms'] = _elapsed_ms(_IMPORT_STARTED)
+
+@app.route('/startup-report', methods=['GET'])
+def startup_report_route():
+    """Cold-start timing report"""
+    return jsonify(format_response(True, "Startup timings", startup_report())), 200
+
+@app.route('/warm-up', methods=['GET', 'POST'])
+def warm_up_route():
+    """Warm-up hook: load the Excel readers now (e.g. from a scheduled ping) instead of on the first upload"""
+    warm_up()
+    return jsonify(format_response(True, "Excel readers loaded", startup_report())), 200
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -459,6 +990,12 @@ def internal_error(e):
         "Internal server error"
     )), 500
 
+STARTUP_TIMINGS['app_import_ms'] = _elapsed_ms(_IMPORT_STARTED)
+if app.config['WARM_UP'] == 'eager':
+    warm_up()
+elif app.config['WARM_UP'] == 'background':
+    threading.Thread(target=warm_up, name='fctc-warm-up', daemon=True).start()
+
 if __name__ == '__main__':
     # Disable reloader to prevent constant restarts
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
\ No newline at end of file
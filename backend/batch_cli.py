@@ -0,0 +1,259 @@
+"""
+Headless batch runner: match every FCTC / Roll Call pair under a directory
+
+    python backend/batch_cli.py INPUT_DIR [--workers N] [--year II] [--output-dir outputs]
+
+Pairing: files whose name has the word "fctc" are FCTC exports, files with the
+word "roll" (or "roll call") are roll calls; "enrollment" or "payroll" do not
+count, and a file marked both ways is reported and skipped. A directory holding a
+single FCTC file pairs it with every roll call in that directory; otherwise files
+pair by name once those words are removed (e.g. SY_fctc.xlsx + SY_roll_call.xlsx).
+
+Outputs per pair (job): outputs/division/<job>/attendance_report_division_<div>.csv
+and outputs/department/<job>.csv; outputs/master/master_report.csv holds every
+student of every finished job. Progress is kept in outputs/batch_manifest.json, so
+an interrupted run resumes with only the unfinished or changed pairs.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from logic import ExamProcessor
+from reports import division_filename, iter_csv_content
+from utils import file_sha256
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'outputs')
+INPUT_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.tsv')
+YEAR_MAPPING = {'I': 1, 'II': 2, 'III': 3, '1': 1, '2': 2, '3': 3}
+# File-name markers, matched as whole words so "enrollment" or "payroll" is not a roll call
+FCTC_WORD = re.compile(r'(?<![a-z])fctc(?![a-z])', re.IGNORECASE)
+ROLL_CALL_WORD = re.compile(r'(?<![a-z])roll(?:[\s_-]*call)?(?![a-z])', re.IGNORECASE)
+ROLE_WORDS = re.compile(f'{FCTC_WORD.pattern}|{ROLL_CALL_WORD.pattern}', re.IGNORECASE)
+MASTER_FILENAME = 'master_report.csv'
+
+
+def _pair_key(filename: str) -> str:
+    """File stem without its FCTC / roll-call marker, used to pair the two files"""
+    stem = os.path.splitext(filename)[0]
+    return re.sub(r'[\s_\-.]+', '_', ROLE_WORDS.sub('', stem)).strip('_').lower()
+
+
+def _job_name(input_dir: str, roll_call_path: str) -> str:
+    relative = os.path.splitext(os.path.relpath(roll_call_path, input_dir))[0]
+    return re.sub(r'[^\w\-]+', '_', relative.replace(os.sep, '__')).strip('_')
+
+
+def discover_jobs(input_dir: str) -> List[Dict]:
+    """FCTC / Roll Call pairs under input_dir, as {'name', 'fctc', 'roll_call'} dicts"""
+    jobs = []
+    for directory, _, filenames in sorted(os.walk(input_dir)):
+        fctc_files, roll_call_files = [], []
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(INPUT_EXTENSIONS) or filename.startswith('~$'):
+                continue
+            stem = os.path.splitext(filename)[0]
+            is_fctc, is_roll_call = bool(FCTC_WORD.search(stem)), bool(ROLL_CALL_WORD.search(stem))
+            if is_fctc and is_roll_call:
+                print(f"⚠️  {os.path.join(directory, filename)} is marked both FCTC and Roll Call - skipped")
+            elif is_fctc:
+                fctc_files.append(filename)
+            elif is_roll_call:
+                roll_call_files.append(filename)
+
+        if len(fctc_files) == 1:
+            pairs = [(fctc_files[0], roll_call) for roll_call in roll_call_files]
+        else:
+            fctc_by_key = {_pair_key(name): name for name in fctc_files}
+            pairs = [(fctc_by_key[_pair_key(roll_call)], roll_call) for roll_call in roll_call_files
+                     if _pair_key(roll_call) in fctc_by_key]
+            for roll_call in roll_call_files:
+                if _pair_key(roll_call) not in fctc_by_key:
+                    print(f"⚠️  No FCTC file pairs with {os.path.join(directory, roll_call)} - skipped")
+
+        for fctc, roll_call in pairs:
+            roll_call_path = os.path.join(directory, roll_call)
+            jobs.append({
+                'name': _job_name(input_dir, roll_call_path),
+                'fctc': os.path.join(directory, fctc),
+                'roll_call': roll_call_path
+            })
+    return jobs
+
+
+def run_job(job: Dict, output_dir: str, year_int: int) -> Dict:
+    """Process one pair and write its division and department CSVs (worker-process entry point)"""
+    start = time.perf_counter()
+    result = ExamProcessor().process_and_generate_reports(job['fctc'], job['roll_call'], year_int)
+
+    division_dir = os.path.join(output_dir, 'division', job['name'])
+    os.makedirs(division_dir, exist_ok=True)
+    os.makedirs(os.path.join(output_dir, 'department'), exist_ok=True)
+
+    files = []
+    divisions = {}
+    all_students = []
+    for division, report_data in result['division_reports'].items():
+        path = os.path.join(division_dir, division_filename(division))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for chunk in iter_csv_content(report_data['students']):
+                f.write(chunk)
+        files.append(path)
+        all_students.extend(report_data['students'])
+        divisions[division] = {
+            'total_students': report_data['total_students'],
+            'present_count': report_data['present_count'],
+            'absent_count': report_data['absent_count']
+        }
+
+    department_path = os.path.join(output_dir, 'department', f"{job['name']}.csv")
+    with open(department_path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in iter_csv_content(all_students):
+            f.write(chunk)
+    files.append(department_path)
+
+    return {
+        'status': 'done',
+        'files': files,
+        'divisions': divisions,
+        'match_stats': result['match_stats'],
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def load_manifest(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'jobs': {}}
+
+
+def save_manifest(path: str, manifest: Dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def _is_finished(entry: Optional[Dict], job: Dict) -> bool:
+    """Done before with the same input bytes, and its output files are still there"""
+    return bool(entry) and entry.get('status') == 'done' \
+        and entry.get('fctc_sha256') == job['fctc_sha256'] \
+        and entry.get('roll_call_sha256') == job['roll_call_sha256'] \
+        and all(os.path.exists(path) for path in entry.get('files', []))
+
+
+def write_master_report(output_dir: str, manifest: Dict) -> Optional[str]:
+    """Concatenate the department CSVs of finished jobs, tagged with their job name"""
+    master_dir = os.path.join(output_dir, 'master')
+    os.makedirs(master_dir, exist_ok=True)
+    master_path = os.path.join(master_dir, MASTER_FILENAME)
+
+    writer = None
+    with open(master_path, 'w', newline='', encoding='utf-8') as out:
+        for name, entry in sorted(manifest['jobs'].items()):
+            if entry.get('status') != 'done':
+                continue
+            department_path = os.path.join(output_dir, 'department', f"{name}.csv")
+            if not os.path.exists(department_path):
+                continue
+            with open(department_path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if writer is None:
+                        writer = csv.DictWriter(out, fieldnames=['Job'] + list(row.keys()))
+                        writer.writeheader()
+                    writer.writerow(dict(row, Job=name))
+    return master_path if writer is not None else None
+
+
+def run_batch(input_dir: str, output_dir: str = DEFAULT_OUTPUT_DIR, year: str = 'I', workers: Optional[int] = None,
+              manifest_path: Optional[str] = None, force: bool = False) -> Dict:
+    """Run every pending job; returns the manifest"""
+    year_int = YEAR_MAPPING.get(year, 1)
+    manifest_path = manifest_path or os.path.join(output_dir, 'batch_manifest.json')
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+
+    jobs = discover_jobs(input_dir)
+    pending = []
+    for job in jobs:
+        job['fctc_sha256'] = file_sha256(job['fctc'])
+        job['roll_call_sha256'] = file_sha256(job['roll_call'])
+        if not force and _is_finished(manifest['jobs'].get(job['name']), job):
+            print(f"⏭️  {job['name']}: already done")
+            continue
+        pending.append(job)
+
+    print(f"📂 {len(jobs)} FCTC / Roll Call pairs found, {len(pending)} to process")
+    workers = workers or os.cpu_count() or 1
+
+    def record(job: Dict, entry: Dict) -> None:
+        entry.update(fctc=job['fctc'], roll_call=job['roll_call'], fctc_sha256=job['fctc_sha256'],
+                     roll_call_sha256=job['roll_call_sha256'], finished_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+        manifest['jobs'][job['name']] = entry
+        save_manifest(manifest_path, manifest)
+        if entry['status'] == 'done':
+            print(f"✅ {job['name']}: {len(entry['divisions'])} divisions in {entry['seconds']}s")
+        else:
+            print(f"❌ {job['name']}: {entry['error']}")
+
+    remaining = list(pending)
+    if workers > 1 and len(pending) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                futures = {executor.submit(run_job, job, output_dir, year_int): job for job in pending}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        entry = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        entry = {'status': 'failed', 'error': str(e)}
+                    record(job, entry)
+                    remaining.remove(job)
+        except (BrokenProcessPool, OSError, NotImplementedError) as e:
+            print(f"⚠️  Process pool unavailable ({str(e)}) - continuing sequentially")
+
+    for job in remaining:
+        try:
+            entry = run_job(job, output_dir, year_int)
+        except Exception as e:
+            entry = {'status': 'failed', 'error': str(e)}
+        record(job, entry)
+
+    master_path = write_master_report(output_dir, manifest)
+    if master_path:
+        print(f"📄 Master report: {master_path}")
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Match FCTC exports against roll calls for every pair in a directory")
+    parser.add_argument('input_dir', help="Directory with FCTC and Roll Call workbooks (searched recursively)")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="Base directory for division/, department/ and master/")
+    parser.add_argument('--year', default='I', help="Academic year: I, II or III")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--manifest', default=None, help="Manifest path (default: <output-dir>/batch_manifest.json)")
+    parser.add_argument('--force', action='store_true', help="Reprocess pairs already marked done in the manifest")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"Not a directory: {args.input_dir}")
+
+    manifest = run_batch(args.input_dir, args.output_dir, args.year, args.workers, args.manifest, args.force)
+    failed = [name for name, entry in manifest['jobs'].items() if entry.get('status') != 'done']
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
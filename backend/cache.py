@@ -0,0 +1,173 @@
+# In-process caches shared by the Flask endpoints
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with an optional time-to-live per entry
+    Least recently used entries are evicted once max_entries is reached, or
+    once the summed sizeof(value) exceeds max_bytes when both are given;
+    expired entries are dropped on access and on insert.
+    """
+
+    def __init__(self, max_entries: int = 32, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None, sizeof: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes if sizeof is not None else None
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired()
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    @property
+    def total_bytes(self) -> int:
+        """Summed sizeof() of the cached values (0 when no sizeof was given)"""
+        with self._lock:
+            return self._total_bytes
+
+    def _remove(self, key: Hashable) -> tuple:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry[2]
+        return entry
+
+    def _evict_expired(self) -> None:
+        if self.ttl_seconds is None:
+            return
+        now = time.monotonic()
+        expired = [key for key, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float('inf')
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        with self._lock:
+            self._evict_expired()
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return  # Larger than the whole budget: not worth evicting everything else
+            self._entries[key] = (value, expires_at, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            if self.max_bytes is not None:
+                while self._total_bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+class ResultCache:
+    """
+    Cache of /process results keyed by the SHA-256 of both uploads, the year
+    and the matcher settings. Entries live in a size-bounded in-memory LRU and,
+    when disk_dir is set, are also pickled there (oldest files pruned first)
+    so identical submissions survive a restart of the app.
+    """
+
+    def __init__(self, max_entries: int = 16, disk_dir: Optional[str] = None, max_disk_entries: int = 64):
+        self._memory = TTLCache(max_entries=max_entries)
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fctc_digest: str, roll_call_digest: str, year, settings: Dict) -> str:
+        payload = json.dumps([fctc_digest, roll_call_digest, str(year), settings], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def get(self, key: str) -> Any:
+        value = self._memory.get(key)
+        if value is not None or not self.disk_dir:
+            return value
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # Mark as recently used for disk pruning
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        self._memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._memory.set(key, value)
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write result cache entry: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove least recently used files beyond max_disk_entries"""
+        try:
+            entries = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith('.pkl')]
+            entries.sort(key=os.path.getmtime, reverse=True)
+            for path in entries[self.max_disk_entries:]:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.disk_dir, name))
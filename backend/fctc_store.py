@@ -0,0 +1,268 @@
+# Cumulative FCTC response store: ingest only responses not seen in earlier uploads
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from normalize import SLASH_TIMESTAMP_FORMATS, detect_date_order, parse_timestamp
+from records import RecordTable
+
+STORE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+MATCH_KEY_PATTERN = re.compile(r'^[0-9a-f]{16,64}$')
+
+# One lock per store directory, shared by every FCTCStore object in this process
+_STORE_LOCKS: Dict[str, threading.Lock] = {}
+_STORE_LOCKS_GUARD = threading.Lock()
+
+
+class FCTCStoreError(Exception):
+    """Invalid store ID or an upload the store cannot ingest"""
+
+
+class FCTCStore:
+    """
+    Append-only store of FCTC form responses for one exam
+    Every ingested response row is appended to responses.log; state.pkl keeps
+    the per-PRN best attempt, a digest per ingested row (so re-uploaded rows
+    are skipped) and, per roll call and matcher settings, the last match
+    results so only the roll-call entries new responses can affect are matched
+    again.
+    """
+
+    def __init__(self, directory: str, store_id: str, date_order: Optional[str] = None):
+        if not STORE_ID_PATTERN.match(store_id or ''):
+            raise FCTCStoreError(f"Invalid FCTC store ID: {store_id}")
+        if date_order is not None and date_order not in SLASH_TIMESTAMP_FORMATS:
+            raise FCTCStoreError(f"Invalid Timestamp date order: {date_order}")
+        self.store_id = store_id
+        # Fallback for uploads whose dd/mm vs mm/dd order cannot be detected
+        self.date_order = date_order
+        self.path = os.path.join(directory, store_id)
+        with _STORE_LOCKS_GUARD:
+            self.lock = _STORE_LOCKS.setdefault(os.path.abspath(self.path), threading.Lock())
+        self._state = self._load_state()
+
+    def refresh(self) -> None:
+        """Reload state.pkl; call first under self.lock, as another request may have saved since"""
+        self._state = self._load_state()
+
+    def _state_path(self) -> str:
+        return os.path.join(self.path, 'state.pkl')
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self._state_path(), 'rb') as f:
+                state = pickle.load(f)
+            if 'row_digests' not in state:
+                # Stores written before row digests: rows up to the old watermark count as ingested
+                state.update(row_digests=set(), legacy_watermark=state['watermark'])
+            return state
+        except FileNotFoundError:
+            return {
+                'layout': None,           # Projected FCTC columns (ExamProcessor._resolve_fctc_columns keys)
+                'optional_fields': None,
+                'prn_pos': None,
+                'score_pos': None,
+                'prn_scores': {},         # prn_clean → (score, projected row, prn_raw)
+                'row_digests': set(),     # _row_digest of every ingested row
+                'upload_prefix': None,    # Row count and first / last _cells_digest of the last upload
+                'watermark': None,        # Newest ingested Timestamp
+                'date_order': None,       # dd/mm vs mm/dd of text Timestamps, once detected
+                'ingested_rows': 0,
+                'batches': 0,
+                'matches': {}             # _match_key(roll-call key, matcher settings) → last match results
+            }
+
+    def _save_state(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self._state_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self._state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._state_path())
+
+    def _append_log(self, rows: List[tuple]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'responses.log'), 'ab') as f:
+            pickle.dump({'ingested_at': time.time(), 'layout': self._state['layout'], 'rows': rows}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __len__(self) -> int:
+        """Number of distinct PRNs (rows of records())"""
+        return len(self._state['prn_scores'])
+
+    @property
+    def watermark(self):
+        return self._state['watermark']
+
+    def status(self) -> Dict:
+        watermark = self._state['watermark']
+        return {
+            'store_id': self.store_id,
+            'prn_count': len(self),
+            'ingested_rows': self._state['ingested_rows'],
+            'batches': self._state['batches'],
+            'watermark': watermark.isoformat() if watermark else None
+        }
+
+    def ingest(self, processor, source) -> Dict:
+        """
+        Append the responses of an FCTC upload that earlier uploads did not contain
+        Rows are recognised by content (_row_digest), not by Timestamp, so responses
+        sharing a second or arriving out of order are kept. Form exports only grow, so
+        when the upload starts with the previous upload's rows (same first and last
+        row) those are skipped without parsing or hashing; an upload whose boundary rows
+        differ is checked row by row. `source` is a path or WorkbookRows; returns counts
+        plus the set of PRNs whose best attempt changed ('changed_prns'). Call with
+        self.lock held, after refresh().
+        """
+        if isinstance(source, str):
+            data_rows, headers = processor._open_workbook_rows(source)
+        else:
+            data_rows, headers = source.data_rows, source.headers
+
+        column_indices, prn_pos, score_pos, optional_fields = processor._fctc_layout(headers)
+        if 'timestamp' not in column_indices:
+            raise FCTCStoreError("Incremental FCTC ingestion needs a Timestamp column in the FCTC file")
+        layout = list(column_indices)
+        if self._state['layout'] is None:
+            self._state.update(layout=layout, optional_fields=optional_fields, prn_pos=prn_pos, score_pos=score_pos)
+        elif self._state['layout'] != layout:
+            raise FCTCStoreError(
+                f"FCTC columns changed since store '{self.store_id}' was created "
+                f"(was {self._state['layout']}, now {layout}); use a new store ID")
+
+        timestamp_pos = layout.index('timestamp')
+        rows = list(processor._project_rows(data_rows, column_indices))
+        prefix = self._state.get('upload_prefix')
+        start = 0
+        if (prefix and len(rows) >= prefix['rows'] and _cells_digest(rows[0]) == prefix['first']
+                and _cells_digest(rows[prefix['rows'] - 1]) == prefix['last']):
+            start = prefix['rows']
+        date_order = self._date_order(row[timestamp_pos] for row in rows[start:])
+        row_digests = self._state['row_digests']
+        legacy_watermark = self._state.get('legacy_watermark')
+        new_rows = []
+        new_digests = set()
+        newest = self._state['watermark']
+        skipped_rows = start
+        untimed_rows = 0
+        for row in rows[start:]:
+            timestamp = parse_timestamp(row[timestamp_pos], date_order)
+            if timestamp is None:
+                untimed_rows += 1
+                continue
+            digest = _row_digest(row, timestamp_pos, timestamp)
+            if digest in row_digests or digest in new_digests or (
+                    legacy_watermark is not None and timestamp <= legacy_watermark):
+                skipped_rows += 1
+                continue
+            new_digests.add(digest)
+            new_rows.append(row)
+            if newest is None or timestamp > newest:
+                newest = timestamp
+
+        changed_prns = set()
+        upload_prefix = {'rows': len(rows), 'first': _cells_digest(rows[0]),
+                         'last': _cells_digest(rows[-1])} if rows else prefix
+        if new_rows:
+            processor._merge_best_attempts(new_rows, prn_pos, score_pos, self._state['prn_scores'], changed_prns)
+            self._append_log(new_rows)
+            row_digests.update(new_digests)
+            self._state['watermark'] = newest
+            self._state['ingested_rows'] += len(new_rows)
+            self._state['batches'] += 1
+        if new_rows or upload_prefix != prefix:
+            self._state['upload_prefix'] = upload_prefix
+            self._save_state()
+
+        if not self._state['prn_scores']:
+            raise FCTCStoreError("❌ FCTC FILE ERROR: No valid data rows found with PRN, Score and Timestamp")
+
+        return {
+            'new_rows': len(new_rows),
+            'skipped_rows': skipped_rows,
+            'untimed_rows': untimed_rows,
+            'changed_prns': changed_prns
+        }
+
+    def _date_order(self, timestamps) -> Optional[str]:
+        """
+        dd/mm vs mm/dd order of one upload's text Timestamps, decided once for the whole file
+        Detected from dates with a field above 12, else the order an earlier upload to this
+        store showed, else the store's configured date_order. Ambiguous text dates with
+        none of these are rejected rather than guessed.
+        """
+        timestamps = list(timestamps)
+        try:
+            detected = detect_date_order(timestamps)
+        except ValueError as e:
+            raise FCTCStoreError(f"❌ FCTC FILE ERROR: {e}")
+        known = self._state.get('date_order')
+        if detected and known and detected != known:
+            raise FCTCStoreError(
+                f"❌ FCTC FILE ERROR: Timestamps are {detected.replace('_', '-')} but earlier uploads to "
+                f"store '{self.store_id}' were {known.replace('_', '-')}")
+        if detected:
+            self._state['date_order'] = detected
+        date_order = detected or known or self.date_order
+        if date_order is None and any(
+                isinstance(value, str) and parse_timestamp(value) is None and parse_timestamp(value, 'day_first')
+                for value in timestamps):
+            raise FCTCStoreError(
+                "❌ FCTC FILE ERROR: Cannot tell whether Timestamps are dd/mm/yyyy or mm/dd/yyyy "
+                "(no day above 12); set FCTC_DATE_ORDER to day_first or month_first")
+        return date_order
+
+    def records(self, processor) -> RecordTable:
+        """Best attempt per PRN, same layout as ExamProcessor._extract_fctc_data"""
+        return processor._fctc_table(self._state['prn_scores'], self._state['optional_fields'])
+
+    def match_state(self, roll_call_key: str, settings: Dict) -> Optional[Dict]:
+        """
+        Last match results for a roll call under the same matcher settings
+        (ExamProcessor.matcher_settings): fctc_count, roll_count, matched_rows,
+        match_methods, contests (roll row → 'contested' / 'preclaimed'). Other settings
+        get None (a full match).
+        """
+        key = _match_key(roll_call_key, settings)
+        return self._state['matches'].get(key) if key else None
+
+    def save_match_state(self, roll_call_key: str, settings: Dict, fctc_count: int,
+                         matched_rows: List[Optional[int]], match_methods: List[str],
+                         contests: Optional[Dict[int, str]] = None) -> None:
+        key = _match_key(roll_call_key, settings)
+        if not key:
+            return
+        self._state['matches'][key] = {
+            'fctc_count': fctc_count,
+            'roll_count': len(matched_rows),
+            'matched_rows': list(matched_rows),
+            'match_methods': list(match_methods),
+            'contests': dict(contests or {})
+        }
+        self._save_state()
+
+
+def _row_digest(row: tuple, timestamp_pos: int, timestamp) -> bytes:
+    """Identity of a response row: its parsed Timestamp plus every other projected cell"""
+    cells = [timestamp.isoformat()]
+    cells.extend('' if value is None else str(value) for pos, value in enumerate(row) if pos != timestamp_pos)
+    return hashlib.blake2b('\x1f'.join(cells).encode('utf-8'), digest_size=16).digest()
+
+
+def _cells_digest(row: tuple) -> bytes:
+    """Identity of a projected row exactly as read (no Timestamp parsing), for the upload prefix check"""
+    cells = ('' if value is None else f"{type(value).__name__}:{value}" for value in row)
+    return hashlib.blake2b('\x1f'.join(cells).encode('utf-8'), digest_size=16).digest()
+
+
+def _match_key(roll_call_key: str, settings: Dict) -> Optional[str]:
+    """Match-state key of a roll call (hex digest) under the given matcher settings; None if invalid"""
+    if not MATCH_KEY_PATTERN.match(roll_call_key or ''):
+        return None
+    payload = json.dumps([roll_call_key, settings], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
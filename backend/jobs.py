@@ -0,0 +1,97 @@
+# In-process background job queue for long /process runs (no external broker)
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from cache import TTLCache
+
+# Pipeline stages in order; ExamProcessor reports the middle four through its progress callback
+JOB_STAGES = ('queued', 'parsing_fctc', 'parsing_roll_call', 'matching', 'building_reports', 'done')
+
+
+class Job:
+    """Status, current stage and outcome of one queued pipeline run"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = 'queued'  # queued → running → done / failed
+        self.stage = 'queued'
+        self.stage_fraction: Optional[float] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.exception: Optional[Exception] = None
+        self._lock = threading.Lock()
+
+    def update(self, stage: str, fraction: Optional[float] = None) -> None:
+        """Progress callback handed to ExamProcessor(progress=...)"""
+        with self._lock:
+            self.stage = stage
+            self.stage_fraction = fraction
+
+    def progress(self) -> float:
+        """Overall progress in [0, 1] from the stage position (and the fraction within it)"""
+        if self.status == 'done':
+            return 1.0
+        position = JOB_STAGES.index(self.stage) if self.stage in JOB_STAGES else 0
+        within = self.stage_fraction or 0.0
+        return round(min((position + within) / (len(JOB_STAGES) - 1), 1.0), 3)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            now = self.finished_at or time.time()
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'stage': self.stage,
+                'stage_progress': self.stage_fraction,
+                'progress': self.progress(),
+                'stages': list(JOB_STAGES),
+                'elapsed_seconds': round(now - (self.started_at or now), 3),
+                'error': self.error
+            }
+
+
+class JobQueue:
+    """
+    Thread pool plus a bounded, expiring job table
+    Worker threads keep progress callbacks and results in this process, so no
+    broker or shared storage is needed; ExamProcessor can still parse in worker
+    processes itself (parallel_parse). Jobs live only as long as the app process.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 256, ttl_seconds: Optional[float] = 60 * 60):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fctc-job')
+        self._jobs = TTLCache(max_entries=max_jobs, ttl_seconds=ttl_seconds)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queue fn(*args, progress=job.update, **kwargs); its return value becomes job.result"""
+        job = Job(uuid.uuid4().hex)
+        self._jobs.set(job.job_id, job)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[..., Any], args, kwargs) -> None:
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, progress=job.update, **kwargs)
+            job.update('done')
+            job.status = 'done'
+        except Exception as e:
+            print(f"❌ Job {job.job_id} failed: {str(e)}")
+            traceback.print_exc()
+            job.error = str(e)
+            job.exception = e
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
@@ -0,0 +1,71 @@
+# Vectorised hash joins for the exact-key matching levels (Level 1 PRN, Level 3 Roll No + Division)
+# numpy / pandas are imported on first use; without them logic.py keeps its row loop
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Roll calls smaller than this are joined row by row in automatic mode. Object-dtype
+# keys hash no faster in pandas than in a dict, so the joins only pay off once the
+# per-row Python work dominates (~100k rows: 0.05s vs 0.07s; below that the dict wins)
+VECTORISED_JOIN_MIN_ROWS = 100_000
+
+_available: Optional[bool] = None
+
+
+def vectorised_joins_available() -> bool:
+    """True when numpy and pandas can be imported (checked once)"""
+    global _available
+    if _available is None:
+        try:
+            import numpy  # noqa: F401
+            import pandas  # noqa: F401
+            _available = True
+        except ImportError:
+            _available = False
+    return _available
+
+
+def _probe(lookup: Dict[str, int], keys):
+    """FCTC row per key (-1 when absent) via one hash-table probe over the whole column"""
+    import numpy as np
+    import pandas as pd
+
+    if not lookup:
+        return np.full(len(keys), -1, dtype=np.int64)
+    # Dict keys are unique, so the index needs no de-duplication
+    index = pd.Index(list(lookup), dtype=object)
+    fctc_rows = np.fromiter(lookup.values(), dtype=np.int64, count=len(lookup))
+    positions = index.get_indexer(keys)
+    return np.where(positions >= 0, fctc_rows[positions], -1)
+
+
+def _split(roll_rows, found) -> Tuple[List[int], List[int], List[int]]:
+    hit = found >= 0
+    return roll_rows[hit].tolist(), found[hit].tolist(), roll_rows[~hit].tolist()
+
+
+def join_column(lookup: Dict[str, int], column: Sequence[str],
+                roll_rows: Sequence[int]) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Join column[roll_rows] against lookup (key → FCTC row) in one batch
+    Returns (matched roll rows, their FCTC rows, unmatched roll rows), each in roll_rows order.
+    Blank keys never match, as in the row loop (lookups hold no blank keys).
+    """
+    import numpy as np
+
+    roll_rows = np.asarray(roll_rows, dtype=np.int64)
+    keys = np.asarray(column, dtype=object)[roll_rows]
+    return _split(roll_rows, _probe(lookup, keys))
+
+
+def join_column_pair(lookup: Dict[str, int], first: Sequence[str], second: Sequence[str],
+                     roll_rows: Sequence[int], separator: str = '_') -> Tuple[List[int], List[int], List[int]]:
+    """join_column on the composite key f"{first}{separator}{second}"; rows with either part blank never match"""
+    import numpy as np
+    import pandas as pd
+
+    roll_rows = np.asarray(roll_rows, dtype=np.int64)
+    first_keys = pd.Series(np.asarray(first, dtype=object)[roll_rows])
+    second_keys = pd.Series(np.asarray(second, dtype=object)[roll_rows])
+    keys = (first_keys + separator + second_keys).to_numpy(dtype=object)
+    found = _probe(lookup, keys)
+    both_present = ((first_keys != '') & (second_keys != '')).to_numpy()
+    return _split(roll_rows, np.where(both_present, found, -1))
@@ -1,8 +1,97 @@
 # Business logic for FCTC exam automation - MULTI-LEVEL MATCHING PIPELINE
-import openpyxl
+# openpyxl, pandas and the process pool are imported where they are first used, so
+# importing this module (and app.py with it) stays cheap on a serverless cold start
+import csv
+import operator
 import os
-import re
-from typing import Dict, List, Tuple, Optional
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Optional
+
+from joins import VECTORISED_JOIN_MIN_ROWS, join_column, join_column_pair, vectorised_joins_available
+from matching import BlockedNameIndex, PrnTrie, division_block
+from normalize import Normalizer
+from records import RecordTable
+from timing import StageTimer
+from utils import FileFormatError, file_sha256, sniff_text_format, sniff_upload
+
+# Jaccard similarity needed for a Level 2 fuzzy name match
+NAME_MATCH_THRESHOLD = 0.8
+
+# Number of leading non-empty rows scanned when looking for the header row
+HEADER_SCAN_ROWS = 10
+# Roll-call rows matched between two progress callbacks
+PROGRESS_EVERY_ROWS = 250
+# Level 2 candidates (FCTC rows) kept per roll-call row for the one-to-one assignment
+NAME_CANDIDATES_PER_ROW = 5
+# Level 1.5: largest PRN edit distance recovered, and the shortest PRN it is tried on
+PRN_FUZZY_MAX_DISTANCE = 1
+PRN_FUZZY_MIN_LENGTH = 6
+
+# Column layout of extracted Roll Call tables
+ROLL_CALL_FIELDS = ('PRN_RAW', 'PRN_CLEAN', 'Roll_No', 'Name', 'Division')
+
+
+class WorkbookReadError(Exception):
+    """Raised when the reader chosen for a workbook cannot parse it"""
+
+
+class WorkbookRows:
+    """
+    An opened upload: detected header plus a one-shot iterator over data rows
+    Returned by ExamProcessor.open_workbook so the validation step can hand the
+    already-parsed stream to read_*_excel instead of reopening the file.
+    """
+    
+    def __init__(self, file_path: str, file_format: str, headers: List[str], data_rows: Iterator[List],
+                 sheet_names: Optional[List[str]] = None):
+        self.file_path = file_path
+        self.file_format = file_format
+        self.headers = headers
+        self.data_rows = data_rows
+        # Visible sheets of the workbook (the rows above come from the active / first one)
+        self.sheet_names = sheet_names or []
+    
+    def close(self) -> None:
+        """Release the underlying workbook if the rows were not fully consumed"""
+        close = getattr(self.data_rows, 'close', None)
+        if close:
+            close()
+
+class ParsedUpload:
+    """Extracted records of one upload plus the sheet facts /debug-prn reports"""
+    
+    def __init__(self, kind: str, headers: List[str], row_count: int, records: RecordTable,
+                 sheets: Optional[List[str]] = None, duplicate_prns: int = 0):
+        self.kind = kind
+        self.headers = headers
+        self.row_count = row_count
+        self.records = records
+        # Sheets the records came from, and rows dropped because an earlier sheet
+        # already had their PRN (multi-sheet roll calls only)
+        self.sheets = sheets or []
+        self.duplicate_prns = duplicate_prns
+    
+    def sheet_stats(self) -> Dict:
+        """match_stats entries of a multi-sheet roll call (empty for one sheet)"""
+        if not self.sheets:
+            return {}
+        return {'roll_call_sheets': list(self.sheets), 'roll_call_duplicate_prns': self.duplicate_prns}
+    
+    def approx_nbytes(self) -> int:
+        return self.records.approx_nbytes() + sum(len(str(header)) for header in self.headers)
+
+def _parse_roll_call_sheet_worker(file_path: str, sheet_name: str, streaming: bool, context: Dict) -> Tuple:
+    """Process-pool entry point: extract one roll-call sheet (see ExamProcessor._parse_roll_call_sheet), plus its stage timings"""
+    processor = ExamProcessor(streaming=streaming, timer=StageTimer(context))
+    return processor._parse_roll_call_sheet(file_path, sheet_name) + (processor.timer.stages,)
+
+def _parse_upload_worker(kind: str, file_path: str, streaming: bool, context: Dict) -> Tuple[ParsedUpload, float, Dict]:
+    """Process-pool entry point: parse one upload, return (parsed upload, seconds, stage timings)"""
+    processor = ExamProcessor(streaming=streaming, timer=StageTimer(context))
+    start = time.perf_counter()
+    parsed = processor.parse_upload(file_path, kind)
+    return parsed, time.perf_counter() - start, processor.timer.stages
+
 
 class ExamProcessor:
     """
@@ -30,6 +119,7 @@ class ExamProcessor:
     
     MATCHING STRATEGY (Multi-Level):
     1. Level 1: PRN matching (primary, most reliable)
+       Level 1.5 (optional, prn_fuzzy=True): PRN one typo away, reported as "PRN_Fuzzy"
     2. Level 2: Name matching with fuzzy logic (handles typos, 80% similarity threshold)
     3. Level 3: Roll No + Division matching (unique combination per division)
     
@@ -45,229 +135,247 @@ class ExamProcessor:
     9. Output includes "Match_Method" column showing how each student was matched
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, streaming: bool = True, parallel_parse: bool = False, parsed_cache=None,
+                 progress: Optional[Callable[[str, Optional[float]], None]] = None,
+                 timer: Optional[StageTimer] = None, vectorised_joins: Optional[bool] = None,
+                 name_blocking: bool = True, prn_fuzzy: bool = False, one_to_one: bool = True):
+        # streaming=True reads .xlsx sheets row by row in openpyxl read-only mode;
+        # streaming=False loads the whole workbook first (slower, more memory)
+        self.streaming = streaming
+        # parallel_parse=True parses the FCTC and Roll Call files in two worker
+        # processes (sequential when only one core is available)
+        self.parallel_parse = parallel_parse
+        # Memoised cleaners; reset for every process_and_generate_reports call
+        self.normalizer = Normalizer()
+        # Optional cache (get/set, e.g. cache.TTLCache) of ParsedUpload keyed by
+        # (file SHA-256, kind), shared by every processor the app creates
+        self.parsed_cache = parsed_cache
+        self._file_digests: Dict[str, str] = {}
+        # Optional progress(stage, fraction) callback: parsing_fctc, parsing_roll_call,
+        # matching (with the fraction of roll-call rows done) and building_reports
+        self.progress = progress
+        # Per-stage seconds and row counts, reported as match_stats['stage_timings']
+        self.timer = timer or StageTimer()
+        # Level 1 / Level 3 as batched hash joins over whole columns (joins.py): True,
+        # False (row loop), or None to use them for large roll calls when pandas is installed
+        self.vectorised_joins = vectorised_joins
+        # Level 2 fuzzy candidates from the roll-call row's own division first, widening
+        # to every FCTC name only when none reaches the threshold (False: always everyone)
+        self.name_blocking = name_blocking
+        # Level 1.5: PRNs one typo away from an unclaimed FCTC PRN match as "PRN_Fuzzy"
+        self.prn_fuzzy = prn_fuzzy
+        # Levels 2 and 3 give an FCTC row to at most one roll-call row (False: every row
+        # takes its own best match, so two students may share a response; see README)
+        self.one_to_one = one_to_one
     
-    def _read_excel_with_header_detection(self, file_path: str) -> Tuple[List[List], List[str]]:
+    def _report_progress(self, stage: str, fraction: Optional[float] = None) -> None:
+        if self.progress is not None:
+            self.progress(stage, fraction)
+    
+    def _use_vectorised_joins(self, row_count: int) -> bool:
+        if self.vectorised_joins is False:
+            return False
+        if self.vectorised_joins is None and row_count < VECTORISED_JOIN_MIN_ROWS:
+            return False
+        return vectorised_joins_available()
+    
+    def matcher_settings(self) -> Dict:
+        """Settings that change matching results (part of result cache keys)"""
+        return {
+            'name_match_threshold': NAME_MATCH_THRESHOLD,
+            'name_match_selection': 'best_score',
+            'name_blocking': self.name_blocking,
+            'prn_fuzzy': self.prn_fuzzy,
+            'one_to_one': self.one_to_one,
+            'vectorised_joins': self.vectorised_joins
+        }
+    
+    @staticmethod
+    def _detect_header_row(rows: List[List]) -> int:
+        """Index of the row with the most non-empty string cells (first wins on ties)"""
+        header_row_idx = 0
+        max_string_count = 0
+        
+        for i, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+            string_count = sum(1 for cell in row if isinstance(cell, str) and cell.strip())
+            if string_count > max_string_count:
+                max_string_count = string_count
+                header_row_idx = i
+        
+        return header_row_idx
+    
+    def _split_header(self, rows: Iterator, close: Optional[Callable[[], None]] = None) -> Tuple[Iterator[List], List[str]]:
         """
-        Read Excel file and detect header row automatically with multiple fallback methods
-        Returns: (data_rows, header_row)
+        Detect the header in a raw row iterator and return (data_row_iterator, header_row)
+        Only the first HEADER_SCAN_ROWS non-empty rows are buffered; the rest are
+        yielded one at a time. Reader errors surface as WorkbookReadError.
         """
-        print(f"🔍 Attempting to read Excel file: {file_path}")
+        start = time.perf_counter()
+        try:
+            leading_rows = []
+            for row in rows:
+                if any(cell is not None for cell in row):  # Skip completely empty rows
+                    leading_rows.append(list(row))
+                    if len(leading_rows) >= HEADER_SCAN_ROWS:
+                        break
+        except Exception as e:
+            if close:
+                close()
+            raise WorkbookReadError(str(e))
+        
+        if not leading_rows:
+            if close:
+                close()
+            raise Exception("Excel file is empty")
+        
+        header_row_idx = self._detect_header_row(leading_rows)
+        headers = [str(cell).strip() if cell is not None else "" for cell in leading_rows[header_row_idx]]
+        
+        def data_rows():
+            try:
+                yield from leading_rows[header_row_idx + 1:]
+                for row in rows:
+                    if any(cell is not None for cell in row):
+                        yield list(row)
+            except Exception as e:
+                raise WorkbookReadError(str(e))
+            finally:
+                if close:
+                    close()
+        
+        self.timer.record('header_detection', time.perf_counter() - start, rows=len(leading_rows))
+        print(f"✅ Found {len(headers)} columns (header at row {header_row_idx + 1})")
+        return data_rows(), headers
+    
+    @staticmethod
+    def _visible_sheet_names(workbook) -> List[str]:
+        return [sheet.title for sheet in workbook.worksheets if getattr(sheet, 'sheet_state', 'visible') == 'visible']
+    
+    def _stream_excel_with_header_detection(self, file_path: str, sheet_name: Optional[str] = None) -> Tuple[Iterator[List], List[str], List[str]]:
+        """
+        Stream one .xlsx sheet (default: active) in read-only mode, so memory stays flat in the file size
+        Returns: (data_row_iterator, header_row, visible_sheet_names)
+        """
+        print(f"📖 Streaming Excel file (read-only): {file_path}" + (f" [{sheet_name}]" if sheet_name else ""))
+        
+        f = None
+        try:
+            import openpyxl
+            # Opened here, not by path: openpyxl rejects paths by extension (a workbook saved as .csv)
+            f = open(file_path, 'rb')
+            workbook = openpyxl.load_workbook(f, read_only=True, data_only=True)
+            sheet = workbook[sheet_name] if sheet_name else workbook.active
+            # Some exporters write a wrong <dimension>; recompute it while streaming
+            sheet.reset_dimensions()
+            rows = sheet.iter_rows(values_only=True)
+            sheet_names = self._visible_sheet_names(workbook)
+        except Exception as e:
+            if f is not None:
+                f.close()
+            raise WorkbookReadError(str(e))
+        
+        def close() -> None:
+            workbook.close()
+            f.close()
+        
+        return self._split_header(rows, close) + (sheet_names,)
+    
+    def _load_excel_with_header_detection(self, file_path: str, sheet_name: Optional[str] = None) -> Tuple[Iterator[List], List[str], List[str]]:
+        """Load the whole .xlsx workbook, then iterate one sheet (default: active; streaming=False)"""
+        print(f"📖 Loading Excel file: {file_path}" + (f" [{sheet_name}]" if sheet_name else ""))
+        
+        try:
+            import openpyxl
+            with open(file_path, 'rb') as f:
+                workbook = openpyxl.load_workbook(f, data_only=True)
+            sheet = workbook[sheet_name] if sheet_name else workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            sheet_names = self._visible_sheet_names(workbook)
+        except Exception as e:
+            raise WorkbookReadError(str(e))
+        
+        return self._split_header(rows, workbook.close) + (sheet_names,)
+    
+    def _read_xls_with_header_detection(self, file_path: str, sheet_name: Optional[str] = None) -> Tuple[Iterator[List], List[str], List[str]]:
+        """Read one sheet (default: first) of a legacy .xls workbook through pandas (openpyxl cannot open BIFF files)"""
+        print(f"📖 Reading legacy .xls file: {file_path}" + (f" [{sheet_name}]" if sheet_name else ""))
         
-        # Method 1: Try with pandas if available (most robust for problematic files)
         try:
-            print("📖 Method 1: Trying pandas (if available)...")
             import pandas as pd
-            
-            # Try reading with pandas first (handles most Excel issues)
-            df = pd.read_excel(file_path, header=None)
-            
-            if df.empty:
-                raise Exception("Excel file is empty")
-            
-            # Convert DataFrame to list of lists
-            all_rows = df.values.tolist()
-            
-            # Find header row (look for row with most non-empty string values)
-            header_row_idx = 0
-            max_string_count = 0
-            
-            for i, row in enumerate(all_rows[:10]):  # Check first 10 rows
-                string_count = sum(1 for cell in row if isinstance(cell, str) and str(cell).strip())
-                if string_count > max_string_count:
-                    max_string_count = string_count
-                    header_row_idx = i
-            
-            headers = [str(cell).strip() if cell is not None and str(cell) != 'nan' else "" for cell in all_rows[header_row_idx]]
-            data_rows = all_rows[header_row_idx + 1:]
-            
-            print(f"✅ Method 1 successful: Found {len(headers)} columns, {len(data_rows)} data rows")
-            return data_rows, headers
-            
         except ImportError:
-            print("📝 pandas not available - using openpyxl methods")
-        except Exception as e1:
-            print(f"❌ Method 1 failed: {str(e1)}")
+            raise WorkbookReadError("Legacy .xls files need pandas and xlrd installed. "
+                                    "Please save the file as .xlsx and upload it again.")
         
-        # Method 2: Try with openpyxl (data_only=True) - Enhanced for XML issues
         try:
-            print("📖 Method 2: Trying openpyxl (data_only=True)...")
-            
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            sheet = workbook.active
-            
-            # Get all rows as lists
-            all_rows = []
-            for row in sheet.iter_rows(values_only=True):
-                if any(cell is not None for cell in row):  # Skip completely empty rows
-                    all_rows.append(list(row))
-            
-            workbook.close()
-            
-            if not all_rows:
-                raise Exception("Excel file is empty")
-            
-            # Find header row
-            header_row_idx = 0
-            max_string_count = 0
-            
-            for i, row in enumerate(all_rows[:10]):
-                string_count = sum(1 for cell in row if isinstance(cell, str) and cell.strip())
-                if string_count > max_string_count:
-                    max_string_count = string_count
-                    header_row_idx = i
-            
-            headers = [str(cell).strip() if cell is not None else "" for cell in all_rows[header_row_idx]]
-            data_rows = all_rows[header_row_idx + 1:]
-            
-            print(f"✅ Method 2 successful: Found {len(headers)} columns, {len(data_rows)} data rows")
-            return data_rows, headers
-            
-        except Exception as e2:
-            print(f"❌ Method 2 failed: {str(e2)}")
-            
-            # Method 3: Try with openpyxl (data_only=False)
-            try:
-                print("📖 Method 3: Trying openpyxl (data_only=False)...")
-                
-                workbook = openpyxl.load_workbook(file_path, data_only=False)
-                sheet = workbook.active
-                
-                # Get all rows as lists
-                all_rows = []
-                for row in sheet.iter_rows(values_only=True):
-                    if any(cell is not None for cell in row):
-                        all_rows.append(list(row))
-                
-                workbook.close()
-                
-                if not all_rows:
-                    raise Exception("Excel file is empty")
-                
-                # Find header row
-                header_row_idx = 0
-                max_string_count = 0
-                
-                for i, row in enumerate(all_rows[:10]):
-                    string_count = sum(1 for cell in row if isinstance(cell, str) and cell.strip())
-                    if string_count > max_string_count:
-                        max_string_count = string_count
-                        header_row_idx = i
-                
-                headers = [str(cell).strip() if cell is not None else "" for cell in all_rows[header_row_idx]]
-                data_rows = all_rows[header_row_idx + 1:]
-                
-                print(f"✅ Method 3 successful: Found {len(headers)} columns, {len(data_rows)} data rows")
-                return data_rows, headers
-                
-            except Exception as e3:
-                print(f"❌ Method 3 failed: {str(e3)}")
-                
-                # Method 4: Try reading with read_only mode and ignore XML errors
-                try:
-                    print("📖 Method 4: Trying openpyxl read-only mode...")
-                    
-                    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-                    sheet = workbook.active
-                    
-                    all_rows = []
-                    for row in sheet.iter_rows(values_only=True):
-                        if any(cell is not None for cell in row):
-                            all_rows.append(list(row))
-                    
-                    workbook.close()
-                    
-                    if not all_rows:
-                        raise Exception("Excel file is empty")
-                    
-                    # Find header row
-                    header_row_idx = 0
-                    max_string_count = 0
-                    
-                    for i, row in enumerate(all_rows[:10]):
-                        string_count = sum(1 for cell in row if isinstance(cell, str) and cell.strip())
-                        if string_count > max_string_count:
-                            max_string_count = string_count
-                            header_row_idx = i
-                    
-                    headers = [str(cell).strip() if cell is not None else "" for cell in all_rows[header_row_idx]]
-                    data_rows = all_rows[header_row_idx + 1:]
-                    
-                    print(f"✅ Method 4 successful: Found {len(headers)} columns, {len(data_rows)} data rows")
-                    return data_rows, headers
-                    
-                except Exception as e4:
-                    print(f"❌ Method 4 failed: {str(e4)}")
-                    
-                    # Method 5: Try with minimal openpyxl settings and error tolerance
-                    try:
-                        print("📖 Method 5: Trying openpyxl with error tolerance...")
-                        
-                        # Try to load with minimal settings
-                        import tempfile
-                        import shutil
-                        
-                        # Create a temporary copy
-                        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp_file:
-                            shutil.copy2(file_path, tmp_file.name)
-                            tmp_path = tmp_file.name
-                        
-                        try:
-                            # Try different openpyxl configurations
-                            for keep_vba in [False, True]:
-                                for keep_links in [False, True]:
-                                    try:
-                                        wb = openpyxl.load_workbook(
-                                            tmp_path, 
-                                            read_only=False, 
-                                            keep_vba=keep_vba,
-                                            data_only=True,
-                                            keep_links=keep_links
-                                        )
-                                        ws = wb.active
-                                        
-                                        all_rows = []
-                                        for row in ws.iter_rows(values_only=True, max_row=1000):  # Limit rows to avoid memory issues
-                                            if any(cell is not None for cell in row):
-                                                all_rows.append(list(row))
-                                        
-                                        wb.close()
-                                        
-                                        if all_rows:
-                                            # Find header row
-                                            header_row_idx = 0
-                                            max_string_count = 0
-                                            
-                                            for i, row in enumerate(all_rows[:10]):
-                                                string_count = sum(1 for cell in row if isinstance(cell, str) and cell.strip())
-                                                if string_count > max_string_count:
-                                                    max_string_count = string_count
-                                                    header_row_idx = i
-                                            
-                                            headers = [str(cell).strip() if cell is not None else "" for cell in all_rows[header_row_idx]]
-                                            data_rows = all_rows[header_row_idx + 1:]
-                                            
-                                            print(f"✅ Method 5 successful: Found {len(headers)} columns, {len(data_rows)} data rows")
-                                            return data_rows, headers
-                                    except:
-                                        continue
-                            
-                            raise Exception("All openpyxl configurations failed")
-                            
-                        finally:
-                            # Clean up temp file
-                            try:
-                                os.unlink(tmp_path)
-                            except:
-                                pass
-                                
-                    except Exception as e5:
-                        print(f"❌ Method 5 failed: {str(e5)}")
-                        
-                        # All methods failed - provide comprehensive error message
-                        error_details = f"""
-❌ All Excel reading methods failed. This appears to be a severely corrupted Excel file.
+            with pd.ExcelFile(file_path) as workbook:
+                sheet_names = [str(name) for name in workbook.sheet_names]
+                df = workbook.parse(sheet_name if sheet_name else 0, header=None, dtype=object)
+            # Use None for empty cells, like openpyxl
+            df = df.astype(object).where(df.notna(), None)
+            rows = iter(df.values.tolist())
+        except Exception as e:
+            raise WorkbookReadError(str(e))
+        
+        return self._split_header(rows) + (sheet_names,)
+    
+    def _read_delimited_with_header_detection(self, file_path: str,
+                                              text_format: Optional[Tuple[str, str]] = None) -> Tuple[Iterator[List], List[str], List[str]]:
+        """
+        Read a CSV / TSV upload with the csv module's C parser
+        text_format is the (encoding, delimiter) from sniff_upload; it is only sniffed
+        here when not given. Cells are strings, as in the form export; blank cells stay ''
+        and blank lines are dropped.
+        """
+        encoding, delimiter = text_format or sniff_text_format(file_path)
+        print(f"📖 Reading delimited text file ({encoding}, {delimiter!r}): {file_path}")
+        
+        try:
+            f = open(file_path, 'r', encoding=encoding, errors='replace', newline='')
+            # filter(any, ...) drops blank lines without a Python-level loop
+            rows = filter(any, csv.reader(f, delimiter=delimiter))
+        except Exception as e:
+            raise WorkbookReadError(str(e))
+        
+        return self._split_header(rows, f.close) + ([],)
+    
+    def _open_workbook_rows(self, file_path: str) -> Tuple[Iterator[List], List[str]]:
+        """
+        Sniff the file format once and open it with the single reader that handles it
+        Returns: (data_row_iterator, header_row)
+        """
+        workbook = self.open_workbook(file_path)
+        return workbook.data_rows, workbook.headers
+    
+    def open_workbook(self, file_path: str, sheet_name: Optional[str] = None) -> WorkbookRows:
+        """
+        Open an upload (its active sheet unless sheet_name is given; CSV / TSV as is) and detect the
+        header without reading past the first rows. Raises FileFormatError /
+        WorkbookReadError for unreadable files and a plain Exception for empty
+        sheets, so callers can use it as validation.
+        """
+        start = time.perf_counter()
+        scanned = self.timer.seconds('header_detection')
+        file_format, text_format = sniff_upload(file_path)
+        
+        if file_format == 'csv':
+            data_rows, headers, sheet_names = self._read_delimited_with_header_detection(file_path, text_format)
+        elif file_format == 'xls':
+            data_rows, headers, sheet_names = self._read_xls_with_header_detection(file_path, sheet_name)
+        elif self.streaming:
+            data_rows, headers, sheet_names = self._stream_excel_with_header_detection(file_path, sheet_name)
+        else:
+            data_rows, headers, sheet_names = self._load_excel_with_header_detection(file_path, sheet_name)
+        
+        # Sniffing and opening the file is reader time; the header scan was recorded separately
+        opening = time.perf_counter() - start - (self.timer.seconds('header_detection') - scanned)
+        self.timer.record('read', opening, file_format=file_format, step='open')
+        return WorkbookRows(file_path, file_format, headers, data_rows, sheet_names)
+    
+    @staticmethod
+    def _unreadable_file_message(error: Exception) -> str:
+        """User-facing explanation for a workbook that could not be parsed"""
+        return f"""
+❌ Could not read this Excel file. It appears to be corrupted or not a real Excel workbook.
 
 🔧 SOLUTIONS TO TRY:
 
@@ -280,83 +388,54 @@ class ExamProcessor:
 6. Save as a new .xlsx file
 7. Upload the new file
 
-**Option 2 - Convert to CSV:**
-1. Open the file in Excel
-2. Save As → CSV format
-3. Upload the CSV file instead
-
-**Option 3 - Check file integrity:**
+**Option 2 - Check file integrity:**
 1. Ensure the file is not corrupted
-2. Try opening in Google Sheets and re-downloading
+2. Try opening in Google Sheets and re-downloading as .xlsx
 3. Verify the file is a valid Excel format
 
 **Technical Details:**
-• Method 2 (openpyxl data_only=True): {str(e2)}
-• Method 3 (openpyxl data_only=False): {str(e3)}
-• Method 4 (read_only): {str(e4)}
-• Method 5 (error tolerance): {str(e5)}
+• {str(error)}
 
 If none of these solutions work, the original file may be irreparably corrupted.
 """
-                        raise Exception(error_details)
     
-    def _clean_prn(self, prn_value) -> str:
-        """Clean and standardize PRN format"""
-        if prn_value is None:
-            return ""
-        
-        prn_str = str(prn_value).strip().upper()
-        # Remove decimal points (Excel formatting)
-        prn_str = re.sub(r'\.0+$', '', prn_str)
-        # Remove any non-alphanumeric characters except common separators
-        prn_clean = re.sub(r'[^\w\-]', '', prn_str)
+    def _read_excel_with_header_detection(self, file_path: str) -> Tuple[List[List], List[str]]:
+        """
+        Read Excel file and detect header row automatically
+        The format is sniffed once and parsed by exactly one reader.
+        Returns: (data_rows, header_row)
+        """
+        print(f"🔍 Attempting to read Excel file: {file_path}")
         
-        # Filter out invalid values
-        if prn_clean in ['', 'NAN', 'NONE', 'NAT', 'NULL']:
-            return ""
+        try:
+            data_rows, headers = self._open_workbook_rows(file_path)
+            data_rows = list(data_rows)
+        except (FileFormatError, WorkbookReadError) as e:
+            raise Exception(self._unreadable_file_message(e))
         
-        return prn_clean
+        print(f"✅ Read {len(headers)} columns, {len(data_rows)} data rows")
+        return data_rows, headers
+    
+    def _clean_prn(self, prn_value) -> str:
+        """Clean and standardize PRN format (memoised per request)"""
+        return self.normalizer.prn(prn_value)
     
     def _clean_name(self, name_value) -> str:
-        """Clean and normalize name for matching"""
-        if name_value is None:
-            return ""
-        
-        name_str = str(name_value).strip().upper()
-        # Remove extra spaces
-        name_str = re.sub(r'\s+', ' ', name_str)
-        # Remove special characters but keep spaces
-        name_str = re.sub(r'[^A-Z\s]', '', name_str)
-        
-        # Filter out invalid values
-        if name_str in ['', 'NAN', 'NONE', 'NAT', 'NULL']:
-            return ""
-        
-        return name_str
+        """Clean and normalize name for matching (memoised per request)"""
+        return self.normalizer.name(name_value)
     
     def _clean_roll_no(self, roll_no_value) -> str:
-        """Clean and normalize roll number"""
-        if roll_no_value is None:
-            return ""
-        
-        roll_str = str(roll_no_value).strip().upper()
-        # Remove decimal points (Excel formatting)
-        roll_str = re.sub(r'\.0+$', '', roll_str)
-        # Remove any non-alphanumeric characters
-        roll_clean = re.sub(r'[^\w]', '', roll_str)
-        
-        # Filter out invalid values
-        if roll_clean in ['', 'NAN', 'NONE', 'NAT', 'NULL']:
-            return ""
-        
-        # Remove leading zeros: "01" → "1", "002" → "2"
-        # But keep if it's all zeros or has letters: "00" → "0", "R01" → "R01"
-        if roll_clean.isdigit():
-            roll_clean = str(int(roll_clean))  # Converts "01" to "1", "002" to "2"
-        
-        return roll_clean
+        """Clean and normalize roll number (memoised per request)"""
+        return self.normalizer.roll_no(roll_no_value)
+    
+    def _fctc_division(self, fctc_data: RecordTable, row: int) -> str:
+        """Normalized division of an FCTC row ('Division', else 'Branch_Division')"""
+        division = self.normalizer.division(fctc_data.get(row, 'Division', ''))
+        if not division:
+            division = self.normalizer.division(fctc_data.get(row, 'Branch_Division', ''))
+        return division
     
-    def _fuzzy_name_match(self, name1: str, name2: str, threshold: float = 0.8) -> bool:
+    def _fuzzy_name_match(self, name1: str, name2: str, threshold: float = NAME_MATCH_THRESHOLD) -> bool:
         """
         Check if two names match using Jaccard similarity
         Returns True if similarity >= threshold
@@ -381,14 +460,37 @@ If none of these solutions work, the original file may be irreparably corrupted.
         similarity = intersection / union
         return similarity >= threshold
     
-    def _extract_fctc_data(self, data_rows: List[List], headers: List[str]) -> List[Dict]:
-        """Extract only required fields from FCTC data"""
+    @staticmethod
+    def _project_rows(data_rows: Iterable[List], column_indices: Dict[str, int]) -> Iterator[Tuple]:
+        """
+        Yield only the mapped columns of each row, in column_indices order
+        Short rows are padded with None; unmapped survey columns are dropped
+        before anything is stored.
+        """
+        indices = list(column_indices.values())
+        width = max(indices) + 1
+        getter = operator.itemgetter(*indices)
+        single = len(indices) == 1
         
-        # Create case-insensitive header mapping
+        for row in data_rows:
+            if len(row) >= width:
+                values = getter(row)
+                yield (values,) if single else values
+            else:
+                yield tuple(row[i] if i < len(row) else None for i in indices)
+    
+    @staticmethod
+    def _header_map(headers: List[str]) -> Dict[str, int]:
+        """Create case-insensitive header mapping"""
         header_map = {}
         for i, header in enumerate(headers):
             if header:
                 header_map[header.lower().strip()] = i
+        return header_map
+    
+    def _resolve_fctc_columns(self, headers: List[str]) -> Dict[str, int]:
+        """Map required FCTC fields to column indices (raises if PRN or Score is missing)"""
+        header_map = self._header_map(headers)
         
         # Define required field mappings (case-insensitive)
         field_mappings = {
@@ -426,68 +528,82 @@ If none of these solutions work, the original file may be irreparably corrupted.
                           f"Available columns: {available_cols}\n"
                           f"💡 Please ensure your FCTC file has a Score column.")
         
-        # Extract data
-        extracted_data = []
-        prn_scores = {}  # Track multiple attempts per PRN
-        
-        for row_idx, row in enumerate(data_rows):
+        return column_indices
+    
+    def _fctc_layout(self, headers: List[str]) -> Tuple[Dict[str, int], int, int, List[Tuple[str, int]]]:
+        """
+        Column layout of an FCTC sheet
+        Returns: (column_indices, prn position, score position, [(record field, position)])
+        where positions index the rows yielded by _project_rows(data_rows, column_indices).
+        """
+        column_indices = self._resolve_fctc_columns(headers)
+        fields = list(column_indices)
+        optional_fields = [(field.title(), pos) for pos, field in enumerate(fields)
+                           if field not in ['prn', 'score']]
+        return column_indices, fields.index('prn'), fields.index('score'), optional_fields
+    
+    def _merge_best_attempts(self, projected_rows: Iterable[Tuple], prn_pos: int, score_pos: int,
+                             prn_scores: Dict[str, Tuple], changed: Optional[set] = None) -> None:
+        """
+        Fold projected rows into prn_scores (prn_clean → (score, row, prn_raw)), keeping
+        the highest score per PRN; PRNs whose best attempt changed are added to `changed`
+        """
+        for row in projected_rows:
             if not any(cell for cell in row):  # Skip empty rows
                 continue
-                
-            # Ensure row has enough columns
-            while len(row) < len(headers):
-                row.append(None)
             
             # Extract PRN and validate
-            prn_raw = row[column_indices['prn']] if len(row) > column_indices['prn'] else None
+            prn_raw = row[prn_pos]
             prn_clean = self._clean_prn(prn_raw)
             
             if not prn_clean:
                 continue  # Skip rows without PRN
             
             # Extract score and convert to float
-            score_raw = row[column_indices['score']] if len(row) > column_indices['score'] else None
+            score_raw = row[score_pos]
             try:
                 score = float(score_raw) if score_raw is not None else 0.0
             except (ValueError, TypeError):
                 score = 0.0
             
             # Handle multiple attempts - keep highest score
-            if prn_clean in prn_scores:
-                if score > prn_scores[prn_clean]['score']:
-                    prn_scores[prn_clean] = {'score': score, 'row_data': row, 'prn_raw': prn_raw}
-            else:
-                prn_scores[prn_clean] = {'score': score, 'row_data': row, 'prn_raw': prn_raw}
-        
-        # Build final records from best attempts
-        for prn_clean, data in prn_scores.items():
-            row = data['row_data']
-            record = {
-                'PRN_RAW': data['prn_raw'],
-                'PRN_CLEAN': prn_clean,
-                'Score': data['score']
-            }
-            
-            # Add optional fields
-            for field, col_idx in column_indices.items():
-                if field not in ['prn', 'score'] and len(row) > col_idx:
-                    record[field.title()] = row[col_idx]
-            
-            extracted_data.append(record)
+            best = prn_scores.get(prn_clean)
+            if best is None or score > best[0]:
+                prn_scores[prn_clean] = (score, row, prn_raw)
+                if changed is not None:
+                    changed.add(prn_clean)
+    
+    @staticmethod
+    def _fctc_table(prn_scores: Dict[str, Tuple], optional_fields: List[Tuple[str, int]]) -> RecordTable:
+        """Build final records from best attempts (first-seen PRN order)"""
+        extracted_data = RecordTable(['PRN_RAW', 'PRN_CLEAN', 'Score'] + [key for key, _ in optional_fields],
+                                     typecodes={'Score': 'd'})
+        for prn_clean, (score, row, prn_raw) in prn_scores.items():
+            extracted_data.append([prn_raw, prn_clean, score] + [row[pos] for _, pos in optional_fields])
+        return extracted_data
+    
+    def _extract_fctc_data(self, data_rows: Iterable[List], headers: List[str]) -> RecordTable:
+        """Extract only required fields from FCTC data (one row per PRN, best attempt)"""
+        
+        # Resolve columns from the header first, then keep only those per row
+        column_indices, prn_pos, score_pos, optional_fields = self._fctc_layout(headers)
+        
+        # Extract data
+        prn_scores = {}  # Track multiple attempts per PRN: prn_clean → (score, row, prn_raw)
+        self._merge_best_attempts(self._project_rows(data_rows, column_indices), prn_pos, score_pos, prn_scores)
         
+        extracted_data = self._fctc_table(prn_scores, optional_fields)
         if not extracted_data:
             raise Exception("❌ FCTC FILE ERROR: No valid data rows found with PRN and Score")
         
         return extracted_data
     
-    def _extract_roll_call_data(self, data_rows: List[List], headers: List[str]) -> List[Dict]:
-        """Extract roll call data with case-insensitive matching"""
-        
-        # Create case-insensitive header mapping
-        header_map = {}
-        for i, header in enumerate(headers):
-            if header:
-                header_map[header.lower().strip()] = i
+    def _resolve_roll_call_columns(self, headers: List[str], division_optional: bool = False) -> Dict[str, int]:
+        """
+        Map required Roll Call fields to column indices (raises if any is missing)
+        With division_optional the Division column may be absent (division from the sheet name).
+        """
+        header_map = self._header_map(headers)
         
         # Define required field mappings (case-insensitive)
         # Note: Order matters - first match wins
@@ -509,7 +625,7 @@ If none of these solutions work, the original file may be irreparably corrupted.
         # Check for required columns
         missing_cols = []
         for field in ['prn', 'roll_no', 'name', 'division']:
-            if field not in column_indices:
+            if field not in column_indices and not (field == 'division' and division_optional):
                 missing_cols.append(field.upper())
         
         if missing_cols:
@@ -529,279 +645,1020 @@ If none of these solutions work, the original file may be irreparably corrupted.
                           "\n".join([f"• '{col}'" for col in available_cols]) + "\n"
                           f"💡 Please ensure your Roll Call file has the exact column names listed above.")
         
+        return column_indices
+    
+    def _extract_roll_call_data(self, data_rows: Iterable[List], headers: List[str],
+                                default_division: Optional[str] = None) -> RecordTable:
+        """
+        Extract roll call data with case-insensitive matching
+        default_division (a sheet name) is used when the sheet has no Division column.
+        """
+        
+        # Projected rows are (prn, roll_no, name, division)
+        column_indices = self._resolve_roll_call_columns(headers, division_optional=default_division is not None)
+        projected_rows = self._project_rows(data_rows, column_indices)
+        if 'division' not in column_indices:
+            projected_rows = (row + (default_division,) for row in projected_rows)
+        
         # Extract data
-        extracted_data = []
-        for row in data_rows:
-            if not any(cell for cell in row):  # Skip empty rows
+        extracted_data = RecordTable(ROLL_CALL_FIELDS)
+        for prn_raw, roll_no, name, division in projected_rows:
+            if not (prn_raw or roll_no or name or division):  # Skip empty rows
                 continue
-                
-            # Ensure row has enough columns
-            while len(row) < len(headers):
-                row.append(None)
             
             # Extract PRN and validate
-            prn_raw = row[column_indices['prn']] if len(row) > column_indices['prn'] else None
             prn_clean = self._clean_prn(prn_raw)
             
             if not prn_clean:
                 continue  # Skip rows without PRN
             
-            record = {
-                'PRN_RAW': prn_raw,
-                'PRN_CLEAN': prn_clean,
-                'Roll_No': row[column_indices['roll_no']] if len(row) > column_indices['roll_no'] else None,
-                'Name': row[column_indices['name']] if len(row) > column_indices['name'] else None,
-                'Division': row[column_indices['division']] if len(row) > column_indices['division'] else None
-            }
-            
-            extracted_data.append(record)
+            extracted_data.append((prn_raw, prn_clean, roll_no, name, division))
         
         if not extracted_data:
             raise Exception("❌ ROLL CALL FILE ERROR: No valid data rows found")
         
         return extracted_data
     
+    def digest_for(self, file_path: str) -> str:
+        """SHA-256 of an upload, hashed at most once per processor"""
+        digest = self._file_digests.get(file_path)
+        if digest is None:
+            digest = file_sha256(file_path)
+            self._file_digests[file_path] = digest
+        return digest
+    
+    def _parsed_cache_key(self, file_path: str, kind: str) -> Optional[Tuple[str, str]]:
+        if self.parsed_cache is None:
+            return None
+        return (self.digest_for(file_path), kind)
+    
+    def has_parsed(self, file_path: str, kind: str) -> bool:
+        """True when parse_upload(file_path, kind) would be served from parsed_cache"""
+        key = self._parsed_cache_key(file_path, kind)
+        return key is not None and self.parsed_cache.get(key) is not None
+    
+    @staticmethod
+    def _timed_rows(data_rows: Iterable[List], counter: List) -> Iterator[List]:
+        """Yield data_rows, adding the row count to counter[0] and the seconds spent in the reader to counter[1]"""
+        clock = time.perf_counter
+        iterator = iter(data_rows)
+        while True:
+            start = clock()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                counter[1] += clock() - start
+                return
+            counter[1] += clock() - start
+            counter[0] += 1
+            yield row
+    
+    def _extract_timed(self, extract: Callable, workbook: WorkbookRows, kind: str, **kwargs) -> Tuple[RecordTable, int]:
+        """Run an _extract_* method over a workbook's rows, recording 'read' and 'extraction' separately"""
+        counter = [0, 0.0]
+        start = time.perf_counter()
+        records = extract(self._timed_rows(workbook.data_rows, counter), workbook.headers, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.timer.record('read', counter[1], rows=counter[0], kind=kind)
+        self.timer.record('extraction', elapsed - counter[1], rows=len(records), kind=kind)
+        return records, counter[0]
+    
+    def parse_upload(self, source, kind: str) -> ParsedUpload:
+        """
+        Read one upload ('fctc' or 'roll_call') and feed its rows straight into the _extract_* method
+        `source` is a file path, a WorkbookRows already opened by open_workbook, or a
+        RecordTable extracted earlier (e.g. a registered roster), which is used as is.
+        With parsed_cache set, an upload whose bytes were parsed before is not read again.
+        """
+        if isinstance(source, RecordTable):
+            return ParsedUpload(kind, list(source.fields), len(source), source)
+        
+        extract = self._extract_fctc_data if kind == 'fctc' else self._extract_roll_call_data
+        file_path = source.file_path if isinstance(source, WorkbookRows) else source
+        
+        key = self._parsed_cache_key(file_path, kind)
+        if key is not None:
+            parsed = self.parsed_cache.get(key)
+            if parsed is not None:
+                if isinstance(source, WorkbookRows):
+                    source.close()
+                print(f"♻️  Reusing parsed {kind} upload ({len(parsed.records)} records)")
+                return parsed
+        
+        try:
+            workbook = source if isinstance(source, WorkbookRows) else self.open_workbook(source)
+            if kind == 'roll_call' and len(workbook.sheet_names) > 1:
+                # One sheet per division: extract every sheet and merge
+                workbook.close()
+                parsed = self._parse_roll_call_sheets(file_path, workbook.sheet_names)
+            else:
+                records, row_count = self._extract_timed(extract, workbook, kind)
+                parsed = ParsedUpload(kind, workbook.headers, row_count, records)
+        except (FileFormatError, WorkbookReadError) as e:
+            raise Exception(self._unreadable_file_message(e))
+        
+        if key is not None:
+            self.parsed_cache.set(key, parsed)
+        return parsed
+    
+    def _parse_roll_call_sheet(self, file_path: str, sheet_name: str) -> Tuple:
+        """
+        Extract one sheet of a multi-sheet roll call, the sheet name standing in for a missing Division column
+        Returns: (sheet_name, headers, row_count, records) or (sheet_name, None, 0, error message)
+        """
+        try:
+            workbook = self.open_workbook(file_path, sheet_name)
+            records, row_count = self._extract_timed(self._extract_roll_call_data, workbook, 'roll_call',
+                                                     default_division=sheet_name.strip())
+            return sheet_name, workbook.headers, row_count, records
+        except (FileFormatError, WorkbookReadError):
+            raise
+        except Exception as e:
+            return sheet_name, None, 0, str(e)
+    
+    def _parse_roll_call_sheets(self, file_path: str, sheet_names: List[str]) -> ParsedUpload:
+        """
+        Extract every sheet of a roll-call workbook (in worker processes when parallel_parse
+        is on) and merge them in sheet order. Sheets without roll-call columns are skipped;
+        a PRN already taken from an earlier sheet is not added again.
+        """
+        print(f"📑 Roll Call workbook has {len(sheet_names)} sheets: {sheet_names}")
+        results = None
+        if self.parallel_parse and (os.cpu_count() or 1) > 1:
+            from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
+            try:
+                with ProcessPoolExecutor(max_workers=min(len(sheet_names), os.cpu_count() or 1)) as executor:
+                    results = []
+                    for *result, stages in executor.map(_parse_roll_call_sheet_worker, [file_path] * len(sheet_names),
+                                                        sheet_names, [self.streaming] * len(sheet_names),
+                                                        [self.timer.context] * len(sheet_names)):
+                        self.timer.merge(stages)
+                        results.append(tuple(result))
+            except (BrokenProcessPool, OSError, NotImplementedError) as e:
+                print(f"⚠️  Parallel sheet parsing unavailable ({str(e)}) - parsing sequentially")
+        if results is None:
+            results = [self._parse_roll_call_sheet(file_path, sheet_name) for sheet_name in sheet_names]
+        
+        merged = RecordTable(ROLL_CALL_FIELDS)
+        seen_prns = set()
+        headers = None
+        row_count = 0
+        sheets = []
+        errors = []
+        dropped = 0
+        for sheet_name, sheet_headers, sheet_rows, records in results:
+            if sheet_headers is None:
+                print(f"  ⚠️  Sheet '{sheet_name}' skipped: {records.splitlines()[0] if records else ''}")
+                errors.append(f"Sheet '{sheet_name}': {records}")
+                continue
+            duplicates = 0
+            for row in range(len(records)):
+                values = [records.columns[field][row] for field in ROLL_CALL_FIELDS]
+                if values[1] in seen_prns:
+                    duplicates += 1
+                    continue
+                merged.append(values)
+            seen_prns.update(records.column('PRN_CLEAN'))
+            dropped += duplicates
+            headers = headers or sheet_headers
+            row_count += sheet_rows
+            sheets.append(sheet_name)
+            print(f"  ✓ Sheet '{sheet_name}': {len(records) - duplicates} students" +
+                  (f" ({duplicates} PRNs already on an earlier sheet)" if duplicates else ""))
+        
+        if not sheets:
+            raise Exception("❌ ROLL CALL FILE ERROR: No sheet has the required columns\n" + "\n".join(errors))
+        
+        return ParsedUpload('roll_call', headers, row_count, merged, sheets, dropped)
+    
     def read_fctc_excel(self, file_path):
-        """Read FCTC Excel file and extract ONLY required fields"""
+        """Read FCTC Excel file (path or opened WorkbookRows) and extract ONLY required fields"""
         try:
-            data_rows, headers = self._read_excel_with_header_detection(file_path)
-            return self._extract_fctc_data(data_rows, headers)
+            return self.parse_upload(file_path, 'fctc').records
         except Exception as e:
             raise Exception(f"Error reading FCTC Excel file: {str(e)}")
     
     def read_roll_call_excel(self, file_path):
-        """Read Roll Call Excel file"""
+        """Read Roll Call Excel file (path or opened WorkbookRows)"""
+        return self._read_roll_call(file_path).records
+    
+    def _read_roll_call(self, file_path) -> ParsedUpload:
+        """read_roll_call_excel, keeping the sheet facts (ParsedUpload.sheet_stats)"""
         try:
-            data_rows, headers = self._read_excel_with_header_detection(file_path)
-            return self._extract_roll_call_data(data_rows, headers)
+            return self.parse_upload(file_path, 'roll_call')
         except Exception as e:
             raise Exception(f"Error reading Roll Call Excel file: {str(e)}")
     
+    def _parse_uploads_sequential(self, fctc_source, roll_call_source) -> Tuple[RecordTable, ParsedUpload, float, float]:
+        """Parse FCTC then Roll Call in this process"""
+        print("📖 Reading FCTC file...")
+        self._report_progress('parsing_fctc')
+        start = time.perf_counter()
+        fctc_data = self.read_fctc_excel(fctc_source)
+        fctc_seconds = time.perf_counter() - start
+        print(f"✅ FCTC file processed: {len(fctc_data)} records")
+        
+        print("📖 Reading Roll Call file...")
+        self._report_progress('parsing_roll_call')
+        start = time.perf_counter()
+        roll_call_parsed = self._read_roll_call(roll_call_source)
+        roll_call_seconds = time.perf_counter() - start
+        print(f"✅ Roll Call file processed: {len(roll_call_parsed.records)} records")
+        
+        return fctc_data, roll_call_parsed, fctc_seconds, roll_call_seconds
+    
+    def _parse_uploads_parallel(self, fctc_path: str, roll_call_path: str) -> Tuple[RecordTable, ParsedUpload, float, float]:
+        """
+        Parse both files at the same time in two worker processes
+        Raises BrokenProcessPool / OSError when a pool cannot be used here.
+        """
+        from concurrent.futures.process import ProcessPoolExecutor
+        
+        print("📖 Reading FCTC and Roll Call files in parallel...")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self._report_progress('parsing_fctc')
+            fctc_future = executor.submit(_parse_upload_worker, 'fctc', fctc_path, self.streaming, self.timer.context)
+            roll_call_future = executor.submit(_parse_upload_worker, 'roll_call', roll_call_path, self.streaming,
+                                               self.timer.context)
+            fctc_parsed, fctc_seconds, fctc_stages = fctc_future.result()
+            self._report_progress('parsing_roll_call')
+            roll_call_parsed, roll_call_seconds, roll_call_stages = roll_call_future.result()
+        self.timer.merge(fctc_stages)
+        self.timer.merge(roll_call_stages)
+        
+        # Workers cannot see the shared cache; store their results from here
+        for file_path, parsed in ((fctc_path, fctc_parsed), (roll_call_path, roll_call_parsed)):
+            key = self._parsed_cache_key(file_path, parsed.kind)
+            if key is not None:
+                self.parsed_cache.set(key, parsed)
+        
+        print(f"✅ FCTC file processed: {len(fctc_parsed.records)} records")
+        print(f"✅ Roll Call file processed: {len(roll_call_parsed.records)} records")
+        return fctc_parsed.records, roll_call_parsed, fctc_seconds, roll_call_seconds
+    
+    def _all_parsed(self, fctc_source, roll_call_source) -> bool:
+        """Both uploads already in parsed_cache (no point starting worker processes)"""
+        paths = [source.file_path if isinstance(source, WorkbookRows) else source
+                 for source in (fctc_source, roll_call_source)]
+        return self.has_parsed(paths[0], 'fctc') and self.has_parsed(paths[1], 'roll_call')
+    
+    def _parse_uploads(self, fctc_source, roll_call_source) -> Tuple[RecordTable, RecordTable, Dict]:
+        """
+        Parse both uploads, in parallel when enabled and more than one core is available
+        Returns: (fctc_data, roll_call_data, parse_stats) where parse_stats reports
+        the wall-clock time and the time saved against parsing one after the other
+        (plus ParsedUpload.sheet_stats for a multi-sheet roll call).
+        """
+        parse_mode = 'sequential'
+        start = time.perf_counter()
+        result = None
+        
+        preparsed = isinstance(fctc_source, RecordTable) or isinstance(roll_call_source, RecordTable)
+        if (self.parallel_parse and (os.cpu_count() or 1) > 1 and not preparsed
+                and not self._all_parsed(fctc_source, roll_call_source)):
+            from concurrent.futures.process import BrokenProcessPool
+            
+            # Worker processes reopen the files by path; release any handles opened here
+            paths = []
+            for source in (fctc_source, roll_call_source):
+                if isinstance(source, WorkbookRows):
+                    source.close()
+                    paths.append(source.file_path)
+                else:
+                    paths.append(source)
+            fctc_source, roll_call_source = paths
+            
+            try:
+                result = self._parse_uploads_parallel(fctc_source, roll_call_source)
+                parse_mode = 'parallel'
+            except (BrokenProcessPool, OSError, NotImplementedError) as e:
+                print(f"⚠️  Parallel parsing unavailable ({str(e)}) - parsing sequentially")
+                start = time.perf_counter()
+        
+        if result is None:
+            result = self._parse_uploads_sequential(fctc_source, roll_call_source)
+        
+        fctc_data, roll_call_parsed, fctc_seconds, roll_call_seconds = result
+        wall_seconds = time.perf_counter() - start
+        sequential_seconds = fctc_seconds + roll_call_seconds
+        saved_seconds = max(sequential_seconds - wall_seconds, 0.0) if parse_mode == 'parallel' else 0.0
+        
+        print(f"⏱️  Parsing ({parse_mode}): {wall_seconds:.2f}s wall, {saved_seconds:.2f}s saved")
+        
+        parse_stats = {
+            'parse_mode': parse_mode,
+            'parse_wall_seconds': round(wall_seconds, 3),
+            'parse_sequential_seconds': round(sequential_seconds, 3),
+            'parse_seconds_saved': round(saved_seconds, 3)
+        }
+        parse_stats.update(roll_call_parsed.sheet_stats())
+        return fctc_data, roll_call_parsed.records, parse_stats
+    
+    @staticmethod
+    def _build_student_rows(roll_call_data: RecordTable, fctc_data: RecordTable, roll_rows: List[int],
+                            matched_rows: List[Optional[int]], match_methods: List[str]) -> List[Dict]:
+        """Serialisation boundary: turn matched row indexes into report dicts"""
+        prn_raw = roll_call_data.column('PRN_RAW')
+        roll_no = roll_call_data.column('Roll_No')
+        name = roll_call_data.column('Name')
+        division = roll_call_data.column('Division')
+        scores = fctc_data.column('Score')
+        
+        students = []
+        for roll_row in roll_rows:
+            matched_row = matched_rows[roll_row]
+            students.append({
+                'PRN': prn_raw[roll_row],
+                'Roll_No': roll_no[roll_row],
+                'Name': name[roll_row],
+                'Division': division[roll_row],
+                'Attendance_Status': "Present" if matched_row is not None else "Absent",
+                'Score': scores[matched_row] if matched_row is not None else "N/A",
+                'Match_Method': match_methods[roll_row]
+            })
+        return students
+    
+    def _build_fctc_lookups(self, fctc_data: RecordTable) -> Dict:
+        """
+        Lookup tables over FCTC row indexes for the three matching levels
+        Keys: by_prn, prn_trie (None unless prn_fuzzy), by_name (name → rows), name_index,
+        by_roll_div, and per row: names and roll_nos (cleaned), divisions, blocks
+        """
+        print("🔍 Creating lookup dictionaries for multi-level matching...")
+        start = time.perf_counter()
+        fctc_count = len(fctc_data)
+        
+        # Level 1: PRN lookup
+        fctc_lookup_by_prn = {}
+        for row, prn in enumerate(fctc_data.column('PRN_CLEAN')):
+            if prn:
+                fctc_lookup_by_prn[prn] = row
+        
+        # Level 1.5: trie for PRN typo recovery
+        fctc_prn_trie = PrnTrie(fctc_lookup_by_prn) if self.prn_fuzzy else None
+        
+        # Level 2: Name lookup (cleaned names)
+        fctc_lookup_by_name = {}
+        fctc_names = self.normalizer.clean_column('name', (fctc_data.get(row, 'Full_Name', '') for row in range(fctc_count)))
+        for row, name in enumerate(fctc_names):
+            if name:
+                # Store as list to handle duplicate names
+                if name not in fctc_lookup_by_name:
+                    fctc_lookup_by_name[name] = []
+                fctc_lookup_by_name[name].append(row)
+        
+        # Level 3: Roll No + Division lookup
+        # Check both 'Division' and 'Branch_Division' fields
+        fctc_divisions = [self._fctc_division(fctc_data, row) for row in range(fctc_count)]
+        
+        # Level 2 fuzzy: token index (only names sharing a word are scored), blocked by division
+        fctc_blocks = [division_block(division) for division in fctc_divisions]
+        fctc_name_index = BlockedNameIndex()
+        for name, rows in fctc_lookup_by_name.items():
+            fctc_name_index.add(name, dict.fromkeys(fctc_blocks[row] for row in rows))
+        
+        fctc_roll_nos = self.normalizer.clean_column('roll_no', (fctc_data.get(row, 'Roll_Number', '') for row in range(fctc_count)))
+        fctc_lookup_by_roll_div = {}
+        for row, (roll_no, division) in enumerate(zip(fctc_roll_nos, fctc_divisions)):
+            if roll_no and division:
+                key = f"{roll_no}_{division}"
+                fctc_lookup_by_roll_div[key] = row
+        
+        print(f"  ✓ PRN lookup: {len(fctc_lookup_by_prn)} entries")
+        print(f"  ✓ Name lookup: {len(fctc_lookup_by_name)} entries")
+        print(f"  ✓ Roll+Div lookup: {len(fctc_lookup_by_roll_div)} entries")
+        
+        # Debug: Show sample entries from each lookup
+        if fctc_lookup_by_prn:
+            sample_prn = next(iter(fctc_lookup_by_prn))
+            print(f"  📝 Sample PRN: {sample_prn}")
+        if fctc_lookup_by_name:
+            sample_name = next(iter(fctc_lookup_by_name))
+            print(f"  📝 Sample Name: {sample_name}")
+        if fctc_lookup_by_roll_div:
+            sample_key = next(iter(fctc_lookup_by_roll_div))
+            print(f"  📝 Sample Roll+Div: {sample_key}")
+        
+        # Warning if lookups are empty
+        if len(fctc_lookup_by_name) == 0:
+            print(f"  ⚠️  WARNING: Name lookup is empty - FCTC file missing 'Full Name' field or all names are empty")
+        if len(fctc_lookup_by_roll_div) == 0:
+            print(f"  ⚠️  WARNING: Roll+Div lookup is empty - FCTC file missing 'Roll Number' or 'Branch-Division' fields")
+        
+        self.timer.record('index_build', time.perf_counter() - start, rows=fctc_count)
+        return {
+            'by_prn': fctc_lookup_by_prn,
+            'prn_trie': fctc_prn_trie,
+            'by_name': fctc_lookup_by_name,
+            'name_index': fctc_name_index,
+            'by_roll_div': fctc_lookup_by_roll_div,
+            'names': fctc_names,
+            'roll_nos': fctc_roll_nos,
+            'divisions': fctc_divisions,
+            'blocks': fctc_blocks
+        }
+    
+    def _normalise_roll_call(self, roll_call_data: RecordTable) -> Dict[str, List]:
+        """Roll-call columns cleaned in batch for matching (blank divisions become 'Unknown')"""
+        start = time.perf_counter()
+        divisions = []
+        for division in self.normalizer.clean_column('division', roll_call_data.column('Division')):
+            if not division or division == 'NONE' or division == 'NAN':
+                division = 'Unknown'
+            divisions.append(division)
+        roll_keys = {
+            'prns': roll_call_data.column('PRN_CLEAN'),
+            'divisions': divisions,
+            'names': self.normalizer.clean_column('name', roll_call_data.column('Name')),
+            'roll_nos': self.normalizer.clean_column('roll_no', roll_call_data.column('Roll_No'))
+        }
+        self.timer.record('normalisation', time.perf_counter() - start, rows=len(roll_call_data))
+        return roll_keys
+    
+    @staticmethod
+    def _name_candidates(lookups: Dict, division: str, roll_name: str,
+                         block: Optional[str] = None) -> List[Tuple[float, int, int]]:
+        """
+        Level 2 candidates of one roll-call row as (score, preference, FCTC row), best first
+        Exact cleaned-name rows score 1.0; otherwise fuzzy matches score their Jaccard
+        similarity, drawn from `block` first and from every FCTC name only if no block
+        candidate is left (block=None searches every name). Preference: 2 same division,
+        1 same block, 0 other; a fuzzy name on several rows only offers rows with
+        preference > 0.
+        """
+        fctc_lookup_by_name = lookups['by_name']
+        fctc_divisions = lookups['divisions']
+        fctc_blocks = lookups['blocks']
+        
+        def preference(row: int) -> int:
+            if fctc_divisions[row] == division:
+                return 2
+            return 1 if block and fctc_blocks[row] == block else 0
+        
+        # First try exact name match
+        if roll_name in fctc_lookup_by_name:
+            candidates = [(1.0, preference(row), row) for row in fctc_lookup_by_name[roll_name]]
+        else:
+            candidates = []
+            # Widen to every name when nothing from the block survives the filter below
+            for search_block in ((block, None) if block else (None,)):
+                ranked, widened = lookups['name_index'].ranked_matches(roll_name, search_block, NAME_MATCH_THRESHOLD)
+                for score, fctc_name in ranked:
+                    rows = fctc_lookup_by_name[fctc_name]
+                    for row in rows:
+                        row_preference = preference(row)
+                        if len(rows) == 1 or row_preference:
+                            candidates.append((score, row_preference, row))
+                    if len(candidates) >= NAME_CANDIDATES_PER_ROW:
+                        break
+                if candidates or widened:
+                    break
+        # Stable sort: FCTC order breaks remaining ties
+        candidates.sort(key=lambda candidate: (-candidate[0], -candidate[1]))
+        return candidates[:NAME_CANDIDATES_PER_ROW]
+    
+    def _prn_candidates(self, lookups: Dict, prn: str, division: str, roll_name: str, roll_no: str,
+                        claimed: set) -> List[Tuple[float, int, int]]:
+        """
+        Level 1.5 candidate of one roll-call PRN as [(score, preference, FCTC row)]
+        The closest unclaimed FCTC PRN within PRN_FUZZY_MAX_DISTANCE, and only when the
+        response confirms it: preference 2 when the FCTC name matches the roll-call name,
+        1 when Roll No and Division both match. PRNs are dense and sequential, so an
+        unconfirmed PRN one edit away is usually a classmate; it and any tie give no
+        candidate (a guess could mark the wrong student Present).
+        """
+        if len(prn) < PRN_FUZZY_MIN_LENGTH:
+            return []
+        by_prn = lookups['by_prn']
+        found = [(distance, by_prn[fctc_prn])
+                 for distance, fctc_prn in lookups['prn_trie'].search(prn, PRN_FUZZY_MAX_DISTANCE)
+                 if distance and by_prn[fctc_prn] not in claimed]
+        if not found:
+            return []
+        
+        block = division_block(division)
+        
+        def preference(row: int) -> int:
+            if self._fuzzy_name_match(roll_name, lookups['names'][row]):
+                return 2
+            if roll_no and lookups['roll_nos'][row] == roll_no and lookups['blocks'][row] == block:
+                return 1
+            return 0
+        
+        closest = [(preference(row), row) for distance, row in found if distance == found[0][0]]
+        best = max(row_preference for row_preference, _ in closest)
+        top = [row for row_preference, row in closest if row_preference == best]
+        if not best or len(top) != 1:
+            return []
+        return [(1.0 - found[0][0] / len(prn), best, top[0])]
+    
+    @staticmethod
+    def _assign_one_to_one(candidates: Dict[int, List[Tuple[float, int, int]]],
+                           claimed: set) -> Tuple[Dict[int, int], Dict[int, str]]:
+        """
+        Greedy one-to-one assignment of roll-call rows to FCTC rows, highest score first
+        Ties go to the better division preference, then to the earlier roll-call row.
+        FCTC rows in `claimed` (matched at an earlier level) are skipped and every
+        assigned row is added to it. Sorting the candidate edges (at most
+        NAME_CANDIDATES_PER_ROW per row) keeps this O(n log n) in unmatched rows.
+        Returns (roll row → FCTC row, roll row → contest) for rows that did not get
+        their best candidate: 'contested' when another row of this assignment took it,
+        'preclaimed' when an earlier level had already matched it.
+        """
+        preclaimed = set(claimed)
+        edges = [(score, preference, order, roll_row, fctc_row)
+                 for order, (roll_row, found) in enumerate(candidates.items())
+                 for score, preference, fctc_row in found]
+        edges.sort(key=lambda edge: (-edge[0], -edge[1], edge[2]))
+        
+        assigned = {}
+        for _, _, _, roll_row, fctc_row in edges:
+            if roll_row in assigned or fctc_row in claimed:
+                continue
+            assigned[roll_row] = fctc_row
+            claimed.add(fctc_row)
+        contests = {}
+        for roll_row, found in candidates.items():
+            best = found[0][2]
+            if assigned.get(roll_row) != best:
+                contests[roll_row] = 'preclaimed' if best in preclaimed else 'contested'
+        return assigned, contests
+    
+    @staticmethod
+    def _contest_stats(contests: Dict[int, str]) -> Dict[str, int]:
+        """match_stats counts of _match_roll_call contests"""
+        contested = sum(1 for contest in contests.values() if contest == 'contested')
+        return {'contested_matches': contested, 'preclaimed_matches': len(contests) - contested}
+    
+    def _match_roll_call(self, lookups: Dict, roll_keys: Dict[str, List], roll_rows: Sequence[int],
+                         matched_rows: List[Optional[int]], match_methods: List[str]) -> int:
+        """
+        Run the multi-level match for the given roll-call rows, filling matched_rows / match_methods
+        Each level is one pass over the rows the earlier levels left unmatched and is timed
+        as a whole. Levels 1 and 3 are exact-key lookups and run as vectorised joins when
+        enabled. Below Level 1 an FCTC row goes to at most one roll-call row: Level 2 assigns
+        names one-to-one by best score and Level 3 skips rows already claimed (unless
+        one_to_one is off, when every row keeps its own best match; Level 1.5 stays one-to-one).
+        Returns roll row → 'contested' / 'preclaimed' for rows that lost their best
+        candidate (see _assign_one_to_one; _contest_stats counts them).
+        """
+        prns, divisions, names, roll_nos = roll_keys['prns'], roll_keys['divisions'], roll_keys['names'], roll_keys['roll_nos']
+        total = len(roll_rows)
+        vectorised = self._use_vectorised_joins(total)
+        self._report_progress('matching', 0.0)
+        
+        # Level 1: PRN
+        by_prn = lookups['by_prn']
+        with self.timer.stage('match_level_1', rows=total) as level:
+            if vectorised:
+                level['vectorised'] = 1
+                hits, fctc_rows, pending = join_column(by_prn, prns, roll_rows)
+                for roll_row, fctc_row in zip(hits, fctc_rows):
+                    matched_rows[roll_row], match_methods[roll_row] = fctc_row, "PRN"
+            else:
+                pending = []
+                for roll_row in roll_rows:
+                    prn = prns[roll_row]
+                    if prn and prn in by_prn:
+                        matched_rows[roll_row], match_methods[roll_row] = by_prn[prn], "PRN"
+                    else:
+                        pending.append(roll_row)
+            level['matched'] = total - len(pending)
+        
+        # FCTC rows already taken: Level 1 matches, and matches of rows not being re-matched
+        pending_rows = set(pending)
+        claimed = {matched_row for roll_row, matched_row in enumerate(matched_rows)
+                   if matched_row is not None and roll_row not in pending_rows}
+        contests = {}
+        
+        # Level 1.5 (optional): PRN typo recovery against FCTC PRNs nobody has claimed
+        if lookups.get('prn_trie') is not None:
+            with self.timer.stage('match_level_1_5', rows=len(pending)) as level:
+                candidates = {}
+                for roll_row in pending:
+                    found = self._prn_candidates(lookups, prns[roll_row], divisions[roll_row], names[roll_row],
+                                                 roll_nos[roll_row], claimed)
+                    if found:
+                        candidates[roll_row] = found
+                assigned, level_contests = self._assign_one_to_one(candidates, claimed)
+                contests.update(level_contests)
+                still_pending = []
+                for roll_row in pending:
+                    if roll_row in assigned:
+                        matched_rows[roll_row], match_methods[roll_row] = assigned[roll_row], "PRN_Fuzzy"
+                    else:
+                        still_pending.append(roll_row)
+                pending = still_pending
+                level['matched'] = len(assigned)
+                level['contested'] = sum(1 for contest in level_contests.values() if contest == 'contested')
+        
+        # Level 2: Name (exact, then fuzzy) - candidates for every pending row, then a
+        # one-to-one assignment; the expensive level, so progress is reported here
+        done_before = total - len(pending)
+        with self.timer.stage('match_level_2', rows=len(pending)) as level:
+            candidates = {}
+            for done, roll_row in enumerate(pending, 1):
+                if names[roll_row]:
+                    block = division_block(divisions[roll_row]) if self.name_blocking else None
+                    found = self._name_candidates(lookups, divisions[roll_row], names[roll_row], block)
+                    if found:
+                        candidates[roll_row] = found
+                if self.progress is not None and done % PROGRESS_EVERY_ROWS == 0:
+                    self._report_progress('matching', (done_before + done) / total)
+            if self.one_to_one:
+                assigned, level_contests = self._assign_one_to_one(candidates, claimed)
+            else:
+                assigned = {roll_row: found[0][2] for roll_row, found in candidates.items()}
+                level_contests = {}
+            contests.update(level_contests)
+            unmatched = []
+            for roll_row in pending:
+                if roll_row in assigned:
+                    matched_rows[roll_row], match_methods[roll_row] = assigned[roll_row], "Name"
+                else:
+                    unmatched.append(roll_row)
+            level['matched'] = len(assigned)
+            level['contested'] = sum(1 for contest in level_contests.values() if contest == 'contested')
+        
+        # Level 3: Roll No + Division
+        by_roll_div = lookups['by_roll_div']
+        with self.timer.stage('match_level_3', rows=len(unmatched)) as level:
+            if vectorised and unmatched:
+                level['vectorised'] = 1
+                hits, fctc_rows, not_found = join_column_pair(by_roll_div, roll_nos, divisions, unmatched)
+                found = list(zip(hits, fctc_rows)) + [(roll_row, None) for roll_row in not_found]
+            else:
+                found = []
+                for roll_row in unmatched:
+                    roll_no, division = roll_nos[roll_row], divisions[roll_row]
+                    found.append((roll_row, by_roll_div.get(f"{roll_no}_{division}") if roll_no and division else None))
+            level['matched'] = level['contested'] = 0
+            # FCTC rows taken by an earlier Level 3 row (two roll-call rows with one key)
+            level_claims = set()
+            for roll_row, matched_row in found:
+                if matched_row is not None and self.one_to_one and matched_row in claimed:
+                    if matched_row in level_claims:
+                        contests[roll_row] = 'contested'
+                        level['contested'] += 1
+                    else:
+                        contests[roll_row] = 'preclaimed'
+                    matched_row = None
+                matched_rows[roll_row] = matched_row
+                if matched_row is not None:
+                    claimed.add(matched_row)
+                    level_claims.add(matched_row)
+                    match_methods[roll_row] = "Roll_Div"
+                    level['matched'] += 1
+                else:
+                    match_methods[roll_row] = "Not_Found"
+        return contests
+    
+    @staticmethod
+    def _count_match_methods(match_methods: List[str]) -> Dict[str, int]:
+        counts = {'PRN': 0, 'PRN_Fuzzy': 0, 'Name': 0, 'Roll_Div': 0, 'Not_Found': 0}
+        for method in match_methods:
+            counts[method] = counts.get(method, 0) + 1
+        return {
+            'prn_matches': counts['PRN'],
+            'prn_fuzzy_matches': counts['PRN_Fuzzy'],
+            'name_matches': counts['Name'],
+            'roll_div_matches': counts['Roll_Div'],
+            'no_match': counts['Not_Found']
+        }
+    
+    def _assemble_result(self, fctc_data: RecordTable, roll_call_data: RecordTable, roll_keys: Dict[str, List],
+                         matched_rows: List[Optional[int]], match_methods: List[str], extra_stats: Dict) -> Dict:
+        """Division-wise reports and statistics from per-row match results"""
+        self._report_progress('building_reports')
+        start = time.perf_counter()
+        
+        # Track matching statistics
+        match_stats = self._count_match_methods(match_methods)
+        match_stats.update(extra_stats)
+        
+        # Group students (roll-call row indexes) by division
+        divisions = {}
+        for roll_row, division in enumerate(roll_keys['divisions']):
+            if division not in divisions:
+                divisions[division] = []
+            divisions[division].append(roll_row)
+        
+        print(f"📊 Found {len(divisions)} divisions: {list(divisions.keys())}")
+        print(f"🎯 Matching Statistics:")
+        print(f"  ✓ PRN matches: {match_stats['prn_matches']}")
+        if match_stats['prn_fuzzy_matches']:
+            print(f"  ✓ PRN typo matches: {match_stats['prn_fuzzy_matches']}")
+        print(f"  ✓ Name matches: {match_stats['name_matches']}")
+        print(f"  ✓ Roll+Div matches: {match_stats['roll_div_matches']}")
+        print(f"  ✗ No match (Absent): {match_stats['no_match']}")
+        if match_stats.get('contested_matches'):
+            print(f"  ⚔️  Contested (best candidate taken by another student): {match_stats['contested_matches']}")
+        if match_stats.get('preclaimed_matches'):
+            print(f"  🔒 Best candidate already matched at an earlier level: {match_stats['preclaimed_matches']}")
+        
+        # Show matching effectiveness
+        total_students = len(roll_call_data)
+        total_matched = (match_stats['prn_matches'] + match_stats['prn_fuzzy_matches']
+                         + match_stats['name_matches'] + match_stats['roll_div_matches'])
+        match_rate = (total_matched / total_students * 100) if total_students > 0 else 0
+        print(f"  📈 Match Rate: {match_rate:.1f}% ({total_matched}/{total_students})")
+        
+        # Generate division-wise reports (student dicts are built only here)
+        division_reports = {}
+        for division, roll_rows in divisions.items():
+            students = self._build_student_rows(roll_call_data, fctc_data, roll_rows, matched_rows, match_methods)
+            present_count = sum(1 for roll_row in roll_rows if matched_rows[roll_row] is not None)
+            division_reports[division] = {
+                'students': students,
+                'total_students': len(students),
+                'present_count': present_count,
+                'absent_count': len(students) - present_count
+            }
+            print(f"  📋 Division {division}: {len(students)} students ({division_reports[division]['present_count']} present, {division_reports[division]['absent_count']} absent)")
+        
+        self.timer.record('report_build', time.perf_counter() - start, rows=len(roll_call_data))
+        match_stats['stage_timings'] = self.timer.as_dict()
+        
+        # Return results with division-wise data
+        return {
+            'success': True,
+            'matched_students': total_matched,
+            'total_roll_call': len(roll_call_data),
+            'total_fctc': len(fctc_data),
+            'divisions': list(divisions.keys()),
+            'division_count': len(divisions),
+            'division_reports': division_reports,
+            'match_stats': match_stats,
+            'reports': {
+                'files_created': [f'attendance_report_division_{div}.csv' for div in divisions.keys()],
+                'summary': f"Processed {total_matched} matched students across {len(divisions)} divisions using multi-level matching"
+            }
+        }
+    
     def process_and_generate_reports(self, fctc_file_path, roll_call_file_path, year):
         """
         MULTI-LEVEL MATCHING PIPELINE: Process files and generate division-wise attendance reports
         Matching Priority: 1. PRN → 2. Name (fuzzy) → 3. Roll No + Division
+        Each file argument may be a path or a WorkbookRows from open_workbook; the roll
+        call may also be a RecordTable from a registered roster (roster.Roster.records).
         """
         try:
-            # Read and extract data
-            print("📖 Reading FCTC file...")
-            fctc_data = self.read_fctc_excel(fctc_file_path)
-            print(f"✅ FCTC file processed: {len(fctc_data)} records")
-            
-            print("📖 Reading Roll Call file...")
-            roll_call_data = self.read_roll_call_excel(roll_call_file_path)
-            print(f"✅ Roll Call file processed: {len(roll_call_data)} records")
-            
-            # Create multiple lookup dictionaries from FCTC data
-            print("🔍 Creating lookup dictionaries for multi-level matching...")
+            self.normalizer = Normalizer()
             
-            # Level 1: PRN lookup
-            fctc_lookup_by_prn = {}
-            for record in fctc_data:
-                prn = record['PRN_CLEAN']
-                if prn:
-                    fctc_lookup_by_prn[prn] = record
+            # Read and extract data
+            fctc_data, roll_call_data, parse_stats = self._parse_uploads(fctc_file_path, roll_call_file_path)
             
-            # Level 2: Name lookup (cleaned names)
-            fctc_lookup_by_name = {}
-            for record in fctc_data:
-                name = self._clean_name(record.get('Full_Name', ''))
-                if name:
-                    # Store as list to handle duplicate names
-                    if name not in fctc_lookup_by_name:
-                        fctc_lookup_by_name[name] = []
-                    fctc_lookup_by_name[name].append(record)
+            # Create multiple lookup dictionaries from FCTC data (values are FCTC row indexes)
+            lookups = self._build_fctc_lookups(fctc_data)
             
-            # Level 3: Roll No + Division lookup
-            fctc_lookup_by_roll_div = {}
-            for record in fctc_data:
-                roll_no = self._clean_roll_no(record.get('Roll_Number', ''))
-                # Check both 'Division' and 'Branch_Division' fields
-                division = str(record.get('Division', '')).strip().upper()
-                if not division:
-                    division = str(record.get('Branch_Division', '')).strip().upper()
-                if roll_no and division:
-                    key = f"{roll_no}_{division}"
-                    fctc_lookup_by_roll_div[key] = record
+            # Normalise the roll-call columns in batch before matching
+            roll_keys = self._normalise_roll_call(roll_call_data)
             
-            print(f"  ✓ PRN lookup: {len(fctc_lookup_by_prn)} entries")
-            print(f"  ✓ Name lookup: {len(fctc_lookup_by_name)} entries")
-            print(f"  ✓ Roll+Div lookup: {len(fctc_lookup_by_roll_div)} entries")
+            # Match results per roll-call row: FCTC row index (or None) and method
+            matched_rows = [None] * len(roll_call_data)
+            match_methods = ["Not_Found"] * len(roll_call_data)
+            contests = self._match_roll_call(lookups, roll_keys, range(len(roll_call_data)), matched_rows, match_methods)
             
-            # Debug: Show sample entries from each lookup
-            if fctc_lookup_by_prn:
-                sample_prn = list(fctc_lookup_by_prn.keys())[0]
-                print(f"  📝 Sample PRN: {sample_prn}")
-            if fctc_lookup_by_name:
-                sample_name = list(fctc_lookup_by_name.keys())[0]
-                print(f"  📝 Sample Name: {sample_name}")
-            if fctc_lookup_by_roll_div:
-                sample_key = list(fctc_lookup_by_roll_div.keys())[0]
-                print(f"  📝 Sample Roll+Div: {sample_key}")
+            return self._assemble_result(fctc_data, roll_call_data, roll_keys, matched_rows, match_methods,
+                                         dict(parse_stats, **self._contest_stats(contests)))
             
-            # Warning if lookups are empty
-            if len(fctc_lookup_by_name) == 0:
-                print(f"  ⚠️  WARNING: Name lookup is empty - FCTC file missing 'Full Name' field or all names are empty")
-            if len(fctc_lookup_by_roll_div) == 0:
-                print(f"  ⚠️  WARNING: Roll+Div lookup is empty - FCTC file missing 'Roll Number' or 'Branch-Division' fields")
+        except Exception as e:
+            raise Exception(f"Error in multi-level matching processing: {str(e)}")
+    
+    def process_batch(self, fctc_source, roll_call_sources: Dict[str, object], year=None) -> Dict:
+        """
+        Match several roll calls (label → path, WorkbookRows or roster RecordTable) against
+        one FCTC upload. The FCTC file is parsed and its lookups built once; every roster
+        gets its own process_and_generate_reports-style result, or
+        {'success': False, 'error': ...} when its roll call cannot be processed.
+        Stage timings of the shared FCTC work are in 'stage_timings'; each roster's
+        match_stats time only its own stages.
+        """
+        try:
+            self.normalizer = Normalizer()
             
-            # Track matching statistics
-            match_stats = {
-                'prn_matches': 0,
-                'name_matches': 0,
-                'roll_div_matches': 0,
-                'no_match': 0
-            }
+            print("📖 Reading FCTC file...")
+            self._report_progress('parsing_fctc')
+            start = time.perf_counter()
+            fctc_data = self.read_fctc_excel(fctc_source)
+            fctc_seconds = time.perf_counter() - start
+            print(f"✅ FCTC file processed: {len(fctc_data)} records")
             
-            # Group students by division with multi-level matching
-            divisions = {}
-            for roll_record in roll_call_data:
-                division = str(roll_record.get('Division', 'Unknown')).strip().upper()
-                if not division or division == 'NONE' or division == 'NAN':
-                    division = 'Unknown'
-                
-                if division not in divisions:
-                    divisions[division] = []
-                
-                # Multi-level matching
-                prn = roll_record['PRN_CLEAN']
-                roll_name = self._clean_name(roll_record.get('Name', ''))
-                roll_no = self._clean_roll_no(roll_record.get('Roll_No', ''))
-                
-                matched_record = None
-                match_method = "Not_Found"
+            lookups = self._build_fctc_lookups(fctc_data)
+        except Exception as e:
+            raise Exception(f"Error in batch processing: {str(e)}")
+        
+        fctc_timer = self.timer
+        results = {}
+        for label, roll_call_source in roll_call_sources.items():
+            print(f"📖 Reading Roll Call '{label}'...")
+            self._report_progress('parsing_roll_call')
+            self.timer = StageTimer(dict(fctc_timer.context, roster=label))
+            try:
+                start = time.perf_counter()
+                roll_call_parsed = self._read_roll_call(roll_call_source)
+                roll_call_data = roll_call_parsed.records
+                roll_call_seconds = time.perf_counter() - start
                 
-                # Level 1: Try PRN match
-                if prn and prn in fctc_lookup_by_prn:
-                    matched_record = fctc_lookup_by_prn[prn]
-                    match_method = "PRN"
-                    match_stats['prn_matches'] += 1
+                roll_keys = self._normalise_roll_call(roll_call_data)
+                matched_rows = [None] * len(roll_call_data)
+                match_methods = ["Not_Found"] * len(roll_call_data)
+                contests = self._match_roll_call(lookups, roll_keys, range(len(roll_call_data)), matched_rows, match_methods)
                 
-                # Level 2: Try Name match (fuzzy)
-                elif roll_name:
-                    # First try exact name match
-                    if roll_name in fctc_lookup_by_name:
-                        candidates = fctc_lookup_by_name[roll_name]
-                        # If multiple candidates, try to match by division
-                        if len(candidates) == 1:
-                            matched_record = candidates[0]
-                            match_method = "Name"
-                            match_stats['name_matches'] += 1
-                        else:
-                            # Multiple candidates - try to match by division
-                            for candidate in candidates:
-                                cand_div = str(candidate.get('Division', '')).strip().upper()
-                                if not cand_div:
-                                    cand_div = str(candidate.get('Branch_Division', '')).strip().upper()
-                                if cand_div == division:
-                                    matched_record = candidate
-                                    match_method = "Name"
-                                    match_stats['name_matches'] += 1
-                                    break
-                            # If no division match, take first candidate
-                            if not matched_record:
-                                matched_record = candidates[0]
-                                match_method = "Name"
-                                match_stats['name_matches'] += 1
-                    
-                    # If no exact match, try fuzzy matching
-                    if not matched_record:
-                        for fctc_name, candidates in fctc_lookup_by_name.items():
-                            if self._fuzzy_name_match(roll_name, fctc_name):
-                                # Found fuzzy match
-                                if len(candidates) == 1:
-                                    matched_record = candidates[0]
-                                    match_method = "Name"
-                                    match_stats['name_matches'] += 1
-                                    break
-                                else:
-                                    # Multiple candidates - try to match by division
-                                    for candidate in candidates:
-                                        cand_div = str(candidate.get('Division', '')).strip().upper()
-                                        if not cand_div:
-                                            cand_div = str(candidate.get('Branch_Division', '')).strip().upper()
-                                        if cand_div == division:
-                                            matched_record = candidate
-                                            match_method = "Name"
-                                            match_stats['name_matches'] += 1
-                                            break
-                                    if matched_record:
-                                        break
+                results[label] = self._assemble_result(fctc_data, roll_call_data, roll_keys, matched_rows, match_methods,
+                                                       dict(self._contest_stats(contests),
+                                                            parse_wall_seconds=round(roll_call_seconds, 3),
+                                                            **roll_call_parsed.sheet_stats()))
+            except Exception as e:
+                print(f"❌ Roll Call '{label}' failed: {str(e)}")
+                results[label] = {'success': False, 'error': str(e)}
+        self.timer = fctc_timer
+        
+        return {
+            'success': True,
+            'total_fctc': len(fctc_data),
+            'fctc_parse_seconds': round(fctc_seconds, 3),
+            'stage_timings': fctc_timer.as_dict(),
+            'roster_count': len(results),
+            'rosters': results
+        }
+    
+    def _affected_roll_rows(self, fctc_data: RecordTable, lookups: Dict, roll_keys: Dict[str, List],
+                            matched_rows: List[Optional[int]], match_methods: List[str], changed_prns: set,
+                            contests: Dict[int, str]) -> List[int]:
+        """
+        Roll-call rows whose match can change after the FCTC rows of changed_prns were
+        added or replaced. PRN matches never change (row indexes are stable). Any other
+        row is affected when its PRN is new, its match was a changed row, it shares a
+        name token with a changed row (exact and fuzzy name matches both need one), or
+        it has a changed row's roll+division key (or, with prn_fuzzy, its PRN is one typo
+        from a changed PRN). Matches below Level 1 are assigned one-to-one, so the
+        affected rows are widened to their connected set (_competing_roll_rows); the
+        remaining rows keep their matches.
+        """
+        if not changed_prns:
+            return []
+        changed_rows = {lookups['by_prn'][prn] for prn in changed_prns if prn in lookups['by_prn']}
+        changed_tokens = set()
+        changed_keys = set()
+        for row in changed_rows:
+            changed_tokens.update(self.normalizer.name(fctc_data.get(row, 'Full_Name', '')).split())
+            roll_no = self.normalizer.roll_no(fctc_data.get(row, 'Roll_Number', ''))
+            division = lookups['divisions'][row]
+            if roll_no and division:
+                changed_keys.add(f"{roll_no}_{division}")
+        
+        changed_prn_trie = PrnTrie(changed_prns) if self.prn_fuzzy else None
+        
+        affected = []
+        for roll_row, method in enumerate(match_methods):
+            if method == 'PRN':
+                continue
+            if (roll_keys['prns'][roll_row] in changed_prns
+                    or matched_rows[roll_row] in changed_rows
+                    or f"{roll_keys['roll_nos'][roll_row]}_{roll_keys['divisions'][roll_row]}" in changed_keys
+                    or not changed_tokens.isdisjoint(roll_keys['names'][roll_row].split())
+                    or (changed_prn_trie is not None
+                        and changed_prn_trie.search(roll_keys['prns'][roll_row], PRN_FUZZY_MAX_DISTANCE))):
+                affected.append(roll_row)
+        if not affected:
+            return affected
+        return self._competing_roll_rows(lookups, roll_keys, matched_rows, match_methods, contests, affected)
+    
+    def _candidate_fctc_rows(self, lookups: Dict, roll_keys: Dict[str, List], roll_row: int) -> set:
+        """Every FCTC row Levels 1.5-3 could give a roll-call row, ignoring claims"""
+        prn, division, name, roll_no = (roll_keys['prns'][roll_row], roll_keys['divisions'][roll_row],
+                                        roll_keys['names'][roll_row], roll_keys['roll_nos'][roll_row])
+        rows = set()
+        if lookups.get('prn_trie') is not None and len(prn) >= PRN_FUZZY_MIN_LENGTH:
+            rows.update(lookups['by_prn'][fctc_prn]
+                        for distance, fctc_prn in lookups['prn_trie'].search(prn, PRN_FUZZY_MAX_DISTANCE) if distance)
+        if name:
+            block = division_block(division) if self.name_blocking else None
+            rows.update(fctc_row for _, _, fctc_row in self._name_candidates(lookups, division, name, block))
+        if roll_no and division:
+            fctc_row = lookups['by_roll_div'].get(f"{roll_no}_{division}")
+            if fctc_row is not None:
+                rows.add(fctc_row)
+        return rows
+    
+    def _competing_roll_rows(self, lookups: Dict, roll_keys: Dict[str, List], matched_rows: List[Optional[int]],
+                             match_methods: List[str], contests: Dict[int, str], affected: List[int]) -> List[int]:
+        """
+        Affected rows plus every row that competes with them for an FCTC row
+        Starting from the affected rows, repeatedly add the rows currently holding one of
+        their candidates or matches (they may be outbid) and the rows that lost one of
+        those candidates last time (contests; they may now get it), until nothing new
+        joins. Rows outside this set neither want nor hold anything inside it, so their
+        one-to-one assignment cannot change. FCTC rows matched by PRN are never released.
+        """
+        holders = {}
+        prn_claimed = set()
+        for roll_row, fctc_row in enumerate(matched_rows):
+            if fctc_row is not None:
+                if match_methods[roll_row] == 'PRN':
+                    prn_claimed.add(fctc_row)
+                else:
+                    holders[fctc_row] = roll_row
+        contenders: Dict[int, List[int]] = {}
+        for roll_row in contests:
+            if match_methods[roll_row] != 'PRN':
+                for fctc_row in self._candidate_fctc_rows(lookups, roll_keys, roll_row):
+                    contenders.setdefault(fctc_row, []).append(roll_row)
+        
+        rows = set(affected)
+        queue = list(affected)
+        seen = set(prn_claimed)
+        while queue:
+            roll_row = queue.pop()
+            wanted = self._candidate_fctc_rows(lookups, roll_keys, roll_row)
+            if matched_rows[roll_row] is not None:
+                wanted.add(matched_rows[roll_row])
+            for fctc_row in wanted - seen:
+                seen.add(fctc_row)
+                competitors = contenders.get(fctc_row, [])
+                if fctc_row in holders:
+                    competitors = competitors + [holders[fctc_row]]
+                for other in competitors:
+                    if other not in rows:
+                        rows.add(other)
+                        queue.append(other)
+        return sorted(rows)
+    
+    def process_incremental(self, store, fctc_source, roll_call_source, year, roll_call_key: str) -> Dict:
+        """
+        Like process_and_generate_reports, but the FCTC upload is ingested into an
+        fctc_store.FCTCStore: only responses the store has not seen before are read
+        into the per-PRN best-score table, and for a roll call seen before with the
+        same matcher settings (roll_call_key, e.g. its file digest) only the affected
+        entries are re-matched.
+        """
+        try:
+            with store.lock:
+                # The store object may have been loaded before another request saved
+                store.refresh()
+                self.normalizer = Normalizer()
+                start = time.perf_counter()
+                previous_count = len(store)
+                self._report_progress('parsing_fctc')
+                try:
+                    # Rows are read and merged inside the store, so reading counts as extraction here
+                    with self.timer.stage('extraction') as ingest_stage:
+                        ingest_stage['kind'] = 'fctc_store'
+                        ingest = store.ingest(self, fctc_source)
+                        ingest_stage['rows'] = ingest['new_rows']
+                except (FileFormatError, WorkbookReadError) as e:
+                    raise Exception(self._unreadable_file_message(e))
+                fctc_data = store.records(self)
+                self._report_progress('parsing_roll_call')
+                roll_call_parsed = self.parse_upload(roll_call_source, 'roll_call')
+                roll_call_data = roll_call_parsed.records
+                parse_seconds = time.perf_counter() - start
+                print(f"✅ FCTC store '{store.store_id}': {ingest['new_rows']} new responses, {len(fctc_data)} PRNs")
+                if ingest['untimed_rows']:
+                    print(f"⚠️  {ingest['untimed_rows']} FCTC responses without a readable Timestamp were not ingested")
                 
-                # Level 3: Try Roll No + Division match
-                if not matched_record and roll_no and division:
-                    key = f"{roll_no}_{division}"
-                    if key in fctc_lookup_by_roll_div:
-                        matched_record = fctc_lookup_by_roll_div[key]
-                        match_method = "Roll_Div"
-                        match_stats['roll_div_matches'] += 1
+                lookups = self._build_fctc_lookups(fctc_data)
+                roll_keys = self._normalise_roll_call(roll_call_data)
                 
-                # Determine status and score
-                if matched_record:
-                    status = "Present"
-                    score = matched_record.get('Score', 'N/A')
+                state = store.match_state(roll_call_key, self.matcher_settings())
+                if (state and 'contests' in state and state['fctc_count'] == previous_count
+                        and state['roll_count'] == len(roll_call_data)):
+                    match_mode = 'incremental'
+                    matched_rows = state['matched_rows']
+                    match_methods = state['match_methods']
+                    roll_rows = self._affected_roll_rows(fctc_data, lookups, roll_keys, matched_rows,
+                                                         match_methods, ingest['changed_prns'], state['contests'])
                 else:
-                    status = "Absent"
-                    score = "N/A"
-                    match_stats['no_match'] += 1
+                    match_mode = 'full'
+                    matched_rows = [None] * len(roll_call_data)
+                    match_methods = ["Not_Found"] * len(roll_call_data)
+                    roll_rows = range(len(roll_call_data))
                 
-                divisions[division].append({
-                    'PRN': roll_record['PRN_RAW'],
-                    'Roll_No': roll_record['Roll_No'],
-                    'Name': roll_record['Name'],
-                    'Division': roll_record['Division'],
-                    'Attendance_Status': status,
-                    'Score': score,
-                    'Match_Method': match_method
-                })
-            
-            print(f"📊 Found {len(divisions)} divisions: {list(divisions.keys())}")
-            print(f"🎯 Matching Statistics:")
-            print(f"  ✓ PRN matches: {match_stats['prn_matches']}")
-            print(f"  ✓ Name matches: {match_stats['name_matches']}")
-            print(f"  ✓ Roll+Div matches: {match_stats['roll_div_matches']}")
-            print(f"  ✗ No match (Absent): {match_stats['no_match']}")
-            
-            # Show matching effectiveness
-            total_students = len(roll_call_data)
-            total_matched = match_stats['prn_matches'] + match_stats['name_matches'] + match_stats['roll_div_matches']
-            match_rate = (total_matched / total_students * 100) if total_students > 0 else 0
-            print(f"  📈 Match Rate: {match_rate:.1f}% ({total_matched}/{total_students})")
-            print(f"  ✓ Name matches: {match_stats['name_matches']}")
-            print(f"  ✓ Roll+Div matches: {match_stats['roll_div_matches']}")
-            print(f"  ✗ No match (Absent): {match_stats['no_match']}")
-            
-            # Generate division-wise reports
-            division_reports = {}
-            for division, students in divisions.items():
-                division_reports[division] = {
-                    'students': students,
-                    'total_students': len(students),
-                    'present_count': sum(1 for s in students if s['Attendance_Status'] == 'Present'),
-                    'absent_count': sum(1 for s in students if s['Attendance_Status'] == 'Absent')
-                }
-                print(f"  📋 Division {division}: {len(students)} students ({division_reports[division]['present_count']} present, {division_reports[division]['absent_count']} absent)")
-            
-            # Calculate total matched students
-            total_matched = match_stats['prn_matches'] + match_stats['name_matches'] + match_stats['roll_div_matches']
-            
-            # Return results with division-wise data
-            result = {
-                'success': True,
-                'matched_students': total_matched,
-                'total_roll_call': len(roll_call_data),
-                'total_fctc': len(fctc_data),
-                'divisions': list(divisions.keys()),
-                'division_count': len(divisions),
-                'division_reports': division_reports,
-                'match_stats': match_stats,
-                'reports': {
-                    'files_created': [f'attendance_report_division_{div}.csv' for div in divisions.keys()],
-                    'summary': f"Processed {total_matched} matched students across {len(divisions)} divisions using multi-level matching"
+                # Contests of rows not re-matched carry over from the last run
+                rematched = set(roll_rows)
+                contests = {roll_row: contest for roll_row, contest in (state or {}).get('contests', {}).items()
+                            if match_mode == 'incremental' and roll_row not in rematched}
+                if match_mode == 'full' or roll_rows:
+                    contests.update(self._match_roll_call(lookups, roll_keys, roll_rows, matched_rows, match_methods))
+                store.save_match_state(roll_call_key, self.matcher_settings(), len(fctc_data), matched_rows,
+                                       match_methods, contests)
+                print(f"🔁 Matching ({match_mode}): {len(roll_rows)} of {len(roll_call_data)} roll-call entries")
+                
+                store_stats = {
+                    'fctc_store': store.store_id,
+                    'fctc_new_rows': ingest['new_rows'],
+                    'fctc_skipped_rows': ingest['skipped_rows'],
+                    'fctc_untimed_rows': ingest['untimed_rows'],
+                    'fctc_changed_prns': len(ingest['changed_prns']),
+                    'fctc_watermark': store.watermark.isoformat() if store.watermark else None,
+                    'match_mode': match_mode,
+                    'rematched_rows': len(roll_rows),
+                    'parse_wall_seconds': round(parse_seconds, 3)
                 }
-            }
-            
-            return result
+                store_stats.update(self._contest_stats(contests))
+                store_stats.update(roll_call_parsed.sheet_stats())
+                return self._assemble_result(fctc_data, roll_call_data, roll_keys, matched_rows, match_methods, store_stats)
             
         except Exception as e:
-            raise Exception(f"Error in multi-level matching processing: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error in multi-level matching processing: {str(e)}")
@@ -0,0 +1,184 @@
+# Matching helpers for the multi-level pipeline in logic.py
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def division_block(division: str) -> str:
+    """Blocking key of a normalised division: its last '-' part ("CS-A" and "A" both give "A")"""
+    return division.rsplit('-', 1)[-1].strip() if division else ''
+
+
+class NameTokenIndex:
+    """
+    Inverted index (name token → FCTC names) for Level 2 fuzzy matching.
+
+    Jaccard similarity >= threshold (> 0) needs at least one shared token, so
+    only names sharing a token with the query are scored. Token sets are built
+    once per FCTC name instead of once per comparison.
+
+    ranked_matches returns exactly the names ExamProcessor._fuzzy_name_match
+    accepts, so it agrees with a full linear scan.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: List[str] = []
+        self._token_sets: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str) -> None:
+        """Add a cleaned name (duplicates should be grouped by the caller)"""
+        tokens = set(name.split()) if name else set()
+        if not tokens:
+            return
+
+        ordinal = len(self._names)
+        self._names.append(name)
+        self._token_sets.append(tokens)
+        for token in tokens:
+            self._postings.setdefault(token, []).append(ordinal)
+
+    def ranked_matches(self, name: str, threshold: float = 0.8) -> List[Tuple[float, str]]:
+        """(score, name) of every indexed name scoring >= threshold, best first; ties keep insertion order"""
+        scored = sorted(self._scored(name, threshold), key=lambda item: -item[0])
+        return [(score, self._names[ordinal]) for score, ordinal in scored]
+
+    def _scored(self, name: str, threshold: float) -> Iterator[Tuple[float, int]]:
+        if not name:
+            return
+
+        tokens = set(name.split())
+        if not tokens:
+            return
+
+        # Candidate generation (prefix filter): a score >= threshold needs at least
+        # `required` shared tokens, so a match contains one of the query's
+        # len - required + 1 rarest tokens; only their postings are read
+        required = max(1, math.ceil(threshold * len(tokens) - 1e-9))
+        rarest = sorted(tokens, key=lambda token: len(self._postings.get(token, ())))
+        ordinals = set()
+        for token in rarest[:len(tokens) - required + 1]:
+            postings = self._postings.get(token)
+            if postings:
+                ordinals.update(postings)
+
+        for ordinal in sorted(ordinals):
+            candidate_tokens = self._token_sets[ordinal]
+            intersection = len(tokens & candidate_tokens)
+            union = len(tokens) + len(candidate_tokens) - intersection
+            score = intersection / union
+            if score >= threshold:
+                yield score, ordinal
+
+
+class BlockedNameIndex:
+    """
+    NameTokenIndex over every FCTC name plus one per block (division).
+
+    Fuzzy candidates are first drawn from the query's own block, so a roll-call
+    name is only scored against its division; the whole population is searched
+    only when nothing in the block reaches the threshold.
+    """
+
+    def __init__(self):
+        self.everyone = NameTokenIndex()
+        self.blocks: Dict[str, NameTokenIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self.everyone)
+
+    def add(self, name: str, blocks: Iterable[str]) -> None:
+        """Add a cleaned name once, with the distinct blocks of the rows carrying it"""
+        self.everyone.add(name)
+        for block in blocks:
+            if block:
+                self.blocks.setdefault(block, NameTokenIndex()).add(name)
+
+    def ranked_matches(self, name: str, block: Optional[str] = None,
+                       threshold: float = 0.8) -> Tuple[List[Tuple[float, str]], bool]:
+        """
+        (ranked_matches, widened): matches within `block`, or across everyone when the
+        block has none (widened=True). block=None searches everyone directly.
+        """
+        block_index = self.blocks.get(block) if block else None
+        if block_index is not None:
+            matches = block_index.ranked_matches(name, threshold)
+            if matches:
+                return matches, False
+        return self.everyone.ranked_matches(name, threshold), block is not None
+
+
+class PrnTrie:
+    """
+    Character trie over FCTC PRNs for Level 1.5 (PRN typo recovery).
+
+    search() walks the trie along the query, spending an edit (substitution,
+    insertion, deletion, or transposition of two adjacent characters) only where
+    the query leaves the stored PRNs; once the budget is spent the walk is a plain
+    dict chain. A distance-1 lookup so touches O(length x branching) nodes rather
+    than every stored PRN ("12310070" and "2310007" are both 1 from "12310007").
+    """
+
+    _END = ''  # Key of the PRN stored at a terminal node (never a PRN character)
+
+    def __init__(self, prns: Iterable[str] = ()):
+        self._root: Dict[str, object] = {}
+        self._size = 0
+        for prn in prns:
+            self.add(prn)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, prn: str) -> None:
+        if not prn:
+            return
+        node = self._root
+        for char in prn:
+            node = node.setdefault(char, {})
+        if self._END not in node:
+            node[self._END] = prn
+            self._size += 1
+
+    def search(self, query: str, max_distance: int = 1) -> List[Tuple[int, str]]:
+        """(distance, PRN) of every stored PRN within max_distance edits of query, closest first"""
+        if not query:
+            return []
+        found: Dict[str, int] = {}
+        self._walk(self._root, query, 0, max_distance, 0, found)
+        return sorted((distance, prn) for prn, distance in found.items())
+
+    def _walk(self, node: Dict, query: str, position: int, budget: int, used: int, found: Dict[str, int]) -> None:
+        if position == len(query):
+            prn = node.get(self._END)
+            if prn is not None and used < found.get(prn, used + 1):
+                found[prn] = used
+            if budget:
+                for char, child in node.items():
+                    if char != self._END:
+                        self._walk(child, query, position, budget - 1, used + 1, found)  # Insertion at the end
+            return
+
+        char = query[position]
+        child = node.get(char)
+        if child is not None:
+            self._walk(child, query, position + 1, budget, used, found)
+        if not budget:
+            return
+
+        self._walk(node, query, position + 1, budget - 1, used + 1, found)  # Deletion of query[position]
+        for other, child in node.items():
+            if other == self._END:
+                continue
+            self._walk(child, query, position, budget - 1, used + 1, found)  # Insertion of `other`
+            if other != char:
+                self._walk(child, query, position + 1, budget - 1, used + 1, found)  # Substitution
+        if position + 1 < len(query) and query[position + 1] != char:
+            swapped = node.get(query[position + 1])
+            swapped = swapped.get(char) if swapped is not None else None
+            if swapped is not None:
+                self._walk(swapped, query, position + 2, budget - 1, used + 1, found)  # Transposition
@@ -0,0 +1,204 @@
+# Value normalisation for PRN / name / roll number / division matching
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Precompiled patterns (previously re-parsed through re.sub on every call)
+DECIMAL_SUFFIX_PATTERN = re.compile(r'\.0+$')
+NON_PRN_PATTERN = re.compile(r'[^\w\-]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+NON_NAME_PATTERN = re.compile(r'[^A-Z\s]')
+NON_WORD_PATTERN = re.compile(r'[^\w]')
+
+# Placeholder strings left behind by Excel / pandas for empty cells
+INVALID_VALUES = frozenset(['', 'NAN', 'NONE', 'NAT', 'NULL'])
+
+# Text layouts of the Google Forms "Timestamp" column whose field order is fixed
+TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d %I:%M:%S %p',  # Forms "Download responses (.csv)", after its GMT offset is removed
+)
+# dd/mm/yyyy vs mm/dd/yyyy depends on the sheet's locale, so the order is decided per
+# file (detect_date_order) and only that order's layouts are tried
+SLASH_TIMESTAMP_FORMATS = {
+    'day_first': ('%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M'),
+    'month_first': ('%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M'),
+}
+SLASH_DATE_PATTERN = re.compile(r'^\s*(\d{1,2})/(\d{1,2})/\d{4}\b')
+# Zone suffix of the Forms CSV export, e.g. "2024/01/15 10:23:45 AM GMT+5:30"
+GMT_OFFSET_PATTERN = re.compile(r'\s*GMT([+-])(\d{1,2})(?::?(\d{2}))?$')
+# Day zero of Excel serial date numbers
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Default number of distinct values cached per cleaner for one request
+DEFAULT_CACHE_SIZE = 65536
+
+
+def clean_prn(prn_value) -> str:
+    """Clean and standardize PRN format"""
+    if prn_value is None:
+        return ""
+
+    prn_str = str(prn_value).strip().upper()
+    # Remove decimal points (Excel formatting)
+    prn_str = DECIMAL_SUFFIX_PATTERN.sub('', prn_str)
+    # Remove any non-alphanumeric characters except common separators
+    prn_clean = NON_PRN_PATTERN.sub('', prn_str)
+
+    # Filter out invalid values
+    if prn_clean in INVALID_VALUES:
+        return ""
+
+    return prn_clean
+
+
+def clean_name(name_value) -> str:
+    """Clean and normalize name for matching"""
+    if name_value is None:
+        return ""
+
+    name_str = str(name_value).strip().upper()
+    # Remove extra spaces
+    name_str = WHITESPACE_PATTERN.sub(' ', name_str)
+    # Remove special characters but keep spaces
+    name_str = NON_NAME_PATTERN.sub('', name_str)
+
+    # Filter out invalid values
+    if name_str in INVALID_VALUES:
+        return ""
+
+    return name_str
+
+
+def clean_roll_no(roll_no_value) -> str:
+    """Clean and normalize roll number"""
+    if roll_no_value is None:
+        return ""
+
+    roll_str = str(roll_no_value).strip().upper()
+    # Remove decimal points (Excel formatting)
+    roll_str = DECIMAL_SUFFIX_PATTERN.sub('', roll_str)
+    # Remove any non-alphanumeric characters
+    roll_clean = NON_WORD_PATTERN.sub('', roll_str)
+
+    # Filter out invalid values
+    if roll_clean in INVALID_VALUES:
+        return ""
+
+    # Remove leading zeros: "01" → "1", "002" → "2"
+    # But keep if it's all zeros or has letters: "00" → "0", "R01" → "R01"
+    if roll_clean.isdigit():
+        roll_clean = str(int(roll_clean))  # Converts "01" to "1", "002" to "2"
+
+    return roll_clean
+
+
+def clean_division(division_value) -> str:
+    """Normalize a division label the way the matcher compares them (str → strip → upper)"""
+    return str(division_value).strip().upper()
+
+
+def detect_date_order(values: Iterable) -> Optional[str]:
+    """
+    'day_first' or 'month_first' for a column of dd/mm vs mm/dd text timestamps, or None
+    The order is decided by dates whose first or second field is above 12; None means
+    no such date (every slash date is ambiguous, or there are none). Raises ValueError
+    when the column holds both orders.
+    """
+    orders = set()
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        found = SLASH_DATE_PATTERN.match(value)
+        if not found:
+            continue
+        first, second = int(found.group(1)), int(found.group(2))
+        if first > 12 >= second:
+            orders.add('day_first')
+        elif second > 12 >= first:
+            orders.add('month_first')
+        if len(orders) > 1:
+            raise ValueError("Timestamp column mixes dd/mm/yyyy and mm/dd/yyyy dates")
+    return orders.pop() if orders else None
+
+
+def parse_timestamp(value, date_order: Optional[str] = None):
+    """
+    Form response timestamp as a naive datetime (UTC if it carried a zone), or None
+    `date_order` ('day_first' / 'month_first', see detect_date_order) reads dd/mm vs
+    mm/dd text dates; without it only slash dates that fit one order are accepted.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        # pandas.Timestamp → plain datetime so values pickle / compare uniformly
+        return datetime(value.year, value.month, value.day, value.hour, value.minute,
+                        value.second, value.microsecond)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, (int, float)):
+        if value != value or value <= 0:  # NaN or blank-cell zero
+            return None
+        return EXCEL_EPOCH + timedelta(days=float(value))
+
+    text = str(value).strip()
+    if text.upper() in INVALID_VALUES:
+        return None
+    try:
+        return parse_timestamp(datetime.fromisoformat(text), date_order)
+    except ValueError:
+        pass
+    offset = timedelta(0)
+    zone = GMT_OFFSET_PATTERN.search(text)
+    if zone:
+        sign, hours, minutes = zone.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0)) * (1 if sign == '+' else -1)
+        text = text[:zone.start()]
+    layouts = TIMESTAMP_FORMATS
+    slash_date = SLASH_DATE_PATTERN.match(text)
+    if slash_date:
+        if date_order is None:
+            # Ambiguous (e.g. 03/05/2024) unless one field can only be the day
+            date_order = detect_date_order([text])
+            if date_order is None:
+                return None
+        layouts = SLASH_TIMESTAMP_FORMATS[date_order]
+    for layout in layouts:
+        try:
+            return datetime.strptime(text, layout) - offset
+        except ValueError:
+            continue
+    return None
+
+
+class Normalizer:
+    """
+    Memoising front end for the cleaners, meant to live for one request
+    Each cleaner keeps a bounded LRU cache (typed, so 1, 1.0 and True stay
+    distinct), which pays off because the same PRNs, names and divisions are
+    cleaned on both sides of the match and repeatedly inside the fuzzy loop.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.prn = lru_cache(maxsize=cache_size, typed=True)(clean_prn)
+        self.name = lru_cache(maxsize=cache_size, typed=True)(clean_name)
+        self.roll_no = lru_cache(maxsize=cache_size, typed=True)(clean_roll_no)
+        self.division = lru_cache(maxsize=cache_size, typed=True)(clean_division)
+        self._cleaners: Dict[str, Callable] = {
+            'prn': self.prn,
+            'name': self.name,
+            'roll_no': self.roll_no,
+            'division': self.division,
+        }
+
+    def clean_column(self, kind: str, values: Iterable) -> List[str]:
+        """Batch API: clean a whole column ('prn', 'name', 'roll_no' or 'division') in one call"""
+        cleaner = self._cleaners[kind]
+        return [cleaner(value) for value in values]
+
+    def cache_info(self) -> Dict[str, Dict]:
+        """Hit/miss counters per cleaner (for diagnostics)"""
+        return {kind: cleaner.cache_info()._asdict() for kind, cleaner in self._cleaners.items()}
@@ -0,0 +1,97 @@
+# Column-oriented record storage for extracted FCTC / Roll Call data
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+class RecordTable:
+    """
+    Columnar record store: one list (or typed array) per field, rows addressed
+    by integer index. Replaces one dict per student, so field names are stored
+    once per table instead of once per row. Matching works on row indexes;
+    dicts are only built at the serialisation boundary (row_dict / to_dicts).
+    """
+
+    def __init__(self, fields: Sequence[str], typecodes: Optional[Dict[str, str]] = None):
+        typecodes = typecodes or {}
+        self.fields = tuple(fields)
+        self.columns: Dict[str, Sequence] = {
+            field: array(typecodes[field]) if field in typecodes else []
+            for field in self.fields
+        }
+        self._appenders = [self.columns[field].append for field in self.fields]
+        self._length = 0
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence]) -> 'RecordTable':
+        """Build a table around already-built columns (all the same length, in field order)"""
+        table = cls(list(columns))
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("RecordTable columns must all have the same length")
+        table.__setstate__({'fields': table.fields, 'columns': dict(columns), 'length': lengths.pop() if lengths else 0})
+        return table
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate rows as dicts (compatibility with list-of-dict callers)"""
+        for row in range(self._length):
+            yield self.row_dict(row)
+
+    def __getitem__(self, index):
+        """Row dict by index, or a list of row dicts for a slice"""
+        if isinstance(index, slice):
+            return [self.row_dict(row) for row in range(self._length)[index]]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("RecordTable row index out of range")
+        return self.row_dict(index)
+
+    # Pickling support (worker processes, caches): bound appenders are rebuilt
+    def __getstate__(self):
+        return {'fields': self.fields, 'columns': self.columns, 'length': self._length}
+
+    def __setstate__(self, state):
+        self.fields = state['fields']
+        self.columns = state['columns']
+        self._appenders = [self.columns[field].append for field in self.fields]
+        self._length = state['length']
+
+    def has_field(self, field: str) -> bool:
+        return field in self.columns
+
+    def append(self, values: Sequence) -> int:
+        """Append one row given in field order; returns its row index"""
+        for append, value in zip(self._appenders, values):
+            append(value)
+        self._length += 1
+        return self._length - 1
+
+    def column(self, field: str) -> Sequence:
+        """The whole column for a field (KeyError if the table has no such field)"""
+        return self.columns[field]
+
+    def get(self, row: int, field: str, default=None):
+        """Like record.get(field, default) on the old per-row dicts"""
+        column = self.columns.get(field)
+        if column is None:
+            return default
+        return column[row]
+
+    def approx_nbytes(self) -> int:
+        """Rough memory footprint (containers plus values) for size-bounded caches"""
+        total = sys.getsizeof(self.columns)
+        for column in self.columns.values():
+            total += sys.getsizeof(column)
+            if not isinstance(column, array):
+                total += sum(sys.getsizeof(value) for value in column)
+        return total
+
+    def row_dict(self, row: int) -> Dict:
+        return {field: self.columns[field][row] for field in self.fields}
+
+    def to_dicts(self) -> List[Dict]:
+        return [self.row_dict(row) for row in range(self._length)]
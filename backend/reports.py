@@ -0,0 +1,72 @@
+# Streaming CSV / zip builders for division attendance reports
+import csv
+import io
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Rows written per yielded chunk when streaming CSV
+CSV_CHUNK_ROWS = 500
+
+
+def safe_division_name(division: str) -> str:
+    """Division label usable in file names and URLs"""
+    return division.replace('/', '_').replace('\\', '_').replace(' ', '_')
+
+
+def division_filename(division: str) -> str:
+    return f'attendance_report_division_{safe_division_name(division)}.csv'
+
+
+def iter_csv_content(students: List[Dict], chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """Yield the CSV for a list of student dicts in chunks (header from the first row's keys)"""
+    if not students:
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=students[0].keys())
+    writer.writeheader()
+
+    for start in range(0, len(students), chunk_rows):
+        writer.writerows(students[start:start + chunk_rows])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that lets zipfile stream into a generator"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_content(files: Iterable[Tuple[str, List[Dict]]]) -> Iterator[bytes]:
+    """Yield a zip archive of (filename, students) CSV files without building it in memory"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, students in files:
+            with archive.open(filename, 'w') as member:
+                for chunk in iter_csv_content(students):
+                    member.write(chunk.encode('utf-8'))
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory is written when the archive closes
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,189 @@
+# Persistent roll-call rosters: parse a roll call once, reuse it for every /process call
+#
+# A roster holds the extracted roll-call records only: no memory map and no on-disk
+# PRN / name-token / (Roll No, Division) indexes. The matcher's indexes are built over
+# the FCTC responses (the side that changes per request), and the roll-call keys it
+# needs come from one normalisation pass (ExamProcessor._normalise_roll_call), so a
+# roster saves the upload and the workbook parse, not any matching work.
+import json
+import os
+import pickle
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from records import RecordTable
+
+ROSTER_MAGIC = b'FCTCRST3'
+# Earlier layouts: tagged strings + indexes (1), 8-byte aligned pickled columns (2)
+OLD_ROSTER_MAGICS = (b'FCTCRST1', b'FCTCRST2')
+ROSTER_SUFFIX = '.roster'
+ROSTER_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+
+class RosterError(Exception):
+    """Unknown roster ID or unreadable roster file"""
+
+
+def write_roster(path: str, records: RecordTable, metadata: Dict) -> None:
+    """
+    Write a roster file: magic, uint32 header length, JSON header, then one section per column
+    Each column is a pickled list of the raw cell values (PRN_RAW may be an int), so
+    loading it is a single pickle.loads instead of decoding cell by cell.
+    """
+    sections: List[Tuple[str, bytes]] = [
+        (f'col:{field}', pickle.dumps(list(records.column(field)), protocol=pickle.HIGHEST_PROTOCOL))
+        for field in records.fields
+    ]
+
+    layout = {}
+    position = 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data)
+
+    header = dict(metadata, fields=list(records.fields), row_count=len(records), sections=layout)
+    header_bytes = json.dumps(header).encode('utf-8')
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(ROSTER_MAGIC + len(header_bytes).to_bytes(4, 'little') + header_bytes)
+        for _, data in sections:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_roster_header(path: str) -> Tuple[Dict, int]:
+    """(header dict, byte offset where sections start) without reading the columns"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(ROSTER_MAGIC))
+        if magic in OLD_ROSTER_MAGICS:
+            raise RosterError(f"Roster {os.path.basename(path)} uses an old file format; register it again")
+        if magic != ROSTER_MAGIC:
+            raise RosterError(f"Not a roster file: {os.path.basename(path)}")
+        header_length = int.from_bytes(f.read(4), 'little')
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    return header, len(ROSTER_MAGIC) + 4 + header_length
+
+
+class Roster:
+    """
+    One registered roster file
+    The header (metadata) is read on open; records() loads the roll-call columns
+    into a RecordTable for the matcher, which builds its own lookups from them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.metadata, self._base = read_roster_header(path)
+        self._records: Optional[RecordTable] = None
+
+    def __enter__(self) -> 'Roster':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.metadata['row_count']
+
+    @property
+    def roster_id(self) -> str:
+        return self.metadata['roster_id']
+
+    def records(self) -> RecordTable:
+        """Roll-call records in registration order (loaded once, then reused)"""
+        if self._records is None:
+            columns = {}
+            with open(self.path, 'rb') as f:
+                for field in self.metadata['fields']:
+                    start, length = self.metadata['sections'][f'col:{field}']
+                    f.seek(self._base + start)
+                    columns[field] = pickle.loads(f.read(length))
+            self._records = RecordTable.from_columns(columns)
+        return self._records
+
+    def close(self) -> None:
+        self._records = None
+
+
+class RosterStore:
+    """
+    Directory of registered rosters, one <roster_id>.roster file each
+    The roster ID is derived from the roll-call file's SHA-256, so registering
+    the same file twice returns the existing roster.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def roster_id_for(file_digest: str) -> str:
+        return file_digest[:16]
+
+    def _path(self, roster_id: str) -> str:
+        if not ROSTER_ID_PATTERN.match(roster_id or ''):
+            raise RosterError(f"Invalid roster ID: {roster_id}")
+        return os.path.join(self.directory, f"{roster_id}{ROSTER_SUFFIX}")
+
+    def exists(self, roster_id: str) -> bool:
+        try:
+            return os.path.exists(self._path(roster_id))
+        except RosterError:
+            return False
+
+    def register(self, records: RecordTable, file_digest: str, source_filename: str = '',
+                 label: str = '') -> Dict:
+        """Store parsed roll-call records; returns the roster metadata"""
+        roster_id = self.roster_id_for(file_digest)
+        path = self._path(roster_id)
+        if os.path.exists(path):
+            try:
+                return self.metadata(roster_id)
+            except RosterError:
+                pass  # Old-format or damaged file: written again below
+
+        os.makedirs(self.directory, exist_ok=True)
+        divisions = sorted({str(division).strip() for division in records.column('Division') if division is not None})
+        metadata = {
+            'roster_id': roster_id,
+            'file_sha256': file_digest,
+            'label': label,
+            'source_filename': source_filename,
+            'divisions': divisions,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        write_roster(path, records, metadata)
+        return self.metadata(roster_id)
+
+    def metadata(self, roster_id: str) -> Dict:
+        path = self._path(roster_id)
+        if not os.path.exists(path):
+            raise RosterError(f"Unknown roster ID: {roster_id}")
+        header, _ = read_roster_header(path)
+        return {key: value for key, value in header.items() if key != 'sections'}
+
+    def list(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        rosters = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(ROSTER_SUFFIX):
+                try:
+                    rosters.append(self.metadata(name[:-len(ROSTER_SUFFIX)]))
+                except (RosterError, OSError, ValueError):
+                    continue
+        return rosters
+
+    def open(self, roster_id: str) -> Roster:
+        path = self._path(roster_id)
+        if not os.path.exists(path):
+            raise RosterError(f"Unknown roster ID: {roster_id}")
+        return Roster(path)
+
+    def delete(self, roster_id: str) -> bool:
+        path = self._path(roster_id)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
@@ -0,0 +1,84 @@
+# Per-stage timings for the matching pipeline: reported in match_stats and logged as JSON lines
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger('fctc.timing')
+
+# Stages in pipeline order (match_stats['stage_timings'] keeps this order)
+PIPELINE_STAGES = (
+    'read',               # Opening the file and pulling rows through the reader (openpyxl / pandas / csv)
+    'header_detection',   # Scanning the leading rows for the header row
+    'extraction',         # Projecting, cleaning and de-duplicating rows into RecordTables
+    'index_build',        # FCTC lookups (PRN, name, name tokens, roll+division)
+    'normalisation',      # Roll-call keys cleaned in batch for matching
+    'match_level_1',      # PRN
+    'match_level_1_5',    # PRN within edit distance 1 (optional)
+    'match_level_2',      # Exact and fuzzy name
+    'match_level_3',      # Roll No + Division
+    'report_build',       # Division reports and statistics
+    'serialisation'       # CSV / JSON response building in app.py
+)
+
+
+def log_stage(context: Dict, stage: str, seconds: float, **counts) -> None:
+    """One structured log line per timed stage"""
+    logger.info(json.dumps(dict(context, event='stage', stage=stage, seconds=round(seconds, 6), **counts),
+                           default=str))
+
+
+class StageTimer:
+    """
+    Accumulated seconds and counts (rows, matched, ...) per pipeline stage
+    A stage may be recorded several times (e.g. 'read' for both uploads); its
+    seconds and counts add up. Every record is logged with the timer's context,
+    which carries a run ID so the lines of one request can be grouped.
+    """
+
+    def __init__(self, context: Optional[Dict] = None):
+        self.context = dict(context or {})
+        self.context.setdefault('run', uuid.uuid4().hex[:12])
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage: str, seconds: float, rows: Optional[int] = None, **counts) -> None:
+        if rows is not None:
+            counts['rows'] = rows
+        log_stage(self.context, stage, seconds, **counts)
+        self._add(stage, seconds, counts)
+
+    def _add(self, stage: str, seconds: float, counts: Dict) -> None:
+        entry = self.stages.setdefault(stage, {'seconds': 0.0})
+        entry['seconds'] += seconds
+        for key, value in counts.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                entry[key] = entry.get(key, 0) + value
+
+    @contextmanager
+    def stage(self, stage: str, rows: Optional[int] = None) -> Iterator[Dict]:
+        """Time a block; counts known only at the end can be set on the yielded dict"""
+        counts = {'rows': rows} if rows is not None else {}
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.record(stage, time.perf_counter() - start, **counts)
+
+    def seconds(self, stage: str) -> float:
+        return self.stages.get(stage, {}).get('seconds', 0.0)
+
+    def merge(self, stages: Dict[str, Dict[str, float]]) -> None:
+        """Add stages timed elsewhere (a worker process's timer, already logged there)"""
+        for stage, entry in stages.items():
+            counts = {key: value for key, value in entry.items() if key != 'seconds'}
+            self._add(stage, entry['seconds'], counts)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Stages in pipeline order, seconds rounded to 0.1 ms"""
+        order = {stage: position for position, stage in enumerate(PIPELINE_STAGES)}
+        return {
+            stage: dict(entry, seconds=round(entry['seconds'], 4))
+            for stage, entry in sorted(self.stages.items(), key=lambda item: order.get(item[0], len(order)))
+        }
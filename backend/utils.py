@@ -1,4 +1,6 @@
 # Helper functions and utilities
+import codecs
+import csv
 import os
 import logging
 
@@ -13,8 +15,143 @@ def validate_file_extension(filename, allowed_extensions):
     extension = filename.rsplit('.', 1)[1].lower()
     return extension in allowed_extensions
 
+# File signatures used by sniff_excel_format
+ZIP_SIGNATURE = b'PK\x03\x04'
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Uploads with these extensions are read as delimited text (Google Forms "Download responses (.csv)")
+TEXT_EXTENSIONS = ('csv', 'tsv')
+# Delimiters considered when sniffing a text upload, and the bytes sampled to pick one
+TEXT_DELIMITERS = ',\t;|'
+TEXT_SAMPLE_BYTES = 64 * 1024
+
+class FileFormatError(ValueError):
+    """Raised when an upload is not a workbook any reader can handle"""
+
+def sniff_excel_format(file_path):
+    """
+    Identify the workbook format from its signature without parsing it
+    Checks the zip/OLE magic bytes and, for .xlsx, that the package has a
+    workbook part and a worksheet whose XML starts like a worksheet.
+    Returns 'xlsx' (also .xlsm) or 'xls'; raises FileFormatError otherwise.
+    """
+    import zipfile
+
+    with open(file_path, 'rb') as f:
+        signature = f.read(8)
+
+    if not signature:
+        raise FileFormatError("File is empty")
+
+    if signature == OLE_SIGNATURE:
+        # Legacy BIFF workbook (.xls) - or an encrypted .xlsx, which the reader reports
+        return 'xls'
+
+    if not signature.startswith(ZIP_SIGNATURE):
+        raise FileFormatError("File is not a valid Excel file (unrecognised file signature)")
+
+    try:
+        with zipfile.ZipFile(file_path, 'r') as zip_ref:
+            names = zip_ref.namelist()
+            if 'xl/workbook.xml' not in names:
+                raise FileFormatError("File is not a valid Excel file (zip archive without an Excel workbook)")
+
+            sheets = sorted(name for name in names
+                            if name.startswith('xl/worksheets/') and name.endswith('.xml'))
+            if not sheets:
+                raise FileFormatError("Excel file contains no worksheets")
+
+            with zip_ref.open(sheets[0]) as sheet_xml:
+                head = sheet_xml.read(1024)
+            if b'<worksheet' not in head and b':worksheet' not in head:
+                raise FileFormatError(f"Worksheet XML is invalid ({sheets[0]})")
+
+    except zipfile.BadZipFile as e:
+        raise FileFormatError(f"File is not a valid Excel file (BadZipFile: {str(e)})")
+    except (zipfile.LargeZipFile, NotImplementedError, OSError) as e:
+        raise FileFormatError(f"Unable to inspect Excel file: {str(e)}")
+
+    return 'xlsx'
+
+def sniff_text_encoding(file_path):
+    """
+    Encoding of a delimited-text upload: a BOM if present, else UTF-8 when the
+    whole file decodes as UTF-8, else Windows-1252 (Excel's "CSV" on Windows)
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(4)
+        if head.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return 'utf-16'
+        
+        f.seek(0)
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return 'cp1252'
+
+def sniff_text_format(file_path):
+    """
+    Encoding and delimiter of a CSV / TSV upload
+    Returns (encoding, delimiter); raises FileFormatError for empty or binary files.
+    """
+    encoding = sniff_text_encoding(file_path)
+    with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+        sample = f.read(TEXT_SAMPLE_BYTES)
+    
+    if not sample.strip():
+        raise FileFormatError("File is empty")
+    if '\x00' in sample:
+        raise FileFormatError("File is not a valid CSV file (binary content)")
+    
+    # Sniff on whole lines only; a cut-off quoted field confuses csv.Sniffer
+    if len(sample) == TEXT_SAMPLE_BYTES and '\n' in sample:
+        sample = sample[:sample.rindex('\n')]
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=TEXT_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = '\t' if file_path.lower().endswith('.tsv') else ','
+    return encoding, delimiter
+
+def sniff_upload(file_path):
+    """
+    Identify an upload as 'xlsx', 'xls' or 'csv' (delimited text, including TSV)
+    Returns (file_format, text_format) where text_format is the (encoding, delimiter)
+    of a CSV / TSV upload and None for workbooks, so the reader need not sniff again.
+    The zip/OLE signature wins over the extension, so a workbook saved as .csv
+    is still read as a workbook; other files must have a CSV / TSV extension.
+    """
+    with open(file_path, 'rb') as f:
+        signature = f.read(8)
+    
+    is_workbook = signature.startswith(ZIP_SIGNATURE) or signature == OLE_SIGNATURE
+    if not is_workbook and validate_file_extension(os.path.basename(file_path), TEXT_EXTENSIONS):
+        return 'csv', sniff_text_format(file_path)
+    return sniff_excel_format(file_path), None
+
+def sniff_upload_format(file_path):
+    """'xlsx', 'xls' or 'csv' for an upload (see sniff_upload)"""
+    return sniff_upload(file_path)[0]
+
+def describe_excel_error(error):
+    """Turn a workbook open/validation error into a user-friendly message"""
+    error_msg = str(error)
+    if "invalid" in error_msg and "XML" in error_msg:
+        return ("Excel file has formatting issues. "
+                "Try opening the file in Excel and saving as a new .xlsx file. "
+                f"Technical details: {error_msg}")
+    elif "BadZipFile" in error_msg or "not a valid Excel file" in error_msg:
+        return "File is not a valid Excel file. Please ensure you're uploading a .xlsx, .xls or .csv file."
+    else:
+        return f"File validation issue: {error_msg}"
+
 def validate_excel_file(file_path):
-    """Validate Excel file exists and is readable with deployment-safe fallback methods"""
+    """Validate an upload exists and has a readable workbook signature or CSV text (no full parse)"""
     try:
         if not os.path.exists(file_path):
             raise ValueError(f"File does not exist: {file_path}")
@@ -22,92 +159,14 @@ def validate_excel_file(file_path):
         if os.path.getsize(file_path) == 0:
             raise ValueError("File is empty")
         
-        # Method 1: Try with pandas if available (most robust)
-        try:
-            import pandas as pd
-            df = pd.read_excel(file_path, nrows=5)  # Just read first 5 rows for validation
-            if df.empty:
-                raise ValueError("Excel file contains no data")
-            return True, "File is valid (pandas)"
-            
-        except ImportError:
-            # pandas not available - use openpyxl methods
-            pass
-        except Exception as e1:
-            # pandas failed - try openpyxl methods
-            pass
-        
-        # Method 2: Try with openpyxl (data_only=True)
-        try:
-            import openpyxl
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            sheet = workbook.active
-            
-            # Check if there's any data
-            has_data = False
-            for row in sheet.iter_rows(max_row=10, values_only=True):
-                if any(cell is not None for cell in row):
-                    has_data = True
-                    break
-            
-            workbook.close()
-            
-            if not has_data:
-                raise ValueError("Excel file contains no data")
-            
-            return True, "File is valid (openpyxl)"
-            
-        except Exception as e2:
-            # Method 3: Try with openpyxl (data_only=False)
-            try:
-                workbook = openpyxl.load_workbook(file_path, data_only=False)
-                sheet = workbook.active
-                
-                # Check if there's any data
-                has_data = False
-                for row in sheet.iter_rows(max_row=10, values_only=True):
-                    if any(cell is not None for cell in row):
-                        has_data = True
-                        break
-                
-                workbook.close()
-                
-                if not has_data:
-                    raise ValueError("Excel file contains no data")
-                
-                return True, "File is valid (openpyxl compatibility mode)"
-                
-            except Exception as e3:
-                # Method 4: Check if it's at least a valid zip file (Excel format)
-                try:
-                    import zipfile
-                    with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                        # If we can read it as zip, it's likely an Excel file
-                        file_list = zip_ref.namelist()
-                        # Check for typical Excel file structure
-                        if any('xl/' in f for f in file_list):
-                            return True, "File appears to be Excel format (may have formatting issues but should be readable)"
-                    
-                    raise ValueError("Not a valid Excel file format")
-                    
-                except zipfile.BadZipFile:
-                    raise ValueError("File is not a valid Excel file")
-                except Exception as e4:
-                    raise ValueError(f"Unable to validate Excel file: {str(e4)}")
+        file_format = sniff_upload_format(file_path)
+        return True, f"File is valid ({file_format})"
         
     except Exception as e:
         logger.error(f"Excel file validation failed for {file_path}: {str(e)}")
         
         # Provide user-friendly error messages
-        error_msg = str(e)
-        if "invalid XML" in error_msg or "could not read worksheets" in error_msg:
-            return False, ("Excel file has formatting issues but the system will attempt multiple methods to process it. "
-                          "If processing fails, try opening the file in Excel and saving as a new .xlsx file. "
-                          f"Technical details: {error_msg}")
-        elif "BadZipFile" in error_msg or "not a valid Excel file" in error_msg:
-            return False, "File is not a valid Excel file. Please ensure you're uploading a .xlsx or .xls file."
-        else:
-            return False, f"File validation issue: {error_msg}"
+        return False, describe_excel_error(e)
 
 def validate_required_columns(df, required_columns, file_type="file"):
     """Validate that DataFrame contains required columns"""
@@ -190,6 +249,15 @@ def validate_year_input(year_str):
     
     return True, "Year is valid"
 
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file, read in chunks"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def check_file_size(file_path, max_size_mb=16):
     """Check if file size is within limits"""
     try:
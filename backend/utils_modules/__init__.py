@@ -12,7 +12,13 @@ try:
         sanitize_filename,
         format_response,
         validate_excel_file,
+        sniff_excel_format,
+        sniff_upload,
+        sniff_upload_format,
+        sniff_text_format,
+        describe_excel_error,
         check_file_size,
+        file_sha256,
         validate_year_input,
         log_error,
         validate_required_columns,
@@ -26,7 +32,13 @@ try:
         'sanitize_filename', 
         'format_response',
         'validate_excel_file',
+        'sniff_excel_format',
+        'sniff_upload',
+        'sniff_upload_format',
+        'sniff_text_format',
+        'describe_excel_error',
         'check_file_size',
+        'file_sha256',
         'validate_year_input',
         'log_error',
         'validate_required_columns',
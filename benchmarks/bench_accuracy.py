@@ -0,0 +1,89 @@
+# Benchmark: match accuracy against the generator's ground truth (not timing)
+#
+# Usage: python benchmarks/bench_accuracy.py [--students 3000] [--seed 42] [--format csv|xlsx]
+#                                            [--prn-fuzzy] [--no-one-to-one]
+#
+# Every synthetic response belongs to a known student, so each roll-call row is scored:
+#   correct     - Present with the student's own best score (a stranger's equal score counts too)
+#   wrong       - Present with someone else's response (or without having responded)
+#   missed      - Absent although the student responded
+# plus the attendance-only view (Present/Absent right, whoever's score it shows).
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from generators import generate_fctc_rows, generate_students, write_dataset  # noqa: E402
+from logic import ExamProcessor  # noqa: E402
+
+FCTC_PRN_COLUMN, FCTC_SCORE_COLUMN, FCTC_EMAIL_COLUMN = 9, 2, 1
+
+
+def own_best_scores(count, seed):
+    """PRN → best score over the student's own responses (rows with a blank PRN are dropped on upload)"""
+    students = generate_students(count, seed)
+    by_email_suffix = {student['prn'][-4:]: student['prn'] for student in students}
+    best = {}
+    for row in generate_fctc_rows(students, seed):
+        if not row[FCTC_PRN_COLUMN]:
+            continue
+        prn = by_email_suffix[row[FCTC_EMAIL_COLUMN].split('@')[0][-4:]]
+        best[prn] = max(best.get(prn, row[FCTC_SCORE_COLUMN]), row[FCTC_SCORE_COLUMN])
+    return best
+
+
+def score_run(result, truth):
+    counts = dict.fromkeys(('correct', 'wrong', 'missed', 'present_right', 'present_wrong', 'absent_wrong'), 0)
+    for report in result['division_reports'].values():
+        for student in report['students']:
+            responded = student['PRN'] in truth
+            if student['Attendance_Status'] == 'Present':
+                own = responded and float(student['Score']) == float(truth[student['PRN']])
+                counts['correct' if own else 'wrong'] += 1
+                counts['present_right' if responded else 'present_wrong'] += 1
+                if responded and not own:
+                    counts['missed'] += 1
+            elif responded:
+                counts['missed'] += 1
+                counts['absent_wrong'] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match accuracy on seeded synthetic data")
+    parser.add_argument('--students', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=('xlsx', 'csv'), default='csv')
+    parser.add_argument('--prn-fuzzy', action='store_true', help="Enable Level 1.5 (PRN typo recovery)")
+    parser.add_argument('--no-one-to-one', action='store_true',
+                        help="Let several roll-call rows share one FCTC response (Levels 2 and 3)")
+    args = parser.parse_args()
+
+    logging.getLogger('fctc.timing').setLevel(logging.WARNING)
+    truth = own_best_scores(args.students, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        dataset = write_dataset(directory, args.students, args.seed, args.format)
+        processor = ExamProcessor(prn_fuzzy=args.prn_fuzzy, one_to_one=not args.no_one_to_one)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = processor.process_and_generate_reports(dataset['fctc'], dataset['roll_call'], 2)
+    counts = score_run(result, truth)
+    stats = result['match_stats']
+
+    print(f"{args.students} students, {len(truth)} responded, one_to_one={not args.no_one_to_one}, "
+          f"prn_fuzzy={args.prn_fuzzy}")
+    precision = counts['correct'] / max(1, counts['correct'] + counts['wrong'])
+    recall = counts['correct'] / max(1, len(truth))
+    print(f"  own response : correct {counts['correct']}, wrong {counts['wrong']}, missed {counts['missed']}"
+          f"  (precision {precision:.3f}, recall {recall:.3f})")
+    print(f"  attendance   : Present right {counts['present_right']}, Present wrong {counts['present_wrong']}, "
+          f"Absent wrong {counts['absent_wrong']}")
+    print(f"  contested {stats.get('contested_matches', 0)}, preclaimed {stats.get('preclaimed_matches', 0)}")
+
+
+if __name__ == '__main__':
+    main()
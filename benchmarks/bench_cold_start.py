@@ -0,0 +1,40 @@
+# Benchmark: cold-start import time of the serverless entry point (fresh interpreter per run)
+#
+# Usage: python benchmarks/bench_cold_start.py [runs]
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+
+# Runs in the child: import the entry point, then print its startup report as JSON
+PROBE = (
+    "import contextlib, io, json, sys\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    import index\n"
+    "from app import startup_report\n"
+    "print(json.dumps(startup_report()))\n"
+)
+
+
+def run_once(warm_up=''):
+    env = dict(os.environ, FCTC_WARM_UP=warm_up)
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=API_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for label, warm_up in (("lazy (default)", ''), ("eager warm-up", 'eager')):
+        reports = [run_once(warm_up) for _ in range(runs)]
+        entry_ms = statistics.median(report['entry_import_ms'] for report in reports)
+        loaded = [name for name, is_loaded in reports[-1]['deferred_modules_loaded'].items() if is_loaded]
+        print(f"{label:<16} median {entry_ms:7.1f} ms over {runs} runs  "
+              f"(budget {reports[-1]['import_budget_ms']} ms; loaded: {', '.join(loaded) or 'none'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Benchmark: FCTC extraction with column projection on a wide (200-column) sheet
+#
+# Usage: python benchmarks/bench_column_projection.py [rows] [columns]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import openpyxl
+from logic import ExamProcessor
+
+FCTC_HEADERS = [
+    'Timestamp', 'Email Address', 'Score',
+    'Full name- MANDATORY FOR ALL COLLEGE STUDENTS',
+    'College Name-MANDATORY FOR ALL COLLEGE STUDENTS ( Please select your specific college name carefully and accurately )',
+    'Year-MANDATORY FOR ALL COLLEGE STUDENTS',
+    'Roll Number-MANDATORY FOR ALL COLLEGE STUDENTS',
+    'Branch-MANDATORY ONLY FOR NON-VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+    'Division-MANDATORY ONLY FOR NON-VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+    'PRN - MANDATORY ONLY FOR VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+    'Branch-Division- MANDATORY ONLY FOR VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+]
+
+
+def write_wide_sheet(path, rows, columns):
+    """Write a synthetic FCTC export padded with quiz-question columns"""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    question_count = max(columns - len(FCTC_HEADERS), 0)
+    sheet.append(FCTC_HEADERS + [f'Q{i + 1}. Question text for item {i + 1}' for i in range(question_count)])
+    answers = [f'Option {chr(65 + i % 4)}' for i in range(question_count)]
+    for i in range(rows):
+        sheet.append([
+            '2024-01-15 10:00:00', f'student{i}@example.com', i % 50,
+            f'STUDENT {i} NAME', 'VIT', 'SY', i % 70 + 1, '', 'A',
+            f'12{310000 + i}', 'CS-A',
+        ] + answers)
+    workbook.save(path)
+
+
+def full_width_extract(processor, path):
+    """Pre-projection behaviour: hold every full padded row before extracting"""
+    data_rows, headers, _ = processor._stream_excel_with_header_detection(path)
+    all_rows = list(data_rows)
+    for row in all_rows:
+        while len(row) < len(headers):
+            row.append(None)
+    return processor._extract_fctc_data(all_rows, headers)
+
+
+def measure(label, func):
+    """Time one run, then trace a second run for peak Python memory"""
+    start = time.perf_counter()
+    records = func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {elapsed:8.2f}s  peak {peak / (1024 * 1024):8.1f} MB  ({len(records)} records)")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'wide_fctc.xlsx')
+        write_wide_sheet(path, rows, columns)
+        print(f"Synthetic FCTC sheet: {rows} rows x {columns} columns "
+              f"({os.path.getsize(path) / (1024 * 1024):.1f} MB)")
+
+        processor = ExamProcessor()
+        measure("full-width rows", lambda: full_width_extract(processor, path))
+        measure("projected columns", lambda: processor.read_fctc_excel(path))
+
+
+if __name__ == '__main__':
+    main()
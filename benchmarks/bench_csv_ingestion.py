@@ -0,0 +1,60 @@
+# Benchmark: FCTC extraction from the same responses as .xlsx vs .csv
+#
+# Usage: python benchmarks/bench_csv_ingestion.py [rows] [columns]
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import openpyxl
+from bench_column_projection import write_wide_sheet
+from logic import ExamProcessor
+
+
+def write_csv_copy(xlsx_path, csv_path):
+    """Write the sheet's values as UTF-8 CSV with a BOM, like a Google Forms download opened in Excel"""
+    workbook = openpyxl.load_workbook(xlsx_path, read_only=True)
+    with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        for row in workbook.active.iter_rows(values_only=True):
+            writer.writerow(['' if value is None else value for value in row])
+    workbook.close()
+
+
+def measure(label, func, repeats=3):
+    """Best of `repeats` runs"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        records = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<22} {best:8.3f}s  ({len(records)} records)")
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xlsx_path = os.path.join(tmp_dir, 'fctc.xlsx')
+        csv_path = os.path.join(tmp_dir, 'fctc.csv')
+        write_wide_sheet(xlsx_path, rows, columns)
+        write_csv_copy(xlsx_path, csv_path)
+        print(f"Synthetic FCTC responses: {rows} rows x {columns} columns "
+              f"(xlsx {os.path.getsize(xlsx_path) / (1024 * 1024):.1f} MB, "
+              f"csv {os.path.getsize(csv_path) / (1024 * 1024):.1f} MB)")
+
+        processor = ExamProcessor()
+        xlsx_seconds = measure("xlsx (read-only)", lambda: processor.read_fctc_excel(xlsx_path))
+        csv_seconds = measure("csv", lambda: processor.read_fctc_excel(csv_path))
+        print(f"csv speedup: {xlsx_seconds / csv_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
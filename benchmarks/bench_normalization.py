@@ -0,0 +1,97 @@
+# Micro-benchmark: value cleaners before/after precompiled patterns + memoisation
+#
+# Usage: python benchmarks/bench_normalization.py [rows]
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from normalize import Normalizer
+
+
+def legacy_clean_prn(prn_value):
+    """ExamProcessor._clean_prn before the normalisation layer"""
+    if prn_value is None:
+        return ""
+    prn_str = str(prn_value).strip().upper()
+    prn_str = re.sub(r'\.0+$', '', prn_str)
+    prn_clean = re.sub(r'[^\w\-]', '', prn_str)
+    if prn_clean in ['', 'NAN', 'NONE', 'NAT', 'NULL']:
+        return ""
+    return prn_clean
+
+
+def legacy_clean_name(name_value):
+    """ExamProcessor._clean_name before the normalisation layer"""
+    if name_value is None:
+        return ""
+    name_str = str(name_value).strip().upper()
+    name_str = re.sub(r'\s+', ' ', name_str)
+    name_str = re.sub(r'[^A-Z\s]', '', name_str)
+    if name_str in ['', 'NAN', 'NONE', 'NAT', 'NULL']:
+        return ""
+    return name_str
+
+
+def legacy_clean_roll_no(roll_no_value):
+    """ExamProcessor._clean_roll_no before the normalisation layer"""
+    if roll_no_value is None:
+        return ""
+    roll_str = str(roll_no_value).strip().upper()
+    roll_str = re.sub(r'\.0+$', '', roll_str)
+    roll_clean = re.sub(r'[^\w]', '', roll_str)
+    if roll_clean in ['', 'NAN', 'NONE', 'NAT', 'NULL']:
+        return ""
+    if roll_clean.isdigit():
+        roll_clean = str(int(roll_clean))
+    return roll_clean
+
+
+def make_columns(rows, seed=42):
+    """Roll-call + FCTC style columns: each value appears on both sides, some repeated"""
+    rng = random.Random(seed)
+    first = ['Amit', 'Rahul', 'Priya', 'Sneha', 'Rohan', 'Aniket', 'Pooja', 'Neha', 'Kunal', 'Sagar']
+    last = ['Patil', 'Sharma', 'Joshi', 'Kulkarni', 'Deshmukh', 'Pawar', 'Jadhav', 'More']
+    students = [(12310000 + i, f"{rng.choice(first)}  {rng.choice(last)}", float(i % 70 + 1))
+                for i in range(rows)]
+    # Both sides of the match, plus duplicate attempts on the FCTC side
+    sample = students + students + rng.sample(students, rows // 4)
+    prns = [str(prn) if i % 2 else float(prn) for i, (prn, _, _) in enumerate(sample)]
+    names = [name for _, name, _ in sample]
+    roll_nos = [roll for _, _, roll in sample]
+    return prns, names, roll_nos
+
+
+def rate(label, total, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {total / elapsed:>12,.0f} rows/s")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    prns, names, roll_nos = make_columns(rows)
+    total = len(prns)
+    print(f"Cleaning {total:,} rows x 3 columns")
+
+    def legacy():
+        [legacy_clean_prn(v) for v in prns]
+        [legacy_clean_name(v) for v in names]
+        [legacy_clean_roll_no(v) for v in roll_nos]
+
+    def batch():
+        normalizer = Normalizer()
+        normalizer.clean_column('prn', prns)
+        normalizer.clean_column('name', names)
+        normalizer.clean_column('roll_no', roll_nos)
+
+    rate("before (re.sub per call)", total, legacy)
+    rate("after (compiled + memo, batch)", total, batch)
+
+
+if __name__ == '__main__':
+    main()
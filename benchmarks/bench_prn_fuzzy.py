@@ -0,0 +1,99 @@
+# Benchmark: Level 1.5 PRN typo lookup (PrnTrie) vs a brute-force edit-distance scan
+#
+# Usage: python benchmarks/bench_prn_fuzzy.py [prns] [queries] [brute_force_queries]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from matching import PrnTrie  # noqa: E402
+
+
+def make_prns(count, seed=42):
+    """Dense, sequential PRNs per admission year and branch, as issued by the university"""
+    rng = random.Random(seed)
+    prns, series = {}, 0
+    while len(prns) < count:
+        base = int(f"12{20 + series % 6}{rng.randrange(1, 10)}") * 10 ** 4
+        for i in range(4000):
+            if len(prns) < count:
+                prns[str(base + i)] = None
+        series += 1
+    return list(prns)
+
+
+def typo(rng, prn):
+    """One substitution, transposition, deletion (e.g. the leading '1') or insertion"""
+    chars = list(prn)
+    kind = rng.randrange(4)
+    position = rng.randrange(len(chars) - 1)
+    if kind == 0:
+        chars[position] = rng.choice('0123456789')
+    elif kind == 1:
+        chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    elif kind == 2:
+        del chars[0 if rng.random() < 0.5 else position]
+    else:
+        chars.insert(position, rng.choice('0123456789'))
+    return ''.join(chars)
+
+
+def edit_distance(a, b):
+    """Optimal string alignment distance (transposition = 1), the metric PrnTrie uses"""
+    previous_previous, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            distance = min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, previous_previous[j - 2] + 1)
+            row.append(distance)
+        previous_previous, previous = previous, row
+    return previous[-1]
+
+
+def brute_force(prns, query, max_distance=1):
+    matches = []
+    for prn in prns:
+        if abs(len(prn) - len(query)) <= max_distance:
+            distance = edit_distance(query, prn)
+            if distance <= max_distance:
+                matches.append((distance, prn))
+    return sorted(matches)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    brute_count = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    rng = random.Random(7)
+    prns = make_prns(count)
+    queries = [typo(rng, rng.choice(prns)) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    trie = PrnTrie(prns)
+    build_seconds = time.perf_counter() - start
+    print(f"🌳 PrnTrie over {len(trie)} PRNs built in {build_seconds:.3f}s")
+
+    start = time.perf_counter()
+    trie_results = [trie.search(query, 1) for query in queries]
+    trie_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"⚡ PrnTrie:     {trie_ms:8.3f} ms per lookup ({len(queries)} lookups, "
+          f"{sum(1 for found in trie_results if found)} with a PRN within 1 edit)")
+
+    start = time.perf_counter()
+    brute_results = [brute_force(prns, query) for query in queries[:brute_count]]
+    brute_ms = (time.perf_counter() - start) / brute_count * 1000
+    print(f"🐢 Brute force: {brute_ms:8.3f} ms per lookup ({brute_count} lookups)  → {brute_ms / trie_ms:.0f}x slower")
+
+    same = brute_results == trie_results[:brute_count]
+    print(f"{'✅' if same else '❌'} Trie and brute-force results {'match' if same else 'DIFFER'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+# Benchmark: ExamProcessor end to end on seeded synthetic data, timed per pipeline stage
+#
+# Usage: python benchmarks/bench_suite.py [--sizes 500,2000,10000] [--seed 42] [--repeat 3]
+#                                         [--format xlsx|csv] [--joins auto|vectorised|rows] [--no-name-blocking]
+#                                         [--prn-fuzzy] [--no-one-to-one]
+#                                         [--output FILE] [--baseline FILE]
+#
+# Results are written as JSON (default: benchmarks/results/bench_<commit>_<time>.json) so
+# runs on different commits can be compared with --baseline.
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from generators import write_dataset  # noqa: E402
+from logic import ExamProcessor  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+# Stages shown in the table (all stages are saved in the JSON)
+REPORTED_STAGES = ('read', 'header_detection', 'extraction', 'index_build', 'normalisation',
+                   'match_level_1', 'match_level_1_5', 'match_level_2', 'match_level_3', 'report_build')
+MATCH_COUNTS = ('prn_matches', 'prn_fuzzy_matches', 'name_matches', 'roll_div_matches', 'no_match', 'contested_matches',
+               'preclaimed_matches')
+# A stage this much slower than the baseline is flagged
+REGRESSION_RATIO = 1.2
+# Stages faster than this in both runs are too noisy to flag
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_size(size, seed, repeat, file_format, vectorised_joins=None, name_blocking=True, prn_fuzzy=False,
+             one_to_one=True):
+    """Best-of-`repeat` seconds per stage for one dataset size"""
+    with tempfile.TemporaryDirectory() as directory:
+        dataset = write_dataset(directory, size, seed, file_format)
+        stages, totals = {}, []
+        for _ in range(repeat):
+            processor = ExamProcessor(vectorised_joins=vectorised_joins, name_blocking=name_blocking,
+                                      prn_fuzzy=prn_fuzzy, one_to_one=one_to_one)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = processor.process_and_generate_reports(dataset['fctc'], dataset['roll_call'], 2)
+            totals.append(time.perf_counter() - start)
+            for stage, entry in result['match_stats']['stage_timings'].items():
+                if stage not in stages or entry['seconds'] < stages[stage]['seconds']:
+                    stages[stage] = entry
+    return {
+        'students': size,
+        'fctc_rows': dataset['fctc_rows'],
+        'total_seconds': round(min(totals), 4),
+        'stages': stages,
+        'matches': {key: result['match_stats'][key] for key in MATCH_COUNTS}
+    }
+
+
+def compare(results, baseline):
+    """Print stages that got slower than the baseline run of the same size; returns how many"""
+    baseline_runs = {run['students']: run for run in baseline['runs']}
+    regressions = 0
+    for run in results['runs']:
+        previous = baseline_runs.get(run['students'])
+        if not previous:
+            continue
+        # Counts added after the baseline was taken are not compared
+        changed = {key: (previous['matches'][key], value) for key, value in run['matches'].items()
+                   if key in previous['matches'] and previous['matches'][key] != value}
+        if changed:
+            regressions += 1
+            print(f"⚠️  {run['students']} students: match counts changed {changed}")
+        for stage, entry in run['stages'].items():
+            before = previous['stages'].get(stage, {}).get('seconds')
+            if not before or max(before, entry['seconds']) < NOISE_FLOOR_SECONDS:
+                continue
+            ratio = entry['seconds'] / before
+            if ratio > REGRESSION_RATIO:
+                regressions += 1
+                print(f"🐢 {run['students']} students: {stage} {before:.4f}s → {entry['seconds']:.4f}s ({ratio:.2f}x)")
+    print(f"{'✅ No regressions' if not regressions else f'❌ {regressions} regression(s)'} "
+          f"vs {baseline['meta']['commit']}")
+    return regressions
+
+
+def print_table(results):
+    header = f"{'students':>9} {'rows':>7} " + ' '.join(f"{stage.replace('match_', '')[:13]:>13}" for stage in REPORTED_STAGES) + f" {'total':>8}"
+    print(header)
+    print('-' * len(header))
+    for run in results['runs']:
+        cells = ' '.join(f"{run['stages'].get(stage, {}).get('seconds', 0.0):13.4f}" for stage in REPORTED_STAGES)
+        print(f"{run['students']:>9} {run['fctc_rows']:>7} {cells} {run['total_seconds']:8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage benchmark of the matching pipeline")
+    parser.add_argument('--sizes', default='500,2000,10000', help="Comma-separated roll-call sizes (e.g. 500,50000)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the fastest time per stage is kept")
+    parser.add_argument('--format', choices=('xlsx', 'csv'), default='xlsx')
+    parser.add_argument('--joins', choices=('auto', 'vectorised', 'rows'), default='auto',
+                        help="Level 1 / Level 3 join backend (see backend/joins.py)")
+    parser.add_argument('--no-name-blocking', action='store_true', help="Score fuzzy names against everyone")
+    parser.add_argument('--prn-fuzzy', action='store_true', help="Enable Level 1.5 (PRN typo recovery)")
+    parser.add_argument('--no-one-to-one', action='store_true',
+                        help="Let several roll-call rows share one FCTC response (Levels 2 and 3)")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/bench_<commit>_<time>.json)")
+    parser.add_argument('--baseline', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    # Stage log lines would swamp the table
+    logging.getLogger('fctc.timing').setLevel(logging.WARNING)
+    vectorised_joins = {'vectorised': True, 'rows': False}.get(args.joins)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'format': args.format,
+            'joins': args.joins,
+            'name_blocking': not args.no_name_blocking,
+            'prn_fuzzy': args.prn_fuzzy,
+            'one_to_one': not args.no_one_to_one
+        },
+        'runs': []
+    }
+    for size in sizes:
+        print(f"⏱️  {size} students ...", flush=True)
+        results['runs'].append(run_size(size, args.seed, args.repeat, args.format, vectorised_joins,
+                                        not args.no_name_blocking, args.prn_fuzzy, not args.no_one_to_one))
+    print_table(results)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{commit}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(results, json.load(f)):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# Seeded synthetic FCTC exports and roll calls for the benchmarks
+#
+# The same (count, seed) always gives the same files, so match counts and timings
+# can be compared across commits. FCTC responses are derived from the roll call
+# with the defects real form exports have, so every matching level gets work:
+#   - clean PRN                                    → Level 1 (PRN)
+#   - PRN typo, name as on roll call               → Level 2 exact name
+#   - PRN typo + reordered name ("Patil, Amit S.") → Level 2 fuzzy name
+#   - PRN typo + misspelt name, or a nickname      → Level 3 (Roll No + Division)
+#   - blank PRN (row dropped by extraction), or no response → Absent
+import csv
+import datetime
+import random
+from typing import Dict, List, Optional
+
+FCTC_HEADERS = [
+    'Timestamp', 'Email Address', 'Score',
+    'Full name- MANDATORY FOR ALL COLLEGE STUDENTS',
+    'College Name-MANDATORY FOR ALL COLLEGE STUDENTS ( Please select your specific college name carefully and accurately )',
+    'Year-MANDATORY FOR ALL COLLEGE STUDENTS',
+    'Roll Number-MANDATORY FOR ALL COLLEGE STUDENTS',
+    'Branch-MANDATORY ONLY FOR NON-VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+    'Division-MANDATORY ONLY FOR NON-VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+    'PRN - MANDATORY ONLY FOR VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+    'Branch-Division- MANDATORY ONLY FOR VISHWAKARMA INSTITUTE OF TECHNOLOGY STUDENTS',
+]
+ROLL_CALL_HEADERS = ['Sr. No', 'PRN', 'Roll No', 'Name', 'Division', 'Mobile']
+
+FIRST_NAMES = ['AMIT', 'RAHUL', 'PRIYA', 'SNEHA', 'ROHAN', 'ANIKET', 'POOJA', 'NEHA', 'KUNAL', 'SAGAR',
+               'OM', 'ISHA', 'TANVI', 'YASH', 'VED', 'SHRUTI', 'ADITYA', 'KETAKI', 'PRATIK', 'SAKSHI',
+               'OMKAR', 'RUTUJA', 'TEJAS', 'MRUNAL', 'HARSH', 'GAURI', 'NIKHIL', 'SAYALI', 'VARUN', 'DIVYA']
+MIDDLE_NAMES = ['SURESH', 'RAJESH', 'ANIL', 'SUNIL', 'VIJAY', 'PRAKASH', 'ASHOK', 'DILIP', '', '']
+LAST_NAMES = ['PATIL', 'SHARMA', 'JOSHI', 'KULKARNI', 'DESHMUKH', 'PAWAR', 'JADHAV', 'MORE', 'GAIKWAD',
+              'SHINDE', 'CHAVAN', 'KALE', 'BHOSALE', 'DESHPANDE', 'APTE', 'GOKHALE', 'RANE', 'SAWANT']
+DIVISIONS = ['A', 'B', 'C', 'D', 'E', 'F']
+QUIZ_COLUMNS = 30
+
+# Share of FCTC responses with each defect (fractions of submitting students)
+DEFAULT_RATES = {
+    'attendance': 0.85,       # Students with at least one response
+    'duplicate': 0.15,        # Students who submitted twice (best score kept)
+    'prn_typo': 0.06,         # One digit of the PRN changed, name as on the roll call
+    'prn_blank': 0.03,        # PRN left empty
+    'name_variation': 0.08,   # PRN typo + name reordered / punctuated, or misspelt
+    'name_unrelated': 0.03,   # PRN typo + nickname instead of the full name
+}
+
+
+def generate_students(count: int, seed: int = 42) -> List[Dict]:
+    """Roll-call entries: PRN, roll number (per division), name, division"""
+    rng = random.Random(seed)
+    divisions = DIVISIONS[:max(1, min(len(DIVISIONS), count // 60 or 1))]
+    roll_counters = {division: 0 for division in divisions}
+    students = []
+    for i in range(count):
+        division = divisions[i % len(divisions)]
+        roll_counters[division] += 1
+        name = ' '.join(part for part in (rng.choice(FIRST_NAMES), rng.choice(MIDDLE_NAMES), rng.choice(LAST_NAMES))
+                        if part)
+        students.append({
+            'prn': f"12{310000 + i}",
+            'roll_no': roll_counters[division],
+            'name': name,
+            'division': division
+        })
+    return students
+
+
+def _vary_name(rng: random.Random, name: str) -> str:
+    """Name as typed on the form: reordered or punctuated (fuzzy-matchable), or misspelt (not)"""
+    parts = name.split()
+    choice = rng.random()
+    if choice < 0.5:
+        return ' '.join(parts[-1:] + parts[:-1])                                  # Surname first
+    if choice < 0.75:
+        return f"{parts[-1].title()}, {' '.join(parts[:-1]).title()}."            # "Patil, Amit Suresh."
+    word = rng.randrange(len(parts))
+    letter = rng.randrange(len(parts[word]))
+    replacement = rng.choice([c for c in 'AEIOUY' if c != parts[word][letter]])
+    parts[word] = parts[word][:letter] + replacement + parts[word][letter + 1:]
+    return ' '.join(parts)                                                         # One letter wrong
+
+
+def _typo_prn(rng: random.Random, prn: str) -> str:
+    position = rng.randrange(2, len(prn))
+    digit = str((int(prn[position]) + rng.randrange(1, 10)) % 10)
+    return prn[:position] + digit + prn[position + 1:]
+
+
+def generate_fctc_rows(students: List[Dict], seed: int = 42, rates: Optional[Dict[str, float]] = None,
+                       quiz_columns: int = QUIZ_COLUMNS) -> List[List]:
+    """FCTC form responses (FCTC_HEADERS + quiz answer columns) for a roll call"""
+    rates = dict(DEFAULT_RATES, **(rates or {}))
+    rng = random.Random(seed + 1)
+    start = datetime.datetime(2024, 1, 15, 9, 0, 0)
+    answers = [f'Option {chr(65 + i % 4)}' for i in range(quiz_columns)]
+    rows = []
+    for student in students:
+        if rng.random() >= rates['attendance']:
+            continue
+        attempts = 2 if rng.random() < rates['duplicate'] else 1
+        prn, name = student['prn'], student['name']
+        defect = rng.random()
+        if defect < rates['prn_typo']:
+            prn = _typo_prn(rng, prn)
+        elif defect < rates['prn_typo'] + rates['prn_blank']:
+            prn = ''
+        elif defect < rates['prn_typo'] + rates['prn_blank'] + rates['name_variation']:
+            prn, name = _typo_prn(rng, prn), _vary_name(rng, name)
+        elif defect < sum(rates[key] for key in ('prn_typo', 'prn_blank', 'name_variation', 'name_unrelated')):
+            prn, name = _typo_prn(rng, prn), rng.choice(FIRST_NAMES)
+        for _ in range(attempts):
+            rows.append([
+                start + datetime.timedelta(seconds=rng.randrange(0, 6 * 3600)),
+                f"{student['name'].split()[0].lower()}{student['prn'][-4:]}@example.com",
+                rng.randrange(0, 51),
+                name, 'Vishwakarma Institute of Technology', 'SY', student['roll_no'],
+                'Computer Engineering', student['division'], prn, f"CS-{student['division']}",
+            ] + answers)
+    # Responses arrive in timestamp order
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def roll_call_rows(students: List[Dict], seed: int = 42) -> List[List]:
+    """Roll-call sheet rows (ROLL_CALL_HEADERS order); PRNs are a mix of numbers and text, as in real sheets"""
+    rng = random.Random(seed + 2)
+    return [[serial, int(student['prn']) if rng.random() < 0.5 else student['prn'], student['roll_no'],
+             student['name'], student['division'], f"98{rng.randrange(10 ** 7, 10 ** 8)}"]
+            for serial, student in enumerate(students, 1)]
+
+
+def write_xlsx(path: str, headers: List[str], rows: List[List], title: Optional[str] = None) -> None:
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    if title:
+        sheet.append([title])  # Title row above the header, as in department roll calls
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_csv(path: str, headers: List[str], rows: List[List], title: Optional[str] = None) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if title:
+            writer.writerow([title])
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow([value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime.datetime) else value
+                             for value in row])
+
+
+def write_dataset(directory: str, count: int, seed: int = 42, file_format: str = 'xlsx',
+                  rates: Optional[Dict[str, float]] = None) -> Dict:
+    """Write <directory>/fctc.<format> and roll_call.<format>; returns their paths and row counts"""
+    import os
+    students = generate_students(count, seed)
+    fctc_rows = generate_fctc_rows(students, seed, rates)
+    headers = FCTC_HEADERS + [f'Q{i + 1}. Question text for item {i + 1}' for i in range(QUIZ_COLUMNS)]
+    write = write_xlsx if file_format == 'xlsx' else write_csv
+    fctc_path = os.path.join(directory, f'fctc.{file_format}')
+    roll_call_path = os.path.join(directory, f'roll_call.{file_format}')
+    write(fctc_path, headers, fctc_rows)
+    write(roll_call_path, ROLL_CALL_HEADERS, roll_call_rows(students, seed), title='Roll Call - SY Computer')
+    return {
+        'fctc': fctc_path,
+        'roll_call': roll_call_path,
+        'students': count,
+        'fctc_rows': len(fctc_rows)
+    }
@@ -43,6 +43,9 @@ document.addEventListener('DOMContentLoaded', function() {
             formData.append('fctc_file', fctcFile);
             formData.append('roll_call_file', rollCallFile);
             formData.append('year', year);
+            // 'summary' (reports streamed from /results/<id>/... on demand) only when the
+            // server enables it; the default 'full' response carries the reports inline
+            formData.append('response_mode', form.dataset.responseMode || 'full');
             
             console.log('Submitting files:', {
                 fctc: fctcFile.name,
@@ -95,7 +98,7 @@ document.addEventListener('DOMContentLoaded', function() {
         }
         
         // Validate file types
-        const allowedTypes = ['xlsx', 'xls'];
+        const allowedTypes = ['xlsx', 'xls', 'csv', 'tsv'];
         
         const fctcValidation = validateSingleFile(fctcFile, 'FCTC Excel file', allowedTypes);
         if (!fctcValidation.isValid) {
@@ -230,8 +233,44 @@ document.addEventListener('DOMContentLoaded', function() {
             html += '</div>';
         }
         
-        // Show division-wise download options
-        if (data.download_data && Object.keys(data.download_data).length > 0) {
+        // Show division-wise download links (summary response)
+        if (data.division_summaries && Object.keys(data.division_summaries).length > 0) {
+            html += '<h4>Download Division-wise Reports:</h4>';
+            
+            html += '<div class="division-stats">';
+            for (const [division, report] of Object.entries(data.division_summaries)) {
+                html += '<div class="division-stat-card">';
+                html += '<h5>Division ' + division + '</h5>';
+                html += '<p>Total: ' + report.total_students + ' | ';
+                html += '<span class="present-text">Present: ' + report.present_count + '</span> | ';
+                html += '<span class="absent-text">Absent: ' + report.absent_count + '</span></p>';
+                html += '</div>';
+            }
+            html += '</div>';
+            
+            html += '<div class="download-section">';
+            
+            // Each link streams its CSV straight from the server
+            for (const [division, report] of Object.entries(data.division_summaries)) {
+                html += '<a class="download-btn csv-btn" href="' + report.download_url + '" download="' + 
+                        report.filename + '">📄 Download ' + division + ' Report (' + report.total_students + ' students)</a>';
+            }
+            
+            // Add "Download All" link if multiple divisions
+            if (Object.keys(data.division_summaries).length > 1) {
+                html += '<a class="download-btn download-all-btn" href="' + data.download_all_url + 
+                        '" download>📦 Download All Divisions (.zip)</a>';
+            }
+            
+            // View all data button (student lists are fetched only when asked for)
+            html += '<button class="download-btn view-btn" onclick="viewStoredDivisionsData(\'' + 
+                    data.report_url + '\')">👁️ View All Attendance Data</button>';
+            
+            html += '</div>';
+        }
+        
+        // Show division-wise download options (full response)
+        else if (data.download_data && Object.keys(data.download_data).length > 0) {
             html += '<h4>Download Division-wise Reports:</h4>';
             
             // Show division statistics
@@ -333,7 +372,7 @@ document.addEventListener('DOMContentLoaded', function() {
             type: file.type
         });
         
-        const allowedTypes = ['xlsx', 'xls'];
+        const allowedTypes = ['xlsx', 'xls', 'csv', 'tsv'];
         const validation = validateSingleFile(file, fileLabel, allowedTypes);
         
         if (!validation.isValid) {
@@ -471,10 +510,34 @@ function downloadAllDivisions(base64Data) {
     }
 }
 
-function viewAllDivisionsData(base64Data) {
+async function viewStoredDivisionsData(reportUrl) {
     try {
-        const divisionReports = JSON.parse(atob(base64Data));
+        const response = await fetch(reportUrl);
+        const result = await response.json();
         
+        if (!response.ok || !result.success) {
+            alert(result.message || 'Error loading attendance data. Please process the files again.');
+            return;
+        }
+        
+        renderDivisionsWindow(result.data.division_reports);
+    } catch (error) {
+        console.error('Error loading divisions data:', error);
+        alert('Error displaying attendance data. Please try again.');
+    }
+}
+
+function viewAllDivisionsData(base64Data) {
+    try {
+        renderDivisionsWindow(JSON.parse(atob(base64Data)));
+    } catch (error) {
+        console.error('Error viewing divisions data:', error);
+        alert('Error displaying attendance data. Please try again.');
+    }
+}
+
+function renderDivisionsWindow(divisionReports) {
+    try {
         // Create a new window to display the data
         const newWindow = window.open('', '_blank', 'width=1000,height=700,scrollbars=yes');
         
@@ -0,0 +1,166 @@
+# /process and /results endpoint checks (run: python -m pytest tests)
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module  # noqa: E402
+from cache import ResultCache, TTLCache  # noqa: E402
+from roster import RosterStore  # noqa: E402
+from test_matching import FCTC_HEADERS, ROLL_CALL_HEADERS, generated_pair  # noqa: E402
+
+FCTC_ROWS = [
+    ['2024-01-15 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+    ['2024-01-15 09:01:00', 'PRIYA KALE', 2, 'A', '99990002', 35],
+    ['2024-01-15 09:02:00', 'ROHAN MORE', 3, 'B', '12310003', 30],
+]
+ROLL_CALL_ROWS = [
+    ['12310001', 1, 'AMIT PATIL', 'A'],
+    ['12310002', 2, 'PRIYA KALE', 'A'],
+    ['12310003', 3, 'ROHAN MORE', 'B'],
+    ['12310004', 4, 'SNEHA JOSHI', 'B'],
+]
+
+
+def csv_bytes(headers, rows):
+    lines = [','.join(headers)] + [','.join(str(value) for value in row) for row in rows]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def upload(content, filename):
+    return io.BytesIO(content), filename
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'ROSTER_STORE', RosterStore(str(tmp_path / 'rosters')))
+    monkeypatch.setattr(app_module, 'RESULT_CACHE', ResultCache(max_entries=16))
+    monkeypatch.setattr(app_module, 'PARSED_CACHE', TTLCache(max_entries=16))
+    return app_module.app.test_client()
+
+
+def post_process(client, roll_call=None, fctc=None, **form):
+    fctc = fctc if fctc is not None else csv_bytes(FCTC_HEADERS, FCTC_ROWS)
+    data = dict(form, year='II', fctc_file=upload(fctc, 'fctc.csv'))
+    if roll_call is not None:
+        data['roll_call_file'] = upload(roll_call, 'roll_call.csv')
+    return client.post('/process', data=data, content_type='multipart/form-data')
+
+
+def test_process_rejects_unknown_and_old_format_rosters(client, tmp_path):
+    assert post_process(client, roster_id='0123456789abcdef').status_code == 404
+    rosters = tmp_path / 'rosters'
+    rosters.mkdir()
+    (rosters / '0123456789abcdef.roster').write_bytes(b'FCTCRST1' + (2).to_bytes(4, 'little') + b'{}')
+    response = post_process(client, roster_id='0123456789abcdef')
+    assert response.status_code == 400
+    assert 'old file format' in response.get_json()['message']
+
+
+def test_process_with_a_registered_roster_matches_the_upload(client, monkeypatch):
+    roll_call = csv_bytes(ROLL_CALL_HEADERS, ROLL_CALL_ROWS)
+    registered = client.post('/rosters', data={'roll_call_file': upload(roll_call, 'roll_call.csv')},
+                             content_type='multipart/form-data')
+    assert registered.status_code == 201
+    roster_id = registered.get_json()['data']['roster_id']
+    by_upload = post_process(client, roll_call).get_json()['data']
+    # The roster is keyed like its file: start from an empty result cache so it is really matched
+    monkeypatch.setattr(app_module, 'RESULT_CACHE', ResultCache(max_entries=16))
+    by_roster = post_process(client, roster_id=roster_id).get_json()['data']
+    assert (by_upload['result_cache'], by_roster['result_cache']) == ('miss', 'miss')
+    assert by_roster['division_reports'] == by_upload['division_reports']
+
+
+def test_result_cache_hit_labels_the_earlier_run_timings(client, monkeypatch):
+    roll_call = csv_bytes(ROLL_CALL_HEADERS, ROLL_CALL_ROWS)
+    first = post_process(client, roll_call).get_json()['data']
+    assert first['result_cache'] == 'miss'
+    assert 'match_level_2' in first['match_stats']['stage_timings']
+    assert 'cached_from_run' not in first['match_stats']
+
+    second = post_process(client, roll_call).get_json()['data']
+    assert second['result_cache'] == 'hit'
+    assert second['division_reports'] == first['division_reports']
+    stats = second['match_stats']
+    # Only this request's own work is reported as fresh
+    assert list(stats['stage_timings']) == ['serialisation']
+    assert not any(key.startswith('parse_') for key in stats)
+    earlier = stats['cached_from_run']
+    assert earlier['stage_timings'] == {stage: entry for stage, entry in first['match_stats']['stage_timings'].items()
+                                        if stage != 'serialisation'}
+    assert earlier['parse_wall_seconds'] == first['match_stats']['parse_wall_seconds']
+
+    # Another matcher setting is another cache entry
+    monkeypatch.setitem(app_module.app.config, 'PRN_FUZZY', True)
+    assert post_process(client, roll_call).get_json()['data']['result_cache'] == 'miss'
+    assert post_process(client, roll_call).get_json()['data']['result_cache'] == 'hit'
+    monkeypatch.setitem(app_module.app.config, 'ONE_TO_ONE', False)
+    assert post_process(client, roll_call).get_json()['data']['result_cache'] == 'miss'
+
+
+def test_parsed_uploads_are_shared_by_process_and_debug_prn(client, monkeypatch):
+    opened = []
+    open_workbook = app_module.ExamProcessor.open_workbook
+
+    def counting_open_workbook(self, file_path, *args, **kwargs):
+        opened.append(os.path.basename(file_path))
+        return open_workbook(self, file_path, *args, **kwargs)
+
+    monkeypatch.setattr(app_module.ExamProcessor, 'open_workbook', counting_open_workbook)
+    roll_call = csv_bytes(ROLL_CALL_HEADERS, ROLL_CALL_ROWS)
+    first = post_process(client, roll_call).get_json()['data']
+    assert len(opened) == 2 and 'read' in first['match_stats']['stage_timings']
+
+    debug = client.post('/debug-prn', data={
+        'fctc_file': upload(csv_bytes(FCTC_HEADERS, FCTC_ROWS), 'fctc.csv'),
+        'roll_call_file': upload(roll_call, 'roll_call.csv'),
+    }, content_type='multipart/form-data')
+    assert debug.status_code == 200
+    assert len(opened) == 2
+
+    # Parsing does not depend on matcher settings: a new result, from the parsed uploads
+    monkeypatch.setitem(app_module.app.config, 'PRN_FUZZY', True)
+    fuzzy = post_process(client, roll_call).get_json()['data']
+    assert fuzzy['result_cache'] == 'miss'
+    assert len(opened) == 2 and 'read' not in fuzzy['match_stats']['stage_timings']
+
+    # Different bytes are parsed again
+    changed = post_process(client, csv_bytes(ROLL_CALL_HEADERS, ROLL_CALL_ROWS[:3])).get_json()['data']
+    assert len(opened) == 3 and '_rollcall_' in opened[2]
+    assert changed['result_cache'] == 'miss'
+
+
+def test_summary_downloads_match_the_full_response(client):
+    # Divisions of ~540 students: more than one reports.CSV_CHUNK_ROWS chunk each
+    fctc_rows, roll_call_rows = generated_pair(count=1800)
+    roll_call_rows.append(['12319999', 1, 'VED APTE', 'CS B'])
+    fctc, roll_call = csv_bytes(FCTC_HEADERS, fctc_rows), csv_bytes(ROLL_CALL_HEADERS, roll_call_rows)
+    full = post_process(client, roll_call, fctc).get_json()['data']
+    summary = post_process(client, roll_call, fctc, response_mode='summary').get_json()['data']
+    assert 'download_data' not in summary and 'division_reports' not in summary
+    expected = {entry['filename']: entry['csv_content'] for entry in full['download_data'].values()}
+    assert 'attendance_report_division_CS_B.csv' in expected
+
+    for division, entry in summary['division_summaries'].items():
+        response = client.get(entry['download_url'])
+        assert response.status_code == 200 and response.mimetype == 'text/csv'
+        assert response.get_data(as_text=True) == expected[entry['filename']]
+        assert entry['total_students'] == full['division_reports'][division]['total_students']
+
+    response = client.get(summary['download_all_url'])
+    assert response.status_code == 200 and response.mimetype == 'application/zip'
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert sorted(archive.namelist()) == sorted(expected)
+        for filename, csv_content in expected.items():
+            assert archive.read(filename).decode('utf-8') == csv_content
+
+    report = client.get(summary['report_url']).get_json()['data']['division_reports']
+    assert report == full['division_reports']
+    result_id = summary['result_id']
+    assert client.get(f'/results/{result_id}/division/Z.csv').status_code == 404
+    assert client.get('/results/0123456789abcdef/divisions.zip').status_code == 404
+
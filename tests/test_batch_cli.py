@@ -0,0 +1,29 @@
+# Batch runner file discovery (run: python -m pytest tests)
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from batch_cli import discover_jobs  # noqa: E402
+
+
+def test_discover_jobs_matches_role_words_on_word_boundaries(tmp_path):
+    for name in ('SY_fctc.xlsx', 'SY_roll_call.xlsx', 'TY-FCTC.csv', 'TY RollCall.csv',
+                 'enrollment.xlsx', 'payroll.csv', 'fctc_roll.xlsx'):
+        (tmp_path / name).write_bytes(b'')
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        jobs = discover_jobs(str(tmp_path))
+    pairs = sorted((os.path.basename(job['fctc']), os.path.basename(job['roll_call'])) for job in jobs)
+    assert pairs == [('SY_fctc.xlsx', 'SY_roll_call.xlsx'), ('TY-FCTC.csv', 'TY RollCall.csv')]
+    assert 'fctc_roll.xlsx is marked both FCTC and Roll Call' in output.getvalue()
+
+
+def test_single_fctc_file_is_not_paired_with_payroll(tmp_path):
+    for name in ('fctc.xlsx', 'roll.xlsx', 'payroll.csv', 'enrollment.xlsx'):
+        (tmp_path / name).write_bytes(b'')
+    with contextlib.redirect_stdout(io.StringIO()):
+        jobs = discover_jobs(str(tmp_path))
+    assert [os.path.basename(job['roll_call']) for job in jobs] == ['roll.xlsx']
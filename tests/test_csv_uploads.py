@@ -0,0 +1,111 @@
+# CSV / TSV uploads: format sniffing and parity with .xlsx (run: python -m pytest tests)
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic import ExamProcessor  # noqa: E402
+from utils import FileFormatError, sniff_text_encoding, sniff_text_format, sniff_upload  # noqa: E402
+from test_matching import FCTC_HEADERS, ROLL_CALL_HEADERS, write_csv  # noqa: E402
+
+FCTC_ROWS = [
+    ['2024-01-15 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+    ['2024-01-15 09:01:00', 'PRIYA KALE', 2, 'A', '99990002', 35],
+    ['2024-01-15 09:02:00', 'ROHAN', 3, 'B', '99990003', 30],
+    ['2024-01-15 09:03:00', 'AMIT PATIL', 1, 'A', '12310001', 45],
+]
+ROLL_CALL_ROWS = [
+    ['12310001', 1, 'AMIT PATIL', 'A'],
+    ['12310002', 2, 'PRIYA KALE', 'A'],
+    ['12310003', 3, 'ROHAN MORE', 'B'],
+    ['12310004', 4, 'SNEHA JOSHI', 'B'],
+]
+
+
+def write_text(path, text, encoding='utf-8'):
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def write_xlsx(path, headers, rows):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    workbook.active.append(headers)
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def roll_call_names(path, **settings):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return list(ExamProcessor(**settings).parse_upload(path, 'roll_call').records.column('Name'))
+
+
+@pytest.mark.parametrize('prefix, encoding, expected', [
+    (b'\xef\xbb\xbf', 'utf-8', 'utf-8-sig'),
+    (b'', 'utf-8', 'utf-8'),
+    (b'', 'cp1252', 'cp1252'),
+])
+def test_encoding_is_chosen_from_bom_then_utf8_then_cp1252(tmp_path, prefix, encoding, expected):
+    text = 'PRN,Roll No,Name,Division\n12310001,1,JOSÉ PATIL,A\n'
+    path = tmp_path / 'roll_call.csv'
+    path.write_bytes(prefix + text.encode(encoding))
+    assert sniff_text_encoding(str(path)) == expected
+    # Decoded right, and a BOM does not end up in the first header
+    assert roll_call_names(str(path)) == ['JOSÉ PATIL']
+
+
+@pytest.mark.parametrize('filename, delimiter', [('a.csv', ','), ('b.csv', ';'), ('c.tsv', '\t'), ('d.csv', '|')])
+def test_delimiter_is_sniffed(tmp_path, filename, delimiter):
+    lines = [delimiter.join(['PRN', 'Roll No', 'Name', 'Division']),
+             delimiter.join(['12310001', '1', 'AMIT PATIL', 'A']),
+             delimiter.join(['12310002', '2', 'PRIYA KALE', 'A'])]
+    path = write_text(tmp_path / filename, '\n'.join(lines) + '\n')
+    assert sniff_text_format(path) == ('utf-8', delimiter)
+    assert roll_call_names(path) == ['AMIT PATIL', 'PRIYA KALE']
+
+
+@pytest.mark.parametrize('streaming', [True, False])
+def test_workbook_renamed_to_csv_is_read_as_a_workbook(tmp_path, streaming):
+    path = write_xlsx(tmp_path / 'roll_call.xlsx', ROLL_CALL_HEADERS, ROLL_CALL_ROWS)
+    renamed = tmp_path / 'roll_call.csv'
+    os.rename(path, renamed)
+    assert sniff_upload(str(renamed)) == ('xlsx', None)
+    assert roll_call_names(str(renamed), streaming=streaming) == [row[2] for row in ROLL_CALL_ROWS]
+
+
+@pytest.mark.parametrize('content, message', [
+    (b'', 'empty'),
+    (b'  \n\n', 'empty'),
+    (b'PK\x03\x04not a workbook', 'not a valid Excel file'),
+    (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', 'binary content'),
+])
+def test_empty_or_binary_csv_is_a_file_format_error(tmp_path, content, message):
+    path = tmp_path / 'fctc.csv'
+    path.write_bytes(content)
+    with pytest.raises(FileFormatError, match=message):
+        sniff_upload(str(path))
+
+
+def test_csv_uploads_give_the_xlsx_results(tmp_path):
+    def process(fctc, roll_call):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = ExamProcessor().process_and_generate_reports(fctc, roll_call, 2)
+        stats = {key: value for key, value in result['match_stats'].items()
+                 if key != 'stage_timings' and not key.startswith('parse_')}
+        # Cells of a CSV are strings; compare values as text
+        reports = {division: [{field: str(value) for field, value in student.items()} for student in report['students']]
+                   for division, report in result['division_reports'].items()}
+        return reports, stats
+
+    from_xlsx = process(write_xlsx(tmp_path / 'fctc.xlsx', FCTC_HEADERS, FCTC_ROWS),
+                        write_xlsx(tmp_path / 'roll_call.xlsx', ROLL_CALL_HEADERS, ROLL_CALL_ROWS))
+    from_csv = process(write_csv(tmp_path / 'fctc.csv', FCTC_HEADERS, FCTC_ROWS),
+                       write_csv(tmp_path / 'roll_call.csv', ROLL_CALL_HEADERS, ROLL_CALL_ROWS))
+    assert from_csv == from_xlsx
+    assert (from_csv[1]['prn_matches'], from_csv[1]['name_matches'], from_csv[1]['roll_div_matches']) == (1, 1, 1)
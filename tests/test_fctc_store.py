@@ -0,0 +1,136 @@
+# Cumulative FCTC store checks (run: python -m pytest tests)
+import contextlib
+import io
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fctc_store import FCTCStore, FCTCStoreError  # noqa: E402
+from logic import ExamProcessor  # noqa: E402
+from normalize import detect_date_order, parse_timestamp  # noqa: E402
+from test_matching import FCTC_HEADERS, ROLL_CALL_HEADERS, write_csv  # noqa: E402
+
+
+def ingest(store, path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return store.ingest(ExamProcessor(), path)
+
+
+def test_ambiguous_slash_dates_need_a_date_order():
+    assert parse_timestamp('03/05/2024 10:00:00') is None
+    assert parse_timestamp('25/04/2024 10:00:00') == datetime(2024, 4, 25, 10)
+    assert parse_timestamp('03/05/2024 10:00:00', 'day_first') == datetime(2024, 5, 3, 10)
+    assert parse_timestamp('03/05/2024 10:00:00', 'month_first') == datetime(2024, 3, 5, 10)
+    assert detect_date_order(['03/05/2024 10:00:00', '25/04/2024 09:00:00']) == 'day_first'
+    assert detect_date_order(['03/05/2024 10:00:00']) is None
+    with pytest.raises(ValueError):
+        detect_date_order(['25/04/2024 09:00:00', '04/25/2024 09:00:00'])
+
+
+def test_store_reads_day_first_uploads_as_day_first(tmp_path):
+    store = FCTCStore(str(tmp_path / 'store'), 'exam')
+    first = write_csv(tmp_path / 'first.csv', FCTC_HEADERS, [
+        ['25/04/2024 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+    ])
+    assert ingest(store, first)['new_rows'] == 1
+    # 3 May, after the 25 April watermark; read month-first it would be 5 March and skipped
+    second = write_csv(tmp_path / 'second.csv', FCTC_HEADERS, [
+        ['25/04/2024 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+        ['03/05/2024 10:00:00', 'PRIYA KALE', 2, 'A', '12310002', 35],
+    ])
+    assert ingest(store, second)['new_rows'] == 1
+    assert store.watermark == datetime(2024, 5, 3, 10)
+
+
+def test_store_rejects_undetectable_date_order(tmp_path):
+    upload = write_csv(tmp_path / 'fctc.csv', FCTC_HEADERS, [
+        ['03/05/2024 10:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+    ])
+    with pytest.raises(FCTCStoreError):
+        ingest(FCTCStore(str(tmp_path / 'store'), 'exam'), upload)
+    store = FCTCStore(str(tmp_path / 'store'), 'exam', date_order='day_first')
+    assert ingest(store, upload)['new_rows'] == 1
+    assert store.watermark == datetime(2024, 5, 3, 10)
+
+
+def process(store, fctc, roll_call, **settings):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ExamProcessor(**settings).process_incremental(store, fctc, roll_call, 2, 'ab' * 8)['match_stats']
+
+
+def test_store_keeps_distinct_responses_from_the_same_second(tmp_path):
+    store = FCTCStore(str(tmp_path / 'store'), 'exam')
+    first_row = ['2024-01-15 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40]
+    same_second = ['2024-01-15 09:00:00', 'PRIYA KALE', 2, 'A', '12310002', 35]
+    assert ingest(store, write_csv(tmp_path / 'first.csv', FCTC_HEADERS, [first_row]))['new_rows'] == 1
+    second = ingest(store, write_csv(tmp_path / 'second.csv', FCTC_HEADERS, [first_row, same_second]))
+    assert (second['new_rows'], second['skipped_rows']) == (1, 1)
+    assert len(store) == 2
+    # Same rows in another order: no longer a prefix of the last upload, checked row by row
+    third = ingest(store, write_csv(tmp_path / 'third.csv', FCTC_HEADERS, [same_second, first_row]))
+    assert (third['new_rows'], third['skipped_rows']) == (0, 2)
+    assert store.status()['ingested_rows'] == 2
+
+
+def test_store_reports_untimed_rows_and_rematches_on_new_settings(tmp_path):
+    store = FCTCStore(str(tmp_path / 'store'), 'exam')
+    fctc = write_csv(tmp_path / 'fctc.csv', FCTC_HEADERS, [
+        ['2024-01-15 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+        ['', 'PRIYA KALE', 2, 'A', '12310002', 35],
+    ])
+    roll_call = write_csv(tmp_path / 'roll_call.csv', ROLL_CALL_HEADERS, [
+        ['12310001', 1, 'AMIT PATIL', 'A'],
+        ['12310002', 2, 'PRIYA KALE', 'A'],
+    ])
+    stats = process(store, fctc, roll_call)
+    assert (stats['fctc_untimed_rows'], stats['match_mode']) == (1, 'full')
+    assert process(store, fctc, roll_call)['match_mode'] == 'incremental'
+    assert process(store, fctc, roll_call, prn_fuzzy=True)['match_mode'] == 'full'
+
+
+def test_concurrent_store_objects_keep_both_batches(tmp_path):
+    # Two requests open the same store before either ingests (separate FCTCStore objects)
+    first_store = FCTCStore(str(tmp_path / 'store'), 'exam')
+    second_store = FCTCStore(str(tmp_path / 'store'), 'exam')
+    roll_call = write_csv(tmp_path / 'roll_call.csv', ROLL_CALL_HEADERS, [
+        ['12310001', 1, 'AMIT PATIL', 'A'],
+        ['12310002', 2, 'PRIYA KALE', 'A'],
+    ])
+    first = write_csv(tmp_path / 'first.csv', FCTC_HEADERS, [
+        ['2024-01-15 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+    ])
+    second = write_csv(tmp_path / 'second.csv', FCTC_HEADERS, [
+        ['2024-01-15 09:05:00', 'PRIYA KALE', 2, 'A', '12310002', 35],
+    ])
+    assert process(first_store, first, roll_call)['fctc_new_rows'] == 1
+    assert process(second_store, second, roll_call)['fctc_new_rows'] == 1
+    reopened = FCTCStore(str(tmp_path / 'store'), 'exam')
+    assert len(reopened) == 2
+    assert reopened.status()['ingested_rows'] == 2
+
+
+def test_new_response_rematches_only_competing_rows(tmp_path):
+    store = FCTCStore(str(tmp_path / 'store'), 'exam')
+    roll_call = write_csv(tmp_path / 'roll_call.csv', ROLL_CALL_HEADERS, [
+        ['12310001', 1, 'AMIT PATIL', 'A'],
+        ['12310002', 2, 'PRIYA KALE', 'A'],
+        ['12310003', 3, 'ROHAN MORE', 'B'],
+        ['12310004', 4, 'SNEHA JOSHI', 'B'],
+    ])
+    first_rows = [
+        ['2024-01-15 09:00:00', 'AMIT PATIL', 1, 'A', '12310001', 40],
+        # Mistyped PRN: matched by name, and unrelated to the response added below
+        ['2024-01-15 09:01:00', 'ROHAN MORE', 3, 'B', '99990003', 35],
+    ]
+    first = write_csv(tmp_path / 'first.csv', FCTC_HEADERS, first_rows)
+    assert process(store, first, roll_call)['match_mode'] == 'full'
+    second = write_csv(tmp_path / 'second.csv', FCTC_HEADERS, first_rows + [
+        ['2024-01-15 09:02:00', 'PRIYA KALE', 2, 'A', '99990002', 30],
+    ])
+    stats = process(store, second, roll_call)
+    assert (stats['match_mode'], stats['rematched_rows']) == ('incremental', 1)
+    assert (stats['prn_matches'], stats['name_matches'], stats['no_match']) == (1, 2, 1)
@@ -0,0 +1,196 @@
+# Matching regression checks (run: python -m pytest tests)
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic import NAME_MATCH_THRESHOLD, ExamProcessor  # noqa: E402
+from matching import BlockedNameIndex, NameTokenIndex  # noqa: E402
+
+FCTC_HEADERS = ['Timestamp', 'Full name', 'Roll Number', 'Division', 'PRN', 'Score']
+ROLL_CALL_HEADERS = ['PRN', 'Roll No', 'Name', 'Division']
+
+
+def write_csv(path, headers, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    return str(path)
+
+
+def run(tmp_path, fctc_rows, roll_call_rows, **settings):
+    fctc = write_csv(tmp_path / 'fctc.csv', FCTC_HEADERS, fctc_rows)
+    roll_call = write_csv(tmp_path / 'roll_call.csv', ROLL_CALL_HEADERS, roll_call_rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = ExamProcessor(**settings).process_and_generate_reports(fctc, roll_call, 2)
+    students = [student for report in result['division_reports'].values() for student in report['students']]
+    return {student['Name']: student for student in students}, result['match_stats']
+
+
+def test_prn_fuzzy_needs_name_or_roll_division_confirmation(tmp_path):
+    fctc_rows = [
+        ['2024-01-15 09:00:00', 'AMIT PATIL', 49, 'A', '12310049', 40],
+        # Another roster's student, one digit from absent RAHUL JOSHI's PRN
+        ['2024-01-15 09:01:00', 'CHETAN DESAI', 12, 'B', '12310051', 35],
+        # Swapped digits, name confirms
+        ['2024-01-15 09:02:00', 'PRIYA KALE', 60, 'A', '12310006', 30],
+        # Missing digit and a nickname; Roll No + Division confirm
+        ['2024-01-15 09:03:00', 'SNEHU', 70, 'A', '1231007', 25],
+    ]
+    roll_call_rows = [
+        ['12310049', 49, 'AMIT PATIL', 'A'],
+        ['12310050', 50, 'RAHUL JOSHI', 'A'],
+        ['12310060', 60, 'PRIYA KALE', 'A'],
+        ['12310070', 70, 'SNEHA MORE', 'A'],
+    ]
+    students, stats = run(tmp_path, fctc_rows, roll_call_rows, prn_fuzzy=True)
+
+    assert students['RAHUL JOSHI']['Attendance_Status'] == 'Absent'
+    assert students['RAHUL JOSHI']['Score'] == 'N/A'
+    assert students['PRIYA KALE']['Match_Method'] == 'PRN_Fuzzy'
+    assert students['SNEHA MORE']['Match_Method'] == 'PRN_Fuzzy'
+    assert stats['prn_fuzzy_matches'] == 2
+
+
+def test_prn_fuzzy_off_by_default(tmp_path):
+    fctc_rows = [['2024-01-15 09:02:00', 'SNEHU', 60, 'A', '12310006', 30]]
+    roll_call_rows = [['12310060', 61, 'PRIYA KALE', 'A']]
+    students, stats = run(tmp_path, fctc_rows, roll_call_rows)
+    assert students['PRIYA KALE']['Match_Method'] == 'Not_Found'
+    assert stats['prn_fuzzy_matches'] == 0
+
+
+def test_name_token_index_agrees_with_linear_scan():
+    rng = random.Random(7)
+    # A small vocabulary so names share tokens often (and some repeat a token)
+    vocabulary = ['AMIT', 'PATIL', 'PRIYA', 'KALE', 'SNEHA', 'MORE', 'RAHUL', 'JOSHI', 'KUMAR', 'DESAI']
+    names = list(dict.fromkeys(' '.join(rng.choices(vocabulary, k=rng.randint(1, 4))) for _ in range(300)))
+    index = NameTokenIndex(names)
+    processor = ExamProcessor()
+    for _ in range(300):
+        query = ' '.join(rng.choices(vocabulary, k=rng.randint(1, 4)))
+        for threshold in (NAME_MATCH_THRESHOLD, 0.5, 1.0):
+            ranked = index.ranked_matches(query, threshold)
+            expected = [name for name in names if processor._fuzzy_name_match(query, name, threshold)]
+            assert sorted(name for _, name in ranked) == sorted(expected)
+            scores = [score for score, _ in ranked]
+            assert scores == sorted(scores, reverse=True)
+
+
+def test_name_candidates_widen_when_the_block_filter_rejects_everything():
+    # 'RAHUL AMIT KUMAR PATIL' is indexed under block A, but both rows carrying it are in
+    # other divisions, so the multi-row filter drops them and the search must widen
+    name_index = BlockedNameIndex()
+    name_index.add('RAHUL AMIT KUMAR PATIL', ['A'])
+    name_index.add('RAHUL AMIT KUMAR PATIL S J', ['C'])
+    lookups = {
+        'by_name': {'RAHUL AMIT KUMAR PATIL': [0, 1], 'RAHUL AMIT KUMAR PATIL S J': [2]},
+        'divisions': ['B', 'C', 'C'],
+        'blocks': ['B', 'C', 'C'],
+        'name_index': name_index,
+    }
+    candidates = ExamProcessor._name_candidates(lookups, 'A', 'RAHUL AMIT KUMAR PATIL S', 'A')
+    assert [row for _, _, row in candidates] == [2]
+
+
+SHARED_FCTC_ROWS = [
+    ['2024-01-15 09:00:00', 'AMIT SURESH KUMAR PATIL', 5, 'A', '99990001', 40],
+    ['2024-01-15 09:01:00', 'ROHAN MORE', 7, 'B', '99990002', 35],
+    ['2024-01-15 09:02:00', 'NEHA ANIL KUMAR JOSHI', 9, 'B', '12310009', 30],
+]
+SHARED_ROLL_CALL_ROWS = [
+    # Both names point at the first response
+    ['12310001', 5, 'AMIT SURESH KUMAR PATIL', 'A'],
+    ['12310002', 6, 'AMIT SURESH KUMAR PATIL J', 'A'],
+    # A duplicated Roll No + Division points twice at the second response
+    ['12310003', 7, 'KUNAL RANE', 'B'],
+    ['12310004', 7, 'VED APTE', 'B'],
+    # Matched by PRN; the name-alike below finds the response already taken
+    ['12310009', 9, 'NEHA ANIL KUMAR JOSHI', 'B'],
+    ['12310010', 10, 'NEHA ANIL KUMAR JOSHI S', 'B'],
+]
+
+
+def test_one_fctc_row_goes_to_one_roll_call_row(tmp_path):
+    students, stats = run(tmp_path, SHARED_FCTC_ROWS, SHARED_ROLL_CALL_ROWS)
+    methods = {name: student['Match_Method'] for name, student in students.items()}
+    assert methods == {
+        'AMIT SURESH KUMAR PATIL': 'Name', 'AMIT SURESH KUMAR PATIL J': 'Not_Found',
+        'KUNAL RANE': 'Roll_Div', 'VED APTE': 'Not_Found',
+        'NEHA ANIL KUMAR JOSHI': 'PRN', 'NEHA ANIL KUMAR JOSHI S': 'Not_Found',
+    }
+    assert (stats['name_matches'], stats['roll_div_matches'], stats['prn_matches']) == (1, 1, 1)
+    assert (stats['contested_matches'], stats['preclaimed_matches']) == (2, 1)
+
+
+def test_one_to_one_off_lets_rows_share_a_response(tmp_path):
+    students, stats = run(tmp_path, SHARED_FCTC_ROWS, SHARED_ROLL_CALL_ROWS, one_to_one=False)
+    methods = {name: student['Match_Method'] for name, student in students.items()}
+    assert methods == {
+        'AMIT SURESH KUMAR PATIL': 'Name', 'AMIT SURESH KUMAR PATIL J': 'Name',
+        'KUNAL RANE': 'Roll_Div', 'VED APTE': 'Roll_Div',
+        'NEHA ANIL KUMAR JOSHI': 'PRN', 'NEHA ANIL KUMAR JOSHI S': 'Name',
+    }
+    assert (stats['contested_matches'], stats['preclaimed_matches']) == (0, 0)
+
+
+def generated_pair(seed=7, count=300):
+    """Roll call and FCTC rows with duplicate PRNs, duplicate Roll No + Division keys and blank keys"""
+    rng = random.Random(seed)
+    first_names, last_names = ['AMIT', 'PRIYA', 'ROHAN', 'SNEHA', 'KUNAL', 'NEHA'], ['PATIL', 'KALE', 'MORE', 'JOSHI']
+    roll_call_rows, fctc_rows = [], []
+    for i in range(count):
+        prn = '' if rng.random() < 0.1 else f"1231{i:04d}"
+        roll_no = '' if rng.random() < 0.05 else rng.randrange(1, 80)
+        name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        division = rng.choice('ABC')
+        roll_call_rows.append([prn, roll_no, name, division])
+        if rng.random() < 0.2:
+            continue
+        # Exact, one swapped digit (Level 1.5), unknown or blank PRN
+        fctc_prn = rng.choice([prn, prn, prn, prn[:-2] + prn[-1:] + prn[-2:-1], f"9999{i:04d}", ''])
+        fctc_name = name if rng.random() < 0.8 else rng.choice(first_names)
+        for _ in range(2 if rng.random() < 0.15 else 1):
+            fctc_rows.append([f"2024-01-15 09:{len(fctc_rows) // 60:02d}:{len(fctc_rows) % 60:02d}",
+                              fctc_name, roll_no, division, fctc_prn, rng.randrange(0, 51)])
+    return fctc_rows, roll_call_rows
+
+
+@pytest.mark.parametrize('prn_fuzzy', [False, True])
+def test_vectorised_joins_match_the_row_loop(tmp_path, prn_fuzzy):
+    pytest.importorskip('pandas')
+    fctc_rows, roll_call_rows = generated_pair()
+    fctc = write_csv(tmp_path / 'fctc.csv', FCTC_HEADERS, fctc_rows)
+    roll_call = write_csv(tmp_path / 'roll_call.csv', ROLL_CALL_HEADERS, roll_call_rows)
+    outcomes = []
+    for vectorised_joins in (True, False):
+        processor = ExamProcessor(vectorised_joins=vectorised_joins, prn_fuzzy=prn_fuzzy)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fctc_data, roll_call_data, _ = processor._parse_uploads(fctc, roll_call)
+            lookups = processor._build_fctc_lookups(fctc_data)
+            roll_keys = processor._normalise_roll_call(roll_call_data)
+            # Extraction drops roll-call rows without a PRN; blank some keys to reach the joins
+            for roll_row in range(0, len(roll_call_data), 10):
+                roll_keys['prns'][roll_row] = ''
+            matched_rows = [None] * len(roll_call_data)
+            match_methods = ['Not_Found'] * len(roll_call_data)
+            contests = processor._match_roll_call(lookups, roll_keys, range(len(roll_call_data)),
+                                                  matched_rows, match_methods)
+            result = ExamProcessor(vectorised_joins=vectorised_joins,
+                                   prn_fuzzy=prn_fuzzy).process_and_generate_reports(fctc, roll_call, 2)
+        level_1 = result['match_stats']['stage_timings']['match_level_1']
+        assert level_1.get('vectorised') == (1 if vectorised_joins else None)
+        stats = {key: value for key, value in result['match_stats'].items()
+                 if key != 'stage_timings' and not key.startswith('parse_')}
+        outcomes.append((matched_rows, match_methods, contests, stats, result['division_reports']))
+    assert outcomes[0] == outcomes[1]
+    stats = outcomes[0][3]
+    assert stats['prn_matches'] and stats['name_matches'] and stats['roll_div_matches'] and stats['no_match']
+
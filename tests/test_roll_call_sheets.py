@@ -0,0 +1,77 @@
+# Multi-sheet roll-call workbooks (run: python -m pytest tests)
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic import ExamProcessor  # noqa: E402
+from test_matching import FCTC_HEADERS, ROLL_CALL_HEADERS, write_csv  # noqa: E402
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def write_workbook(path, sheets, hidden=()):
+    """sheets: sheet name → rows (header first)"""
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+        if title in hidden:
+            sheet.sheet_state = 'hidden'
+    workbook.save(path)
+    return str(path)
+
+
+def parse(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ExamProcessor().parse_upload(path, 'roll_call')
+
+
+def test_sheets_merge_in_order_with_division_from_the_sheet_name(tmp_path):
+    path = write_workbook(tmp_path / 'roll_call.xlsx', {
+        'SY-B': [['PRN', 'Roll No', 'Name'], ['12310003', 1, 'ROHAN MORE'], ['12310004', 2, 'SNEHA JOSHI']],
+        'SY-A': [ROLL_CALL_HEADERS, ['12310001', 1, 'AMIT PATIL', 'A'], ['12310002', 2, 'PRIYA KALE', 'A']],
+        'Old': [ROLL_CALL_HEADERS, ['12310009', 9, 'KUNAL RANE', 'C']],
+    }, hidden={'Old'})
+    parsed = parse(path)
+    assert parsed.sheets == ['SY-B', 'SY-A']
+    assert list(parsed.records.column('PRN_CLEAN')) == ['12310003', '12310004', '12310001', '12310002']
+    # No Division column on 'SY-B': the sheet name stands in
+    assert list(parsed.records.column('Division')) == ['SY-B', 'SY-B', 'A', 'A']
+
+
+def test_unusable_sheet_is_skipped_and_duplicate_prns_are_counted(tmp_path):
+    path = write_workbook(tmp_path / 'roll_call.xlsx', {
+        'Instructions': [['Fill one sheet per division'], ['Do not edit the headers']],
+        'A': [ROLL_CALL_HEADERS, ['12310001', 1, 'AMIT PATIL', 'A'], ['12310002', 2, 'PRIYA KALE', 'A']],
+        # PRIYA KALE moved division; the earlier sheet's row is kept
+        'B': [ROLL_CALL_HEADERS, ['12310002', 7, 'PRIYA KALE', 'B'], ['12310003', 8, 'ROHAN MORE', 'B']],
+    })
+    parsed = parse(path)
+    assert parsed.sheets == ['A', 'B']
+    assert parsed.duplicate_prns == 1
+    assert list(zip(parsed.records.column('PRN_CLEAN'), parsed.records.column('Division'))) == [
+        ('12310001', 'A'), ('12310002', 'A'), ('12310003', 'B')]
+
+    fctc = write_csv(tmp_path / 'fctc.csv', FCTC_HEADERS, [
+        ['2024-01-15 09:00:00', 'PRIYA KALE', 2, 'A', '12310002', 35],
+    ])
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = ExamProcessor().process_and_generate_reports(fctc, path, 2)['match_stats']
+    assert (stats['roll_call_sheets'], stats['roll_call_duplicate_prns']) == (['A', 'B'], 1)
+    assert stats['prn_matches'] == 1
+
+
+def test_workbook_without_a_usable_sheet_is_rejected(tmp_path):
+    path = write_workbook(tmp_path / 'roll_call.xlsx', {
+        'Notes': [['Fill one sheet per division']],
+        'Blank': [['Remarks'], ['none']],
+    })
+    with pytest.raises(Exception, match='No sheet has the required columns'):
+        parse(path)
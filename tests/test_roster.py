@@ -0,0 +1,46 @@
+# Registered roster round trip (run: python -m pytest tests)
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from records import RecordTable  # noqa: E402
+from roster import RosterError, RosterStore  # noqa: E402
+
+
+def test_roster_keeps_raw_cell_values(tmp_path):
+    records = RecordTable.from_columns({
+        'PRN_RAW': [12310001, '12310002', None],
+        'PRN_CLEAN': ['12310001', '12310002', ''],
+        'Roll_No': [1, 2.0, 'R3'],
+        'Name': ['AMIT PATIL', 'PRIYA KALE', 'SNEHA MORE'],
+        'Division': ['A', 'A', 'B'],
+    })
+    store = RosterStore(str(tmp_path))
+    metadata = store.register(records, 'ab' * 32, 'roll_call.xlsx')
+    assert metadata['divisions'] == ['A', 'B']
+    with store.open(metadata['roster_id']) as roster:
+        loaded = roster.records()
+    assert len(loaded) == 3
+    for field in records.fields:
+        assert list(loaded.column(field)) == list(records.column(field))
+    assert type(loaded.column('PRN_RAW')[0]) is int
+
+
+def test_old_format_roster_is_reported_and_can_be_registered_again(tmp_path):
+    records = RecordTable.from_columns({
+        'PRN_RAW': ['12310001'], 'PRN_CLEAN': ['12310001'], 'Roll_No': [1], 'Name': ['AMIT PATIL'], 'Division': ['A'],
+    })
+    store = RosterStore(str(tmp_path))
+    roster_id = store.roster_id_for('cd' * 32)
+    (tmp_path / f'{roster_id}.roster').write_bytes(b'FCTCRST2' + (2).to_bytes(4, 'little') + b'{}')
+    assert store.exists(roster_id)
+    with pytest.raises(RosterError, match='old file format'):
+        store.metadata(roster_id)
+    assert store.list() == []
+    metadata = store.register(records, 'cd' * 32, 'roll_call.xlsx')
+    assert metadata['roster_id'] == roster_id
+    with store.open(roster_id) as roster:
+        assert list(roster.records().column('Name')) == ['AMIT PATIL']